@@ -0,0 +1,50 @@
+"""
+Compare the vectorized bulk parser with the per-row parse_gpu_csv path.
+
+Generates nvidia-smi output for a simulated fleet with FakeTransport:
+
+    PYTHONPATH=src python benchmarks/bench_bulk_parser.py --hosts 1000 --gpus 8
+"""
+
+import argparse
+import time
+
+from gpu_usage_menubar.bulk_parser import parse_bulk
+from gpu_usage_menubar.gpu_fetcher import NVIDIA_SMI_QUERY, parse_gpu_csv
+from gpu_usage_menubar.transport import FakeTransport
+
+
+def best_of(func, rounds):
+    """Return the fastest wall time of several runs."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=1000, help="Number of simulated hosts")
+    parser.add_argument("--gpus", type=int, default=8, help="GPUs per host")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed runs (best is reported)")
+    args = parser.parse_args()
+
+    transport = FakeTransport(gpus_per_host=args.gpus, seed=0)
+    outputs = {f"node{i:04d}": transport.run(f"node{i:04d}", None, NVIDIA_SMI_QUERY, 5) for i in range(args.hosts)}
+    rows = args.hosts * args.gpus
+
+    per_row = best_of(lambda: [parse_gpu_csv(output) for output in outputs.values()], args.rounds)
+    bulk = best_of(lambda: parse_bulk(outputs), args.rounds)
+
+    assert len(parse_bulk(outputs)) == sum(len(parse_gpu_csv(o)) for o in outputs.values())
+
+    print(f"{rows} rows ({args.hosts} hosts x {args.gpus} GPUs)")
+    print(f"  parse_gpu_csv: {per_row * 1000:8.2f} ms  ({per_row / rows * 1e6:.2f} us/row)")
+    print(f"  parse_bulk:    {bulk * 1000:8.2f} ms  ({bulk / rows * 1e6:.2f} us/row)")
+    print(f"  speedup:       {per_row / bulk:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark the fetch/parse pipeline against a simulated fleet.
+
+Uses FakeTransport so no GPU servers are needed:
+
+    PYTHONPATH=src python benchmarks/bench_fetch_many.py --hosts 1000 --gpus 8 --latency 0.02
+"""
+
+import argparse
+import time
+
+from gpu_usage_menubar.gpu_fetcher import fetch_many, get_ssh_manager
+from gpu_usage_menubar.transport import FakeTransport
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=1000, help="Number of simulated hosts")
+    parser.add_argument("--gpus", type=int, default=8, help="GPUs per host")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated round trip in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Extra random latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.01, help="Probability of a failed fetch")
+    parser.add_argument("--concurrency", type=int, default=64, help="fetch_many max_concurrency")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of fetch cycles")
+    args = parser.parse_args()
+
+    get_ssh_manager().set_transport(FakeTransport(
+        gpus_per_host=args.gpus,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=0
+    ))
+
+    hosts = [f"sim-{i:04d}" for i in range(args.hosts)]
+    for round_index in range(args.rounds):
+        start = time.perf_counter()
+        ok = failed = gpus = 0
+        for result in fetch_many(hosts, max_concurrency=args.concurrency):
+            if result.data is not None:
+                ok += 1
+                gpus += len(result.data.gpus)
+            else:
+                failed += 1
+        elapsed = time.perf_counter() - start
+        print(f"round {round_index}: {ok} ok, {failed} failed, {gpus} GPUs in {elapsed:.3f}s "
+              f"({args.hosts / elapsed:.0f} hosts/s)")
+
+
+if __name__ == "__main__":
+    main()
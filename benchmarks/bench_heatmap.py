@@ -0,0 +1,65 @@
+"""
+Compare the NumPy fleet heatmap renderer with drawing one rectangle per cell.
+
+    PYTHONPATH=src python benchmarks/bench_heatmap.py --hosts 1000 --gpus 8
+"""
+
+import argparse
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from gpu_usage_menubar.icon_generator import get_utilization_color, render_fleet_heatmap
+
+
+def draw_heatmap(utilization, cell_width, cell_height):
+    """Reference renderer: one ImageDraw rectangle per cell."""
+    rows, columns = utilization.shape
+    img = Image.new('RGBA', (columns * cell_width, rows * cell_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for row in range(rows):
+        for column in range(columns):
+            x = column * cell_width
+            y = row * cell_height
+            draw.rectangle(
+                [x, y, x + cell_width - 1, y + cell_height - 1],
+                fill=get_utilization_color(utilization[row, column])
+            )
+    return img
+
+
+def best_of(func, rounds):
+    """Return the fastest wall time of several runs."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=1000, help="Heatmap rows")
+    parser.add_argument("--gpus", type=int, default=8, help="Heatmap columns")
+    parser.add_argument("--cell", type=int, default=4, help="Cell size in pixels")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed runs (best is reported)")
+    args = parser.parse_args()
+
+    utilization = np.random.default_rng(0).uniform(0, 100, (args.hosts, args.gpus))
+
+    assert render_fleet_heatmap(utilization, args.cell, args.cell).tobytes() == \
+        draw_heatmap(utilization, args.cell, args.cell).tobytes()
+
+    drawn = best_of(lambda: draw_heatmap(utilization, args.cell, args.cell), args.rounds)
+    vectorized = best_of(lambda: render_fleet_heatmap(utilization, args.cell, args.cell), args.rounds)
+
+    print(f"{args.hosts} x {args.gpus} cells, {args.cell}px")
+    print(f"  ImageDraw:  {drawn * 1000:8.2f} ms")
+    print(f"  NumPy LUT:  {vectorized * 1000:8.2f} ms")
+    print(f"  speedup:    {drawn / vectorized:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-frame cost of encoding an icon and handing it to the display layer.
+
+Compares the old temp-file handoff (mkstemp, write, read back, unlink) with
+passing an in-memory IconBuffer to a presenter, at several PNG levels:
+
+    PYTHONPATH=src python benchmarks/bench_icon_pipeline.py --frames 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from gpu_usage_menubar import icon_generator
+from gpu_usage_menubar.icon_generator import IconBuffer, set_png_compress_level
+from gpu_usage_menubar.presenter import MemoryPresenter
+
+
+def render_frame(i):
+    """Render a dual icon without the cache, like a cold refresh."""
+    bar_height = 30
+    fills = [icon_generator._bar_fill((i * 7 + k * 31) % 101, bar_height) for k in range(2)]
+    return icon_generator._render_dual_gpu_icon(fills[0], fills[1], 36)
+
+
+def temp_file_handoff(icon_bytes, state):
+    """Previous app behaviour: write the PNG to a temp file and load it back."""
+    if state.get("path"):
+        os.unlink(state["path"])
+    fd, state["path"] = tempfile.mkstemp(suffix='.png')
+    os.write(fd, icon_bytes)
+    os.close(fd)
+    with open(state["path"], "rb") as f:  # Stands in for NSImage.initWithContentsOfFile_
+        return f.read()
+
+
+def per_frame(func, frames):
+    start = time.perf_counter()
+    for i in range(frames):
+        func(i)
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=2000, help="Frames per measurement")
+    args = parser.parse_args()
+
+    for level in (1, 6, 9):
+        set_png_compress_level(level)
+        size = len(render_frame(0))
+
+        state = {}
+        temp_file = per_frame(lambda i: temp_file_handoff(render_frame(i), state), args.frames)
+        os.unlink(state["path"])
+
+        presenter = MemoryPresenter()
+        in_memory = per_frame(lambda i: presenter.present(IconBuffer.from_png(render_frame(i))), args.frames)
+
+        print(f"compress_level={level} ({size} bytes/frame)")
+        print(f"  temp file: {temp_file * 1e6:8.1f} us/frame")
+        print(f"  in memory: {in_memory * 1e6:8.1f} us/frame")
+
+    set_png_compress_level(6)
+    sparkline = icon_generator.SparklineIcon(2)
+    presenter = MemoryPresenter()
+    png = per_frame(lambda i: presenter.present(sparkline.to_buffer("png")), args.frames)
+    raw = per_frame(lambda i: presenter.present(sparkline.to_buffer("rgba")), args.frames)
+    print("sparkline handoff")
+    print(f"  PNG buffer:  {png * 1e6:8.1f} us/frame")
+    print(f"  RGBA buffer: {raw * 1e6:8.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Startup latency budget: import cost per module and time to first snapshot.
+
+Each measurement runs in a fresh interpreter. Import cost is parsed from
+``python -X importtime``; time to first snapshot covers interpreter start,
+imports and one fetch through a zero-latency FakeTransport. Exits with
+status 1 when any budget is exceeded:
+
+    PYTHONPATH=src python benchmarks/bench_startup.py --runs 5 --budget gpu_usage_menubar.gpu_fetcher=80
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Cumulative import budgets in milliseconds (best of --runs)
+DEFAULT_BUDGETS = {
+    "gpu_usage_menubar.gpu_fetcher": 100.0,
+    "gpu_usage_menubar.icon_generator": 60.0,
+    "gpu_usage_menubar.cli": 150.0,
+}
+
+# Modules that must not be loaded by a plain import of the modules above
+HEAVY_MODULES = ("PIL", "numpy", "objc", "AppKit", "Foundation", "ctypes")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+FIRST_SNAPSHOT_CODE = """
+import time
+start = time.perf_counter()
+from gpu_usage_menubar.gpu_fetcher import fetch_gpu_data, get_ssh_manager
+from gpu_usage_menubar.transport import FakeTransport
+get_ssh_manager().set_transport(FakeTransport(gpus_per_host=8, latency=0))
+assert fetch_gpu_data("bench") is not None
+print("first_snapshot", time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth) in output order
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def _env() -> Dict[str, str]:
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def measure_import(module: str) -> Tuple[float, List[str], List[Tuple[str, int, int, int]]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        (cumulative milliseconds, heavy modules loaded, parsed importtime rows)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), check=True
+    )
+    rows = parse_importtime(result.stderr)
+    cumulative = next(us for name, _, us, _ in rows if name == module)
+    loaded = {name.split(".")[0] for name, _, _, _ in rows}
+    return cumulative / 1000, [m for m in HEAVY_MODULES if m in loaded], rows
+
+
+def measure_first_snapshot() -> Tuple[float, float]:
+    """
+    Launch an interpreter that fetches one snapshot from a FakeTransport.
+
+    Returns:
+        (milliseconds from process spawn, milliseconds inside the process)
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", FIRST_SNAPSHOT_CODE],
+                            capture_output=True, text=True, env=_env(), check=True)
+    wall = time.perf_counter() - start
+    inside = next(line.split()[1] for line in result.stdout.splitlines() if line.startswith("first_snapshot"))
+    return wall * 1000, float(inside) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (best is used)")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="Cumulative import budget for a module (repeatable)")
+    parser.add_argument("--first-snapshot-budget", type=float, default=300.0, metavar="MS",
+                        help="Budget from process spawn to first snapshot")
+    parser.add_argument("--top", type=int, default=5, help="Slowest dependencies to list per module")
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in args.budget:
+        module, _, ms = item.partition("=")
+        budgets[module] = float(ms)
+
+    failures = []
+    for module, budget in budgets.items():
+        best, heavy, rows = min((measure_import(module) for _ in range(args.runs)), key=lambda r: r[0])
+        status = "ok" if best <= budget else "OVER BUDGET"
+        print(f"{module}: {best:.1f} ms (budget {budget:.0f} ms) {status}")
+        for name, _, cumulative, depth in sorted(
+            (r for r in rows if r[3] == 1), key=lambda r: r[2], reverse=True
+        )[:args.top]:
+            print(f"    {cumulative / 1000:7.1f} ms  {name}")
+        if best > budget:
+            failures.append(f"{module} import took {best:.1f} ms > {budget:.0f} ms")
+        if heavy:
+            failures.append(f"{module} loads heavy modules at import: {', '.join(heavy)}")
+
+    wall, inside = min((measure_first_snapshot() for _ in range(args.runs)), key=lambda r: r[0])
+    status = "ok" if wall <= args.first_snapshot_budget else "OVER BUDGET"
+    print(f"first snapshot: {wall:.1f} ms from spawn, {inside:.1f} ms after interpreter start "
+          f"(budget {args.first_snapshot_budget:.0f} ms) {status}")
+    if wall > args.first_snapshot_budget:
+        failures.append(f"first snapshot took {wall:.1f} ms > {args.first_snapshot_budget:.0f} ms")
+
+    if failures:
+        print("\nStartup budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
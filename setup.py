@@ -6,12 +6,17 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "pyobjc-framework-Cocoa>=10.0",
-        "Pillow>=10.0.0",
+        "pyobjc-framework-Cocoa>=10.0; sys_platform == 'darwin'",
+        "Pillow>=10.0.0; sys_platform == 'darwin'",
     ],
+    extras_require={
+        "fleet": ["numpy>=1.22"],
+        "icons": ["Pillow>=10.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "gpu-usage-menubar=gpu_usage_menubar.app:main",
+            "gpu-usage-monitor=gpu_usage_menubar.cli:main",
         ],
     },
 )
@@ -4,9 +4,7 @@ Displays dual GPU utilization from remote server in macOS menu bar.
 """
 
 import objc
-import threading
 import time
-import tempfile
 import os
 import logging
 
@@ -38,9 +36,21 @@ from AppKit import (
     NSForegroundColorAttributeName, NSFontAttributeName,
     NSApplicationActivationPolicyAccessory
 )
-from Foundation import NSWorkspace, NSNotificationCenter
+from Foundation import NSWorkspace, NSNotificationCenter, NSData
 from .gpu_fetcher import fetch_gpu_data, GPUData, get_ssh_manager
-from .icon_generator import create_dual_gpu_icon, create_single_gpu_icon, create_error_icon
+from .icon_generator import (
+    create_dual_gpu_icon, create_multi_gpu_icon, create_single_gpu_icon, create_error_icon, SparklineIcon,
+    IconBuffer
+)
+from .last_snapshot import LastSnapshotStore, DEFAULT_PATH as DEFAULT_SNAPSHOT_PATH, format_age
+from .presenter import IconPresenter
+from .snapshot_cache import SnapshotCache, CachedSnapshot, SNAPSHOT_FRESH, SNAPSHOT_STALE, SNAPSHOT_ERROR
+
+# Cached snapshots older than this are not shown at startup
+WARM_START_MAX_AGE = 24 * 3600
+
+# Samples per GPU kept for the sparkline icon (more than it has columns)
+SPARKLINE_HISTORY = 256
 
 
 def create_colored_progress_bar(percent: float, width: int = 25, label: str = "") -> NSAttributedString:
@@ -123,6 +133,30 @@ def create_colored_progress_bar(percent: float, width: int = 25, label: str = ""
     return attributed_string
 
 
+class StatusItemPresenter(IconPresenter):
+    """Shows icons in an NSStatusItem straight from memory (no temp files)."""
+
+    def __init__(self, statusitem, point_size: float = 18):
+        self.statusitem = statusitem
+        self.point_size = point_size
+
+    def present(self, icon: IconBuffer, title: str = ""):
+        if icon.format != "png":
+            raise ValueError("StatusItemPresenter only supports PNG icons")
+        data = NSData.dataWithBytes_length_(icon.data, len(icon.data))
+        image = NSImage.alloc().initWithData_(data)
+        if image is None:
+            raise ValueError("Could not decode icon")
+        image.setTemplate_(False)
+        image.setSize_((self.point_size, self.point_size))
+        self.statusitem.setImage_(image)
+        self.statusitem.setTitle_(title)
+
+    def clear(self, title: str = ""):
+        self.statusitem.setImage_(None)
+        self.statusitem.setTitle_(title)
+
+
 class GPUMonitorApp(NSObject):
     """
     Menu bar application to monitor GPU utilization from remote server.
@@ -140,6 +174,17 @@ class GPUMonitorApp(NSObject):
         self.ssh_user = os.environ.get('GPU_SERVER_USER', None)
         self.refresh_interval = float(os.environ.get('GPU_REFRESH_INTERVAL', '300'))  # 5 minutes default
         self.show_percentages = os.environ.get('GPU_SHOW_PERCENTAGES', 'false').lower() == 'true'
+        self.icon_mode = os.environ.get('GPU_ICON_MODE', 'bars').lower()  # "bars" or "sparkline"
+        # Last good data is shown (marked stale) this long before failures turn into the error icon
+        self.max_staleness = float(os.environ.get('GPU_MAX_STALENESS', str(3 * self.refresh_interval)))
+        self._sparkline = None
+        self._history = None
+        if self.icon_mode == 'sparkline':
+            try:
+                from .history import HistoryStore
+                self._history = HistoryStore(capacity=SPARKLINE_HISTORY)
+            except ImportError:
+                logging.info("numpy not installed - sparkline restarts empty when the GPU count changes")
 
         # Create status bar item
         self.statusbar = NSStatusBar.systemStatusBar()
@@ -246,10 +291,17 @@ class GPUMonitorApp(NSObject):
         self.statusitem.setMenu_(self.menu)
 
         # State
-        self._lock = threading.Lock()
-        self._icon_path = None
+        self.presenter = StatusItemPresenter(self.statusitem)
         self._is_sleeping = False
         self._last_gpu_data = None
+        self._snapshot_store = LastSnapshotStore(os.environ.get('GPU_SNAPSHOT_CACHE', DEFAULT_SNAPSHOT_PATH))
+        # Every timer tick finds the data older than the TTL and revalidates it
+        self.cache = SnapshotCache(
+            self._fetch,
+            fresh_ttl=self.refresh_interval / 2,
+            max_staleness=max(self.max_staleness, self.refresh_interval / 2),
+            on_update=self._snapshot_updated
+        )
 
         # Register for sleep/wake notifications
         workspace = NSWorkspace.sharedWorkspace()
@@ -262,9 +314,14 @@ class GPUMonitorApp(NSObject):
             self, "systemDidWake:", "NSWorkspaceDidWakeNotification", None
         )
 
-        # Initial refresh
+        # Warm start: show the last known data right away, then fetch live
+        # data in the background so the first SSH handshake never blocks launch
         logging.info(f"Application started, monitoring {self.hostname}")
-        self.refreshData_(None)
+        cached = self._snapshot_store.load(self.hostname, max_age=WARM_START_MAX_AGE)
+        if cached is not None:
+            self.cache.put(cached.data, age=cached.age())
+            self._display_gpu_data(cached.data, stale_age=cached.age())
+        self.cache.refresh(self.hostname)
 
         # Set up timer for auto-refresh
         self.timer = NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
@@ -293,127 +350,158 @@ class GPUMonitorApp(NSObject):
             )
 
     def refreshData_(self, timer):
-        """Refresh GPU data from remote server."""
+        """Refresh GPU data from remote server (in the background)."""
         if self._is_sleeping:
             logging.info("Skipping refresh - system is sleeping")
             return
 
-        with self._lock:
-            # Fetch GPU data
-            gpu_data = fetch_gpu_data(self.hostname, self.ssh_user, timeout=10)
-
-            if gpu_data is None or not gpu_data.gpus:
-                # Error state
-                self._show_error_state()
-                return
+        # Never blocks; the menu is updated from _snapshot_updated
+        self.cache.get(self.hostname)
 
-            self._last_gpu_data = gpu_data
+    def _fetch(self, hostname: str) -> Optional[GPUData]:
+        """Blocking fetch used by the snapshot cache (runs on a worker thread)."""
+        return fetch_gpu_data(hostname, self.ssh_user, timeout=10)
 
-            # Update icon
-            try:
-                if len(gpu_data.gpus) >= 2:
-                    icon_bytes = create_dual_gpu_icon(
-                        gpu_data.gpus[0].utilization,
-                        gpu_data.gpus[1].utilization
-                    )
-                elif len(gpu_data.gpus) == 1:
-                    icon_bytes = create_single_gpu_icon(gpu_data.gpus[0].utilization)
-                else:
-                    icon_bytes = create_error_icon()
-
-                # Save icon to temporary file
-                if self._icon_path:
-                    try:
-                        os.unlink(self._icon_path)
-                    except:
-                        pass
-
-                fd, self._icon_path = tempfile.mkstemp(suffix='.png')
-                os.write(fd, icon_bytes)
-                os.close(fd)
-
-                # Load and set image
-                image = NSImage.alloc().initWithContentsOfFile_(self._icon_path)
-                if image:
-                    image.setTemplate_(False)
-                    image.setSize_((18, 18))
-                    self.statusitem.setImage_(image)
-                    # Show percentages if enabled (optional)
-                    if self.show_percentages:
-                        label = f" {int(gpu_data.gpus[0].utilization)}%/{int(gpu_data.gpus[1].utilization if len(gpu_data.gpus) > 1 else 0)}%"
-                        self.statusitem.setTitle_(label)
-                    else:
-                        self.statusitem.setTitle_("")
-            except Exception as e:
-                logging.error(f"Error creating icon: {e}")
-                self.statusitem.setTitle_("GPU")
-
-            # Update menu items
+    def _snapshot_updated(self, snapshot: CachedSnapshot):
+        """Persist a revalidated snapshot and redraw on the main thread."""
+        try:
+            self._snapshot_store.record(snapshot)
+        except OSError as e:
+            logging.error(f"Error saving snapshot cache: {e}")
+        self.performSelectorOnMainThread_withObject_waitUntilDone_("snapshotUpdated:", None, False)
+
+    def snapshotUpdated_(self, _):
+        """Show the latest cached snapshot (runs on the main thread)."""
+        self._show_snapshot(self.cache.get(self.hostname))
+
+    def _show_snapshot(self, snapshot: CachedSnapshot):
+        """Display a cached snapshot according to its state."""
+        if snapshot.state == SNAPSHOT_FRESH:
+            # Redraws of data already shown do not add a sparkline sample
+            new_sample = snapshot.data is not self._last_gpu_data
+            self._last_gpu_data = snapshot.data
+            self._display_gpu_data(snapshot.data, new_sample=new_sample)
+        elif snapshot.state == SNAPSHOT_STALE:
+            self._display_gpu_data(snapshot.data, stale_age=snapshot.age, failed=snapshot.error is not None)
+        elif snapshot.state == SNAPSHOT_ERROR:
+            self._show_error_state()
+        # SNAPSHOT_PENDING: keep showing whatever is there until the first fetch finishes
+
+    def _display_gpu_data(
+        self,
+        gpu_data: GPUData,
+        stale_age: Optional[float] = None,
+        failed: bool = False,
+        new_sample: bool = False
+    ):
+        """
+        Update the icon and menu from a snapshot.
+
+        Args:
+            gpu_data: Snapshot to show
+            stale_age: Seconds since a cached snapshot was taken (None for live data)
+            failed: The last refresh of stale data failed
+            new_sample: gpu_data is a newly fetched snapshot (advances the sparkline)
+        """
+        # Update icon
+        try:
+            if self.icon_mode == 'sparkline':
+                icon_bytes = self._sparkline_icon(gpu_data, new_sample)
+            elif len(gpu_data.gpus) > 2:
+                icon_bytes = create_multi_gpu_icon([gpu.utilization for gpu in gpu_data.gpus])
+            elif len(gpu_data.gpus) == 2:
+                icon_bytes = create_dual_gpu_icon(
+                    gpu_data.gpus[0].utilization,
+                    gpu_data.gpus[1].utilization
+                )
+            elif len(gpu_data.gpus) == 1:
+                icon_bytes = create_single_gpu_icon(gpu_data.gpus[0].utilization)
+            else:
+                icon_bytes = create_error_icon()
+
+            # Show percentages if enabled (optional)
+            label = ""
+            if self.show_percentages:
+                label = f" {int(gpu_data.gpus[0].utilization)}%/{int(gpu_data.gpus[1].utilization if len(gpu_data.gpus) > 1 else 0)}%"
+            if stale_age is not None:
+                label += f" ({format_age(stale_age)} ago)"
+            self.presenter.present(IconBuffer.from_png(icon_bytes), label)
+        except Exception as e:
+            logging.error(f"Error creating icon: {e}")
+            self.statusitem.setTitle_("GPU")
+
+        # Update menu items
+        if stale_age is not None:
+            status = "last refresh failed" if failed else "refreshing..."
+            self.timestamp_item.setTitle_(
+                f"Updated: {gpu_data.timestamp} ({format_age(stale_age)} ago) - {status}"
+            )
+        else:
             self.timestamp_item.setTitle_(f"Updated: {gpu_data.timestamp}")
 
-            # GPU 0
-            if len(gpu_data.gpus) >= 1:
-                gpu0 = gpu_data.gpus[0]
-                self.gpu0_title.setTitle_(f"GPU 0")
-                self.gpu0_util_bar.setAttributedTitle_(
-                    create_colored_progress_bar(gpu0.utilization, label="Util:")
-                )
-                self.gpu0_memory_bar.setAttributedTitle_(
-                    create_colored_progress_bar(gpu0.memory_percent, label="Mem:")
-                )
-                # Convert MB to GB
-                memory_used_gb = gpu0.memory_used / 1024
-                memory_total_gb = gpu0.memory_total / 1024
-                self.gpu0_info.setTitle_(
-                    f"  {memory_used_gb:.1f}GB/{memory_total_gb:.1f}GB | {gpu0.temperature}°C | {gpu0.power_draw:.1f}W"
-                )
+        # GPU 0
+        if len(gpu_data.gpus) >= 1:
+            gpu0 = gpu_data.gpus[0]
+            self.gpu0_title.setTitle_(f"GPU 0")
+            self.gpu0_util_bar.setAttributedTitle_(
+                create_colored_progress_bar(gpu0.utilization, label="Util:")
+            )
+            self.gpu0_memory_bar.setAttributedTitle_(
+                create_colored_progress_bar(gpu0.memory_percent, label="Mem:")
+            )
+            # Convert MB to GB
+            memory_used_gb = gpu0.memory_used / 1024
+            memory_total_gb = gpu0.memory_total / 1024
+            self.gpu0_info.setTitle_(
+                f"  {memory_used_gb:.1f}GB/{memory_total_gb:.1f}GB | {gpu0.temperature}°C | {gpu0.power_draw:.1f}W"
+            )
 
-            # GPU 1
-            if len(gpu_data.gpus) >= 2:
-                gpu1 = gpu_data.gpus[1]
-                self.gpu1_title.setTitle_(f"GPU 1")
-                self.gpu1_util_bar.setAttributedTitle_(
-                    create_colored_progress_bar(gpu1.utilization, label="Util:")
-                )
-                self.gpu1_memory_bar.setAttributedTitle_(
-                    create_colored_progress_bar(gpu1.memory_percent, label="Mem:")
-                )
-                # Convert MB to GB
-                memory_used_gb = gpu1.memory_used / 1024
-                memory_total_gb = gpu1.memory_total / 1024
-                self.gpu1_info.setTitle_(
-                    f"  {memory_used_gb:.1f}GB/{memory_total_gb:.1f}GB | {gpu1.temperature}°C | {gpu1.power_draw:.1f}W"
-                )
-            else:
-                # Hide GPU 1 items if only one GPU
-                self.gpu1_title.setTitle_("GPU 1: Not available")
-                self.gpu1_util_bar.setTitle_("")
-                self.gpu1_memory_bar.setTitle_("")
-                self.gpu1_info.setTitle_("")
+        # GPU 1
+        if len(gpu_data.gpus) >= 2:
+            gpu1 = gpu_data.gpus[1]
+            self.gpu1_title.setTitle_(f"GPU 1")
+            self.gpu1_util_bar.setAttributedTitle_(
+                create_colored_progress_bar(gpu1.utilization, label="Util:")
+            )
+            self.gpu1_memory_bar.setAttributedTitle_(
+                create_colored_progress_bar(gpu1.memory_percent, label="Mem:")
+            )
+            # Convert MB to GB
+            memory_used_gb = gpu1.memory_used / 1024
+            memory_total_gb = gpu1.memory_total / 1024
+            self.gpu1_info.setTitle_(
+                f"  {memory_used_gb:.1f}GB/{memory_total_gb:.1f}GB | {gpu1.temperature}°C | {gpu1.power_draw:.1f}W"
+            )
+        else:
+            # Hide GPU 1 items if only one GPU
+            self.gpu1_title.setTitle_("GPU 1: Not available")
+            self.gpu1_util_bar.setTitle_("")
+            self.gpu1_memory_bar.setTitle_("")
+            self.gpu1_info.setTitle_("")
+
+    def _sparkline_icon(self, gpu_data: GPUData, new_sample: bool) -> bytes:
+        """Render the sparkline, scrolling it one column only for new samples."""
+        gpu_ids = [gpu.gpu_id for gpu in gpu_data.gpus]
+        if new_sample and self._history is not None:
+            self._history.record(gpu_data)
+
+        if self._sparkline is None or self._sparkline.gpu_count != len(gpu_ids):
+            if self._history is not None:
+                # Already includes gpu_data if it is a new sample
+                self._sparkline = SparklineIcon.from_history(self._history, gpu_data.hostname, gpu_ids)
+                return self._sparkline.to_png()
+            self._sparkline = SparklineIcon(len(gpu_ids))
+
+        if new_sample:
+            return self._sparkline.push([gpu.utilization for gpu in gpu_data.gpus])
+        return self._sparkline.to_png()
 
     def _show_error_state(self):
         """Show error state in menu when data fetch fails."""
         try:
-            icon_bytes = create_error_icon()
-            if self._icon_path:
-                try:
-                    os.unlink(self._icon_path)
-                except:
-                    pass
-
-            fd, self._icon_path = tempfile.mkstemp(suffix='.png')
-            os.write(fd, icon_bytes)
-            os.close(fd)
-
-            image = NSImage.alloc().initWithContentsOfFile_(self._icon_path)
-            if image:
-                image.setTemplate_(False)
-                image.setSize_((18, 18))
-                self.statusitem.setImage_(image)
-                self.statusitem.setTitle_("")
-        except:
-            self.statusitem.setTitle_("⚠️")
-            self.statusitem.setImage_(None)
+            self.presenter.present(IconBuffer.from_png(create_error_icon()))
+        except Exception:
+            self.presenter.clear("⚠️")
 
         self.timestamp_item.setTitle_("⚠️  Failed to connect to GPU server")
         self.gpu0_util_bar.setTitle_(f"Check SSH access to {self.hostname}")
@@ -459,7 +547,7 @@ class GPUMonitorApp(NSObject):
     def manualRefresh_(self, sender):
         """Handle manual refresh button click."""
         logging.info("Manual refresh triggered")
-        self.refreshData_(None)
+        self.cache.refresh(self.hostname)
 
     def toggleVisibility_(self, sender):
         """Toggle visibility in Cmd+Tab and Launchpad."""
@@ -524,12 +612,7 @@ class GPUMonitorApp(NSObject):
 
         if self.timer:
             self.timer.invalidate()
-
-        if self._icon_path:
-            try:
-                os.unlink(self._icon_path)
-            except:
-                pass
+        self.cache.close()
 
         # Close SSH connection
         try:
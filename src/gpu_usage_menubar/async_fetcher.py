@@ -0,0 +1,228 @@
+"""
+Asyncio-based GPU data fetcher.
+Runs the same commands as gpu_fetcher through the asyncio methods of the
+active transport (asyncio subprocesses for SSH), so one event loop can poll
+many hosts without a thread per host.
+"""
+
+import asyncio
+import datetime
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, Optional, Tuple, Union, AsyncIterator
+
+from .gpu_fetcher import (
+    GPUData, HostResult, NVIDIA_SMI_FULL_QUERY, SSH_CONNECTION_ERROR,
+    get_ssh_manager, parse_poll_output, select_poll_query, _describe_fetch_error
+)
+from .transport import Transport
+
+
+class AsyncSSHConnectionManager:
+    """
+    Asyncio counterpart of SSHConnectionManager.
+
+    Runs commands through the asyncio methods of the sync manager's active
+    transport and shares its connection state, so connections opened here
+    are shared with (and cleaned up by) the rest of the app, and
+    set_transport() applies to both.
+    """
+
+    def __init__(self):
+        self._sync_manager = get_ssh_manager()
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def transport(self) -> Transport:
+        """The transport commands are currently run through."""
+        return self._sync_manager.transport
+
+    def _get_lock(self, hostname: str, ssh_user: Optional[str]) -> asyncio.Lock:
+        """Get the lock serializing master setup for a host."""
+        key = self._sync_manager._get_host_string(hostname, ssh_user)
+        if key not in self._host_locks:
+            self._host_locks[key] = asyncio.Lock()
+        return self._host_locks[key]
+
+    async def ensure_connection(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
+        """
+        Ensure a master SSH connection exists for the given host.
+
+        Returns:
+            True if connection is ready, False if failed
+        """
+        manager = self._sync_manager
+
+        # Connection state (backoff, circuit breaker) is shared with the sync manager
+        if manager.is_circuit_open(hostname, ssh_user):
+            return False
+
+        async with self._get_lock(hostname, ssh_user):
+            if manager.is_recently_verified(hostname, ssh_user):
+                return True
+
+            transport = self.transport
+            if transport.has_connection(hostname, ssh_user) and await transport.check_async(hostname, ssh_user):
+                manager.record_success(hostname, ssh_user)
+                return True  # Connection is alive
+
+            if await transport.connect_async(hostname, ssh_user, timeout):
+                manager.record_connected(hostname, ssh_user)
+                return True
+
+            manager.record_failure(hostname, ssh_user)
+            return False
+
+    async def run(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """
+        Run a command on the host through the active transport.
+
+        Failures count against the host's state like SSHConnectionManager.run.
+
+        Returns:
+            The command's stdout
+        """
+        manager = self._sync_manager
+        try:
+            output = await self.transport.run_async(hostname, ssh_user, command, timeout)
+        except subprocess.TimeoutExpired:
+            manager.record_failure(hostname, ssh_user)
+            raise
+        except subprocess.CalledProcessError as e:
+            if e.returncode == SSH_CONNECTION_ERROR:
+                manager.record_failure(hostname, ssh_user)
+            raise
+
+        manager.record_success(hostname, ssh_user)
+        return output
+
+    async def close_connection(self, hostname: str, ssh_user: Optional[str] = None):
+        """Close the master connection for a specific host."""
+        await self.transport.close_async(hostname, ssh_user)
+
+
+# Global async connection manager instance
+_async_ssh_manager = None
+
+def get_async_ssh_manager() -> AsyncSSHConnectionManager:
+    """Get the singleton async SSH connection manager."""
+    global _async_ssh_manager
+    if _async_ssh_manager is None:
+        _async_ssh_manager = AsyncSSHConnectionManager()
+    return _async_ssh_manager
+
+
+async def _async_fetch_gpu_data(hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> Optional[GPUData]:
+    """Fetch GPU data asynchronously, raising on SSH failures."""
+    ssh_manager = get_async_ssh_manager()
+    sync_manager = get_ssh_manager()
+    if not await ssh_manager.ensure_connection(hostname, ssh_user, timeout):
+        raise ConnectionError(
+            f"SSH connection to {hostname} is {sync_manager.get_connection_state(hostname, ssh_user)}"
+        )
+
+    # Same static/dynamic split as gpu_fetcher.fetch_gpu_data, sharing its inventory cache
+    generation = sync_manager.get_connection_generation(hostname, ssh_user)
+    query, inventory = select_poll_query(hostname, ssh_user, generation)
+    output = await ssh_manager.run(hostname, ssh_user, query, timeout)
+    gpus = parse_poll_output(hostname, ssh_user, generation, output, inventory)
+    if gpus is None:
+        output = await ssh_manager.run(hostname, ssh_user, NVIDIA_SMI_FULL_QUERY, timeout)
+        gpus = parse_poll_output(hostname, ssh_user, generation, output, None)
+    if not gpus:
+        return None
+
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    return GPUData(gpus=gpus, hostname=hostname, timestamp=timestamp)
+
+
+async def async_fetch_gpu_data(hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> Optional[GPUData]:
+    """
+    Fetch GPU utilization data from a remote server via SSH, asynchronously.
+
+    Behaves like gpu_fetcher.fetch_gpu_data but never blocks the event loop.
+    Cancelling the awaiting task kills the underlying ssh process.
+
+    Args:
+        hostname: Remote server hostname or IP
+        ssh_user: SSH username (defaults to current user if None)
+        timeout: Command timeout in seconds
+
+    Returns:
+        GPUData object with all GPU information, or None if failed
+    """
+    try:
+        return await _async_fetch_gpu_data(hostname, ssh_user, timeout)
+    except subprocess.TimeoutExpired:
+        print(f"Error: SSH command timed out after {timeout} seconds", file=sys.stderr)
+        return None
+    except subprocess.CalledProcessError as e:
+        print(f"Error: SSH command failed: {e.stderr}", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"Error fetching GPU data: {e}", file=sys.stderr)
+        return None
+
+
+async def async_fetch_many(
+    hosts: Iterable[Union[str, Tuple[str, Optional[str]]]],
+    ssh_user: Optional[str] = None,
+    timeout: int = 10,
+    max_concurrency: int = 64,
+    deadline: Optional[float] = None
+) -> AsyncIterator[HostResult]:
+    """
+    Fetch GPU data from many hosts on the running event loop.
+
+    Asyncio counterpart of gpu_fetcher.fetch_many. Hosts still pending when
+    the deadline expires are cancelled (killing their ssh processes) and
+    reported as errors.
+
+    Yields:
+        HostResult for every host, in completion order
+    """
+    targets = []
+    seen = set()
+    for host in hosts:
+        target = (host, ssh_user) if isinstance(host, str) else (host[0], host[1])
+        if target not in seen:
+            seen.add(target)
+            targets.append(target)
+
+    if not targets:
+        return
+
+    start = time.monotonic()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch_one(hostname: str, user: Optional[str]) -> HostResult:
+        async with semaphore:
+            try:
+                data = await _async_fetch_gpu_data(hostname, user, timeout)
+            except (subprocess.TimeoutExpired, subprocess.CalledProcessError, OSError) as e:
+                return HostResult(hostname, None, _describe_fetch_error(e, timeout), time.monotonic() - start)
+        if data is None:
+            return HostResult(hostname, None, "No GPU data returned", time.monotonic() - start)
+        return HostResult(hostname, data, None, time.monotonic() - start)
+
+    tasks = {asyncio.ensure_future(fetch_one(h, u)): h for h, u in targets}
+    try:
+        pending = set(tasks)
+        while pending:
+            remaining = None if deadline is None else deadline - (time.monotonic() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+        elapsed = time.monotonic() - start
+        for task in pending:
+            task.cancel()
+            yield HostResult(tasks[task], None, f"Deadline of {deadline} seconds exceeded", elapsed)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,187 @@
+"""
+Vectorized bulk parser for nvidia-smi CSV output.
+Parses the output of many hosts in one pass into NumPy columns instead of
+building one GPUInfo dataclass per row. Requires numpy (optional dependency).
+"""
+
+from itertools import repeat
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from .gpu_fetcher import GPUData, GPUInfo
+
+
+class BulkGPUTable(NamedTuple):
+    """Columnar GPU data for many hosts; row i of every array is one GPU."""
+    hosts: List[str]            # Host names; host_index points into this list
+    host_index: np.ndarray      # int32
+    gpu_id: np.ndarray          # int32
+    name: np.ndarray            # str
+    uuid: np.ndarray            # str ("" if not queried)
+    utilization: np.ndarray     # float64, percent
+    memory_used: np.ndarray     # int64, MB
+    memory_total: np.ndarray    # int64, MB
+    memory_percent: np.ndarray  # float64, percent
+    temperature: np.ndarray     # int32, Celsius
+    power_draw: np.ndarray      # float64, Watts
+
+    def __len__(self) -> int:
+        return len(self.gpu_id)
+
+    def to_gpu_data(self, timestamp: str = "") -> List[GPUData]:
+        """Convert back to one GPUData per host (for callers that need objects)."""
+        by_host: Dict[int, List[GPUInfo]] = {}
+        for i in range(len(self)):
+            by_host.setdefault(int(self.host_index[i]), []).append(GPUInfo(
+                gpu_id=int(self.gpu_id[i]),
+                name=str(self.name[i]),
+                utilization=float(self.utilization[i]),
+                memory_used=int(self.memory_used[i]),
+                memory_total=int(self.memory_total[i]),
+                memory_percent=float(self.memory_percent[i]),
+                temperature=int(self.temperature[i]),
+                power_draw=float(self.power_draw[i]),
+                uuid=str(self.uuid[i]) or None
+            ))
+        return [GPUData(gpus=gpus, hostname=self.hosts[h], timestamp=timestamp) for h, gpus in by_host.items()]
+
+
+# Numeric columns of the standard query: (key, column, dtype). Integer
+# columns are converted with int() semantics, like parse_gpu_csv, so "45.0"
+# is rejected rather than truncated.
+_NUMERIC_COLUMNS = (
+    ("gpu_id", 0, np.int64),
+    ("utilization", 2, np.float64),
+    ("memory_used", 3, np.int64),
+    ("memory_total", 4, np.int64),
+    ("temperature", 5, np.int64),
+    ("power_draw", 6, np.float64),
+)
+
+
+def _parse_numeric(values: List[str], dtype) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a column of strings the way int()/float() would.
+
+    Returns:
+        (values, ok) where ok is False for unparsable entries (their value is 0)
+    """
+    try:
+        return np.array(values, dtype=dtype), np.ones(len(values), dtype=bool)
+    except (ValueError, OverflowError):
+        # Slow path only for columns that contain [N/A] or garbage
+        convert = int if dtype == np.int64 else float
+        parsed = np.zeros(len(values), dtype=dtype)
+        ok = np.ones(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = convert(value)
+            except (ValueError, OverflowError):
+                ok[i] = False
+        return parsed, ok
+
+
+def _empty_table(hosts: List[str]) -> BulkGPUTable:
+    return BulkGPUTable(
+        hosts=hosts,
+        host_index=np.empty(0, np.int32),
+        gpu_id=np.empty(0, np.int32),
+        name=np.empty(0, str),
+        uuid=np.empty(0, str),
+        utilization=np.empty(0, np.float64),
+        memory_used=np.empty(0, np.int64),
+        memory_total=np.empty(0, np.int64),
+        memory_percent=np.empty(0, np.float64),
+        temperature=np.empty(0, np.int32),
+        power_draw=np.empty(0, np.float64),
+    )
+
+
+def parse_bulk(outputs: Union[Mapping[str, str], Iterable[Tuple[str, str]]]) -> BulkGPUTable:
+    """
+    Parse nvidia-smi ``--query-gpu`` CSV output for many hosts at once.
+
+    Accepts the same columns as gpu_fetcher.parse_gpu_csv (index, name,
+    utilization.gpu, memory.used, memory.total, temperature.gpu, power.draw,
+    optionally uuid) and keeps its tolerance: rows with too few fields,
+    ``[N/A]`` or other unparsable numbers are dropped, so the result holds
+    exactly the GPUs parse_gpu_csv would return.
+
+    Args:
+        outputs: Mapping (or pairs) of hostname to raw nvidia-smi stdout
+
+    Returns:
+        BulkGPUTable with one row per valid GPU, in input order
+    """
+    items = list(outputs.items()) if isinstance(outputs, Mapping) else list(outputs)
+    hosts = [host for host, _ in items]
+
+    # Split every host's output into lines and remember which host each came from
+    per_host_lines = [output.strip().split('\n') for _, output in items]
+    lines = [line for host_lines in per_host_lines for line in host_lines]
+    if not lines:
+        return _empty_table(hosts)
+    counts = np.fromiter(map(len, per_host_lines), dtype=np.int64, count=len(items))
+    line_host = np.repeat(np.arange(len(items), dtype=np.int32), counts)
+
+    # Rows are grouped by field count so each group splits into a rectangular
+    # block with a single join/split; in practice there is one group.
+    commas = np.fromiter(map(str.count, lines, repeat(',')), dtype=np.int64, count=len(lines))
+    row_groups = []
+    columns: List[List[str]] = [[] for _ in range(8)]
+    for n_commas in np.unique(commas[commas >= 6]).tolist():
+        rows = np.nonzero(commas == n_commas)[0]
+        fields = ",".join([lines[i] for i in rows.tolist()]).split(",")
+        width = n_commas + 1
+        for j in range(7):
+            columns[j].extend(fields[j::width])
+        columns[7].extend(fields[7::width] if width > 7 else repeat("", len(rows)))
+        row_groups.append(rows)
+
+    if not row_groups:
+        return _empty_table(hosts)
+
+    rows = np.concatenate(row_groups)
+    order = None
+    if len(row_groups) > 1:
+        # Restore input order across groups
+        order = np.argsort(rows, kind="stable")
+        rows = rows[order]
+
+    def column(index: int, dtype) -> Tuple[np.ndarray, np.ndarray]:
+        values, ok = _parse_numeric(columns[index], dtype)
+        return (values, ok) if order is None else (values[order], ok[order])
+
+    def text_column(index: int) -> np.ndarray:
+        values = np.array([value.strip() for value in columns[index]], dtype=str)
+        return values if order is None else values[order]
+
+    # Convert numeric columns, dropping rows with any unparsable value
+    valid = np.ones(len(rows), dtype=bool)
+    numeric: Dict[str, np.ndarray] = {}
+    for key, index, dtype in _NUMERIC_COLUMNS:
+        values, ok = column(index, dtype)
+        valid &= ok
+        numeric[key] = values
+    numeric = {key: values[valid] for key, values in numeric.items()}
+
+    memory_used = numeric["memory_used"]
+    memory_total = numeric["memory_total"]
+    memory_percent = np.zeros(len(memory_used), dtype=np.float64)
+    np.divide(memory_used, memory_total, out=memory_percent, where=memory_total > 0)
+    memory_percent *= 100
+
+    return BulkGPUTable(
+        hosts=hosts,
+        host_index=line_host[rows[valid]],
+        gpu_id=numeric["gpu_id"].astype(np.int32),
+        name=text_column(1)[valid],
+        uuid=text_column(7)[valid],
+        utilization=numeric["utilization"],
+        memory_used=memory_used,
+        memory_total=memory_total,
+        memory_percent=memory_percent,
+        temperature=numeric["temperature"].astype(np.int32),
+        power_draw=numeric["power_draw"],
+    )
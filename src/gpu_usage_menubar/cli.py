@@ -0,0 +1,117 @@
+"""
+Command-line entry point.
+``gpu-usage-monitor`` starts the macOS menu bar app; with ``--headless`` it
+runs the same refresh loop without any GUI, printing JSON lines or text
+summaries, so it also works on Linux machines without PyObjC or Pillow.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="gpu-usage-monitor",
+        description="Monitor GPU utilization on remote servers."
+    )
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the menu bar app and print results to stdout")
+    parser.add_argument("--host", action="append", dest="hosts",
+                        help="GPU server to monitor (repeatable; default: $GPU_SERVER_HOST)")
+    parser.add_argument("--user", default=os.environ.get("GPU_SERVER_USER"),
+                        help="SSH username (default: $GPU_SERVER_USER or current user)")
+    parser.add_argument("--interval", type=float,
+                        default=float(os.environ.get("GPU_REFRESH_INTERVAL", "300")),
+                        help="Seconds between refreshes (default: $GPU_REFRESH_INTERVAL or 300)")
+    parser.add_argument("--count", type=int, default=0,
+                        help="Stop after this many refreshes (default: run forever)")
+    parser.add_argument("--format", choices=("json", "summary"), default="json",
+                        help="Output JSON lines or human-readable summaries")
+    parser.add_argument("--timeout", type=int, default=10, help="Per-host SSH timeout in seconds")
+    parser.add_argument("--composite", action="store_true",
+                        help="Also collect processes, load and memory in the same round trip")
+    parser.add_argument("--fake-gpus", type=int, default=0, metavar="N",
+                        help="Simulate hosts with N GPUs each instead of using SSH (for testing)")
+    return parser.parse_args(argv)
+
+
+def _print_result(result, output_format: str, out):
+    from .gpu_fetcher import format_gpu_summary, gpu_data_to_dict
+
+    if output_format == "json":
+        if result.data is not None:
+            record = gpu_data_to_dict(result.data)
+        else:
+            record = {"hostname": result.hostname, "error": result.error}
+        record["elapsed"] = round(result.elapsed, 3)
+        out.write(json.dumps(record) + "\n")
+    elif result.data is not None:
+        out.write(format_gpu_summary(result.data) + "\n")
+    else:
+        out.write(f"Server: {result.hostname}\n  Error: {result.error}\n\n")
+    out.flush()
+
+
+def run_headless(args: argparse.Namespace, out=None) -> int:
+    """
+    Run the refresh loop without a GUI.
+
+    Args:
+        args: Parsed command-line arguments
+        out: Stream to write results to (default: stdout)
+
+    Returns:
+        Process exit code
+    """
+    from .gpu_fetcher import fetch_many, get_ssh_manager
+
+    out = out or sys.stdout
+    hosts = args.hosts or [os.environ.get("GPU_SERVER_HOST", "ganesha")]
+
+    if args.fake_gpus:
+        from .transport import FakeTransport
+        get_ssh_manager().set_transport(FakeTransport(gpus_per_host=args.fake_gpus))
+
+    refreshes = 0
+    try:
+        while True:
+            started = time.monotonic()
+            for result in fetch_many(hosts, args.user, timeout=args.timeout,
+                                     deadline=args.interval or None, composite=args.composite):
+                _print_result(result, args.format, out)
+
+            refreshes += 1
+            if args.count and refreshes >= args.count:
+                return 0
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the gpu-usage-monitor command."""
+    args = _parse_args(argv)
+    if args.headless:
+        return run_headless(args)
+
+    # The menu bar app is configured through the environment
+    if args.hosts:
+        os.environ["GPU_SERVER_HOST"] = args.hosts[0]
+    if args.user:
+        os.environ["GPU_SERVER_USER"] = args.user
+
+    try:
+        from .app import main as app_main
+    except ImportError as e:
+        print(f"Menu bar app is not available ({e}); use --headless on this platform", file=sys.stderr)
+        return 1
+    app_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
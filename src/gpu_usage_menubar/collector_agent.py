@@ -0,0 +1,412 @@
+"""
+Resident GPU collector agent.
+Runs on the GPU server (deployed over the existing SSH connection by
+gpu_fetcher.deploy_collector), samples the GPUs locally and writes compact
+length-prefixed binary records to stdout for gpu_fetcher.CollectorDecoder.
+
+This module must stay self-contained and use only the standard library,
+since it is copied to servers as a single file.
+
+Wire format (little-endian), one frame per record:
+
+    header   <IB    payload length, record type
+    INVENTORY       <H gpu count, then per GPU: <HI index, memory.total (MB),
+                    <B name length, name (UTF-8)
+    SAMPLE          <dH timestamp, gpu count, then per GPU SAMPLE_GPU.
+                    A full snapshot (keyframe).
+    DELTA           <dH timestamp, changed gpu count, then per changed GPU:
+                    <HB index, field mask, followed by the changed fields of
+                    DELTA_FIELDS in order. GPUs not listed are unchanged since
+                    the previous SAMPLE/DELTA.
+
+With --summary SECONDS the agent instead samples at --interval-ms for the
+whole window and prints one CSV row per GPU with min/mean/max/p95 of each
+metric in SUMMARY_METRICS (see format_summary_csv), then exits.
+"""
+
+import math
+import random
+import struct
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+FRAME_HEADER = struct.Struct("<IB")
+RECORD_INVENTORY = 1
+RECORD_SAMPLE = 2
+RECORD_DELTA = 3
+
+INVENTORY_HEADER = struct.Struct("<H")
+INVENTORY_GPU = struct.Struct("<HI")
+SAMPLE_HEADER = struct.Struct("<dH")
+# index, utilization %, memory used MB, temperature C, power W (NaN if unknown)
+SAMPLE_GPU = struct.Struct("<HfIhf")
+DELTA_HEADER = struct.Struct("<dH")
+DELTA_GPU = struct.Struct("<HB")
+# Dynamic fields in delta records: (GPUSample attribute, mask bit, struct)
+DELTA_FIELDS = (
+    ("utilization", 0x01, struct.Struct("<f")),
+    ("memory_used", 0x02, struct.Struct("<I")),
+    ("temperature", 0x04, struct.Struct("<h")),
+    ("power_draw", 0x08, struct.Struct("<f")),
+)
+
+
+class GPUSample(NamedTuple):
+    """One GPU reading taken on the server."""
+    index: int
+    name: str
+    utilization: float
+    memory_used: int
+    memory_total: int
+    temperature: int
+    power_draw: float
+
+
+def encode_frame(record_type: int, payload: bytes) -> bytes:
+    """Prefix a payload with its frame header."""
+    return FRAME_HEADER.pack(len(payload), record_type) + payload
+
+
+def encode_inventory(samples: List[GPUSample]) -> bytes:
+    """Encode the static GPU inventory (index, name, memory total)."""
+    parts = [INVENTORY_HEADER.pack(len(samples))]
+    for s in samples:
+        name = s.name.encode("utf-8")[:255]
+        parts.append(INVENTORY_GPU.pack(s.index, s.memory_total))
+        parts.append(struct.pack("<B", len(name)) + name)
+    return encode_frame(RECORD_INVENTORY, b"".join(parts))
+
+
+def encode_sample(samples: List[GPUSample], timestamp: float) -> bytes:
+    """Encode one set of dynamic GPU readings."""
+    parts = [SAMPLE_HEADER.pack(timestamp, len(samples))]
+    for s in samples:
+        parts.append(SAMPLE_GPU.pack(s.index, s.utilization, s.memory_used, s.temperature, s.power_draw))
+    return encode_frame(RECORD_SAMPLE, b"".join(parts))
+
+
+def _same_value(a, b) -> bool:
+    """Compare field values after float32 rounding, treating NaN as equal to NaN."""
+    if isinstance(a, float) or isinstance(b, float):
+        a, b = struct.pack("<f", a), struct.pack("<f", b)
+    return a == b
+
+
+def encode_delta(previous: List[GPUSample], samples: List[GPUSample], timestamp: float) -> bytes:
+    """Encode only the dynamic fields that changed since previous."""
+    before = {s.index: s for s in previous}
+    parts = []
+    changed = 0
+    for s in samples:
+        old = before[s.index]
+        mask = 0
+        values = []
+        for attr, bit, fmt in DELTA_FIELDS:
+            value = getattr(s, attr)
+            if not _same_value(value, getattr(old, attr)):
+                mask |= bit
+                values.append(fmt.pack(value))
+        if mask:
+            parts.append(DELTA_GPU.pack(s.index, mask))
+            parts.extend(values)
+            changed += 1
+    return encode_frame(RECORD_DELTA, DELTA_HEADER.pack(timestamp, changed) + b"".join(parts))
+
+
+class SnapshotEncoder:
+    """
+    Chooses between keyframes and deltas for a stream of samples.
+
+    A full SAMPLE keyframe is sent first, whenever the GPU inventory
+    changes, and every keyframe_interval records; everything in between is
+    sent as a DELTA against the previous record.
+    """
+
+    def __init__(self, keyframe_interval: int = 30):
+        """
+        Args:
+            keyframe_interval: Records between keyframes (1 disables deltas)
+        """
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._previous: Optional[List[GPUSample]] = None
+        self._inventory_key = None
+        self._since_keyframe = 0
+
+    def encode(self, samples: List[GPUSample], timestamp: float) -> bytes:
+        """Encode one set of readings, including an inventory frame if needed."""
+        key = tuple((s.index, s.name, s.memory_total) for s in samples)
+        frames = b""
+        if key != self._inventory_key:
+            frames += encode_inventory(samples)
+            self._inventory_key = key
+            self._previous = None  # Force a keyframe after an inventory change
+
+        if self._previous is None or self._since_keyframe + 1 >= self.keyframe_interval:
+            frames += encode_sample(samples, timestamp)
+            self._since_keyframe = 0
+        else:
+            frames += encode_delta(self._previous, samples, timestamp)
+            self._since_keyframe += 1
+
+        self._previous = samples
+        return frames
+
+
+class StubSource:
+    """Synthetic GPU source for testing without a GPU."""
+
+    def __init__(self, gpu_count: int = 2, seed: Optional[int] = 0):
+        self.gpu_count = gpu_count
+        self._rng = random.Random(seed)
+
+    def sample(self) -> List[GPUSample]:
+        return [
+            GPUSample(
+                index=i,
+                name="Stub GPU",
+                utilization=float(self._rng.randint(0, 100)),
+                memory_used=self._rng.randint(0, 16384),
+                memory_total=16384,
+                temperature=self._rng.randint(30, 80),
+                power_draw=round(self._rng.uniform(20, 300), 2)
+            )
+            for i in range(self.gpu_count)
+        ]
+
+
+def _nvml_types():
+    """
+    Import ctypes and define the NVML structs.
+
+    Done on first use so that importing this module (which gpu_fetcher does
+    on the client) does not pay for ctypes.
+    """
+    import ctypes
+    import ctypes.util
+
+    class NvmlUtilization(ctypes.Structure):
+        _fields_ = [("gpu", ctypes.c_uint), ("memory", ctypes.c_uint)]
+
+    class NvmlMemory(ctypes.Structure):
+        _fields_ = [("total", ctypes.c_ulonglong), ("free", ctypes.c_ulonglong), ("used", ctypes.c_ulonglong)]
+
+    return ctypes, NvmlUtilization, NvmlMemory
+
+
+class NvmlSource:
+    """GPU source that reads NVML directly through ctypes (no process spawn per sample)."""
+
+    def __init__(self):
+        ctypes, self._Utilization, self._Memory = _nvml_types()
+        self._ctypes = ctypes
+        path = ctypes.util.find_library("nvidia-ml") or "libnvidia-ml.so.1"
+        self._nvml = ctypes.CDLL(path)
+        self._check(self._nvml.nvmlInit_v2())
+        count = ctypes.c_uint()
+        self._check(self._nvml.nvmlDeviceGetCount_v2(ctypes.byref(count)))
+        self._handles = []
+        self._names = []
+        for i in range(count.value):
+            handle = ctypes.c_void_p()
+            self._check(self._nvml.nvmlDeviceGetHandleByIndex_v2(i, ctypes.byref(handle)))
+            name = ctypes.create_string_buffer(96)
+            self._check(self._nvml.nvmlDeviceGetName(handle, name, 96))
+            self._handles.append(handle)
+            self._names.append(name.value.decode("utf-8", "replace"))
+
+    @staticmethod
+    def _check(status: int):
+        if status != 0:
+            raise RuntimeError(f"NVML call failed with status {status}")
+
+    def sample(self) -> List[GPUSample]:
+        ctypes = self._ctypes
+        samples = []
+        for i, handle in enumerate(self._handles):
+            util = self._Utilization()
+            mem = self._Memory()
+            temp = ctypes.c_uint()
+            power = ctypes.c_uint()
+            self._check(self._nvml.nvmlDeviceGetUtilizationRates(handle, ctypes.byref(util)))
+            self._check(self._nvml.nvmlDeviceGetMemoryInfo(handle, ctypes.byref(mem)))
+            self._check(self._nvml.nvmlDeviceGetTemperature(handle, 0, ctypes.byref(temp)))
+            # Power readings are not supported on every GPU
+            power_w = power.value / 1000 if self._nvml.nvmlDeviceGetPowerUsage(handle, ctypes.byref(power)) == 0 else math.nan
+            samples.append(GPUSample(
+                index=i,
+                name=self._names[i],
+                utilization=float(util.gpu),
+                memory_used=mem.used // (1024 * 1024),
+                memory_total=mem.total // (1024 * 1024),
+                temperature=temp.value,
+                power_draw=power_w
+            ))
+        return samples
+
+
+class NvidiaSmiSource:
+    """Fallback GPU source that runs nvidia-smi locally on the server."""
+
+    QUERY = [
+        "nvidia-smi",
+        "--query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw",
+        "--format=csv,noheader,nounits",
+    ]
+
+    def sample(self) -> List[GPUSample]:
+        output = subprocess.run(self.QUERY, capture_output=True, text=True, check=True).stdout
+        samples = []
+        for line in output.strip().split("\n"):
+            parts = [p.strip() for p in line.split(",")]
+            if len(parts) < 7:
+                continue
+            try:
+                power = float(parts[6])
+            except ValueError:
+                power = math.nan
+            try:
+                samples.append(GPUSample(
+                    index=int(parts[0]),
+                    name=parts[1],
+                    utilization=float(parts[2]),
+                    memory_used=int(parts[3]),
+                    memory_total=int(parts[4]),
+                    temperature=int(parts[5]),
+                    power_draw=power
+                ))
+            except ValueError:
+                continue
+        return samples
+
+
+def open_source(stub_gpus: Optional[int] = None, seed: Optional[int] = 0):
+    """Pick the best available GPU source on this machine."""
+    if stub_gpus is not None:
+        return StubSource(stub_gpus, seed)
+    try:
+        return NvmlSource()
+    except (OSError, AttributeError, RuntimeError):
+        return NvidiaSmiSource()
+
+
+def run(source, out, interval: float, count: Optional[int] = None, keyframe_interval: int = 30):
+    """
+    Sample the source every interval seconds and write frames to out.
+
+    An inventory frame is written first and again whenever the set of GPUs
+    changes; readings are sent as periodic keyframes plus deltas (see
+    SnapshotEncoder). Runs until count samples were written (forever if None).
+    """
+    encoder = SnapshotEncoder(keyframe_interval)
+    written = 0
+    next_time = time.monotonic()
+    while count is None or written < count:
+        out.write(encoder.encode(source.sample(), time.time()))
+        out.flush()
+        written += 1
+
+        next_time += interval
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_time = time.monotonic()  # Fell behind; don't burst to catch up
+
+
+# Metrics summarized by --summary, in output column order
+SUMMARY_METRICS = ("utilization", "memory_used", "temperature", "power_draw")
+
+
+def summarize_values(values: List[float]) -> Tuple[float, float, float, float]:
+    """
+    Compute (min, mean, max, p95) of a list of readings.
+
+    NaN readings (e.g. unsupported power draw) are ignored; if nothing is
+    left every statistic is NaN. p95 uses the nearest-rank method.
+    """
+    values = sorted(v for v in values if not math.isnan(v))
+    if not values:
+        return (math.nan, math.nan, math.nan, math.nan)
+    rank = max(0, math.ceil(0.95 * len(values)) - 1)
+    return (values[0], sum(values) / len(values), values[-1], values[rank])
+
+
+def collect_summary(source, duration: float, interval: float) -> List[Tuple[GPUSample, int, Dict[str, Tuple]]]:
+    """
+    Sample the source for duration seconds and summarize each GPU.
+
+    Returns:
+        One (last sample, sample count, {metric: (min, mean, max, p95)})
+        tuple per GPU seen during the window
+    """
+    readings: Dict[int, Dict[str, List[float]]] = {}
+    last: Dict[int, GPUSample] = {}
+    end = time.monotonic() + duration
+    next_time = time.monotonic()
+    while True:
+        for s in source.sample():
+            series = readings.setdefault(s.index, {m: [] for m in SUMMARY_METRICS})
+            for metric in SUMMARY_METRICS:
+                series[metric].append(float(getattr(s, metric)))
+            last[s.index] = s
+
+        next_time += interval
+        if next_time >= end:
+            break
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    return [
+        (last[i], len(readings[i]["utilization"]),
+         {m: summarize_values(readings[i][m]) for m in SUMMARY_METRICS})
+        for i in sorted(last)
+    ]
+
+
+def format_summary_csv(summary) -> str:
+    """
+    Format collect_summary() output as CSV.
+
+    Columns: index, name, memory.total, sample count, then min, mean, max,
+    p95 for each metric in SUMMARY_METRICS.
+    """
+    lines = []
+    for sample, count, stats in summary:
+        fields = [str(sample.index), sample.name, str(sample.memory_total), str(count)]
+        for metric in SUMMARY_METRICS:
+            fields.extend(f"{v:.3f}" for v in stats[metric])
+        lines.append(", ".join(fields))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GPU collector agent for gpu_usage_menubar")
+    parser.add_argument("--interval-ms", type=int, default=1000, help="Sampling interval in milliseconds")
+    parser.add_argument("--count", type=int, default=None, help="Stop after this many samples")
+    parser.add_argument("--stub", type=int, default=None, metavar="N", help="Emit synthetic data for N GPUs")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --stub")
+    parser.add_argument("--keyframe-interval", type=int, default=30,
+                        help="Records between full keyframes (1 sends only keyframes)")
+    parser.add_argument("--summary", type=float, default=None, metavar="SECONDS",
+                        help="Sample for SECONDS and print a CSV summary instead of streaming")
+    args = parser.parse_args(argv)
+
+    if args.summary is not None:
+        summary = collect_summary(open_source(args.stub, args.seed), args.summary, args.interval_ms / 1000)
+        sys.stdout.write(format_summary_csv(summary))
+        return
+
+    try:
+        run(open_source(args.stub, args.seed), sys.stdout.buffer, args.interval_ms / 1000,
+            args.count, args.keyframe_interval)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+if __name__ == "__main__":
+    main()
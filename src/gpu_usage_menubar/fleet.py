@@ -0,0 +1,295 @@
+"""
+Struct-of-arrays representation of GPU data for a whole fleet.
+Each metric is one contiguous typed array over all GPUs of all hosts, so
+fleet-wide aggregates are single vectorized operations and a snapshot costs
+a few dozen bytes per GPU instead of a dataclass (and its dict) per GPU.
+Requires numpy (optional dependency).
+"""
+
+import datetime
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .bulk_parser import BulkGPUTable
+from .gpu_fetcher import GPUData, GPUInfo
+
+
+class GPURow:
+    """Read-only GPUInfo-style view of one GPU in a FleetSnapshot."""
+
+    __slots__ = ("_snapshot", "_index")
+
+    def __init__(self, snapshot: "FleetSnapshot", index: int):
+        self._snapshot = snapshot
+        self._index = index
+
+    @property
+    def hostname(self) -> str:
+        snapshot = self._snapshot
+        return snapshot.hosts[int(np.searchsorted(snapshot.offsets, self._index, side="right")) - 1]
+
+    @property
+    def gpu_id(self) -> int:
+        return int(self._snapshot.gpu_id[self._index])
+
+    @property
+    def name(self) -> str:
+        snapshot = self._snapshot
+        return snapshot.names[snapshot.name_index[self._index]]
+
+    @property
+    def uuid(self) -> Optional[str]:
+        uuids = self._snapshot.uuids
+        return None if uuids is None else (uuids[self._index] or None)
+
+    @property
+    def utilization(self) -> float:
+        return float(self._snapshot.utilization[self._index])
+
+    @property
+    def memory_used(self) -> int:
+        return int(self._snapshot.memory_used[self._index])
+
+    @property
+    def memory_total(self) -> int:
+        return int(self._snapshot.memory_total[self._index])
+
+    @property
+    def memory_percent(self) -> float:
+        total = self.memory_total
+        return (self.memory_used / total * 100) if total > 0 else 0
+
+    @property
+    def temperature(self) -> int:
+        return int(self._snapshot.temperature[self._index])
+
+    @property
+    def power_draw(self) -> float:
+        return float(self._snapshot.power_draw[self._index])
+
+    def to_gpu_info(self) -> GPUInfo:
+        """Materialize this row as a GPUInfo dataclass."""
+        return GPUInfo(
+            gpu_id=self.gpu_id,
+            name=self.name,
+            utilization=self.utilization,
+            memory_used=self.memory_used,
+            memory_total=self.memory_total,
+            memory_percent=self.memory_percent,
+            temperature=self.temperature,
+            power_draw=self.power_draw,
+            uuid=self.uuid
+        )
+
+    def __repr__(self) -> str:
+        return f"GPURow(hostname={self.hostname!r}, gpu_id={self.gpu_id}, utilization={self.utilization})"
+
+
+class FleetSnapshot:
+    """
+    GPU data for many hosts at one point in time, stored column-wise.
+
+    GPUs of host ``hosts[h]`` occupy rows ``offsets[h]:offsets[h + 1]`` of
+    every metric array. Metrics are stored with the narrowest dtype that
+    holds nvidia-smi's precision (float32 for percentages and watts, int32
+    for MB, int16 for indices and temperatures); GPU names are interned.
+    """
+
+    __slots__ = (
+        "hosts", "offsets", "timestamp", "gpu_id", "name_index", "names", "uuids",
+        "utilization", "memory_used", "memory_total", "temperature", "power_draw"
+    )
+
+    def __init__(
+        self,
+        hosts: List[str],
+        offsets: np.ndarray,
+        gpu_id: np.ndarray,
+        name_index: np.ndarray,
+        names: List[str],
+        utilization: np.ndarray,
+        memory_used: np.ndarray,
+        memory_total: np.ndarray,
+        temperature: np.ndarray,
+        power_draw: np.ndarray,
+        uuids: Optional[np.ndarray] = None,
+        timestamp: Optional[float] = None
+    ):
+        """
+        Args:
+            hosts: Host names, one per host block
+            offsets: len(hosts) + 1 row offsets delimiting each host's GPUs
+            gpu_id .. power_draw: One value per GPU row
+            names: Distinct GPU names; name_index points into this list
+            uuids: Optional GPU UUIDs ("" where unknown)
+            timestamp: Epoch seconds of the snapshot (default: now)
+        """
+        self.hosts = hosts
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.gpu_id = np.asarray(gpu_id, dtype=np.int16)
+        self.name_index = np.asarray(name_index, dtype=np.int16)
+        self.names = names
+        self.uuids = uuids
+        self.utilization = np.asarray(utilization, dtype=np.float32)
+        self.memory_used = np.asarray(memory_used, dtype=np.int32)
+        self.memory_total = np.asarray(memory_total, dtype=np.int32)
+        self.temperature = np.asarray(temperature, dtype=np.int16)
+        self.power_draw = np.asarray(power_draw, dtype=np.float32)
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @classmethod
+    def from_table(cls, table: BulkGPUTable, timestamp: Optional[float] = None) -> "FleetSnapshot":
+        """Build a snapshot from bulk_parser.parse_bulk output."""
+        # Rows are already grouped by host in input order
+        counts = np.bincount(table.host_index, minlength=len(table.hosts))
+        offsets = np.zeros(len(table.hosts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        names, name_index = np.unique(table.name, return_inverse=True)
+        uuids = table.uuid if np.any(table.uuid != "") else None
+
+        return cls(
+            hosts=list(table.hosts),
+            offsets=offsets,
+            gpu_id=table.gpu_id,
+            name_index=name_index,
+            names=names.tolist(),
+            utilization=table.utilization,
+            memory_used=table.memory_used,
+            memory_total=table.memory_total,
+            temperature=table.temperature,
+            power_draw=table.power_draw,
+            uuids=uuids,
+            timestamp=timestamp
+        )
+
+    @classmethod
+    def from_gpu_data(cls, data: Iterable[GPUData], timestamp: Optional[float] = None) -> "FleetSnapshot":
+        """Build a snapshot from per-host GPUData results."""
+        hosts = []
+        gpus: List[GPUInfo] = []
+        offsets = [0]
+        for gpu_data in data:
+            hosts.append(gpu_data.hostname)
+            gpus.extend(gpu_data.gpus)
+            offsets.append(len(gpus))
+
+        name_lookup: Dict[str, int] = {}
+        name_index = [name_lookup.setdefault(gpu.name, len(name_lookup)) for gpu in gpus]
+        uuids = None
+        if any(gpu.uuid for gpu in gpus):
+            uuids = np.array([gpu.uuid or "" for gpu in gpus], dtype=str)
+
+        return cls(
+            hosts=hosts,
+            offsets=np.array(offsets, dtype=np.int64),
+            gpu_id=[gpu.gpu_id for gpu in gpus],
+            name_index=name_index,
+            names=list(name_lookup),
+            utilization=[gpu.utilization for gpu in gpus],
+            memory_used=[gpu.memory_used for gpu in gpus],
+            memory_total=[gpu.memory_total for gpu in gpus],
+            temperature=[gpu.temperature for gpu in gpus],
+            power_draw=[gpu.power_draw for gpu in gpus],
+            uuids=uuids,
+            timestamp=timestamp
+        )
+
+    def __len__(self) -> int:
+        return len(self.gpu_id)
+
+    def __iter__(self) -> Iterator[GPURow]:
+        return (GPURow(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index: int) -> GPURow:
+        if not -len(self) <= index < len(self):
+            raise IndexError("GPU row index out of range")
+        return GPURow(self, index % len(self))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the metric arrays."""
+        arrays = (self.offsets, self.gpu_id, self.name_index, self.utilization, self.memory_used,
+                  self.memory_total, self.temperature, self.power_draw)
+        total = sum(a.nbytes for a in arrays)
+        if self.uuids is not None:
+            total += self.uuids.nbytes
+        return total
+
+    @property
+    def host_index(self) -> np.ndarray:
+        """Index into hosts for every GPU row."""
+        return np.repeat(np.arange(len(self.hosts), dtype=np.int32), np.diff(self.offsets))
+
+    @property
+    def memory_percent(self) -> np.ndarray:
+        """Memory usage percentage (0-100) for every GPU row."""
+        percent = np.zeros(len(self), dtype=np.float32)
+        np.divide(self.memory_used, self.memory_total, out=percent, where=self.memory_total > 0)
+        return percent * 100
+
+    def host_rows(self, hostname: str) -> slice:
+        """Row slice holding the GPUs of one host."""
+        h = self.hosts.index(hostname)
+        return slice(int(self.offsets[h]), int(self.offsets[h + 1]))
+
+    def row(self, hostname: str, gpu_id: int) -> GPURow:
+        """
+        Get the row view for one GPU.
+
+        Raises:
+            KeyError: If the host or GPU is not in the snapshot
+        """
+        try:
+            rows = self.host_rows(hostname)
+        except ValueError:
+            raise KeyError(hostname) from None
+        matches = np.nonzero(self.gpu_id[rows] == gpu_id)[0]
+        if len(matches) == 0:
+            raise KeyError((hostname, gpu_id))
+        return GPURow(self, rows.start + int(matches[0]))
+
+    def to_gpu_data(self) -> List[GPUData]:
+        """Materialize one GPUData per host (e.g. for format_gpu_summary)."""
+        timestamp = datetime.datetime.fromtimestamp(self.timestamp).strftime("%H:%M:%S")
+        return [
+            GPUData(
+                gpus=[GPURow(self, i).to_gpu_info() for i in range(self.offsets[h], self.offsets[h + 1])],
+                hostname=hostname,
+                timestamp=timestamp
+            )
+            for h, hostname in enumerate(self.hosts)
+        ]
+
+    # Fleet-wide aggregates
+
+    def total_power(self) -> float:
+        """Sum of power draw over all GPUs, in Watts."""
+        return float(self.power_draw.sum(dtype=np.float64))
+
+    def mean_utilization(self) -> float:
+        """Mean GPU utilization over all GPUs (0 for an empty fleet)."""
+        if len(self) == 0:
+            return 0.0
+        return float(self.utilization.mean(dtype=np.float64))
+
+    def free_gpu_count(self, max_utilization: float = 5.0, max_memory_percent: float = 10.0) -> int:
+        """Number of GPUs that are idle enough to take new work."""
+        free = (self.utilization <= max_utilization) & (self.memory_percent <= max_memory_percent)
+        return int(np.count_nonzero(free))
+
+    def utilization_grid(self) -> np.ndarray:
+        """Utilization as a hosts x max-GPUs array, NaN where a host has fewer GPUs."""
+        counts = np.diff(self.offsets)
+        grid = np.full((len(self.hosts), int(counts.max(initial=0))), np.nan, dtype=np.float32)
+        columns = np.arange(len(self)) - np.repeat(self.offsets[:-1], counts)
+        grid[self.host_index, columns] = self.utilization
+        return grid
+
+    def host_mean_utilization(self) -> np.ndarray:
+        """Mean utilization per host, in the order of hosts (0 for hosts without GPUs)."""
+        counts = np.diff(self.offsets)
+        sums = np.bincount(self.host_index, weights=self.utilization, minlength=len(self.hosts))
+        return np.divide(sums, counts, out=np.zeros(len(self.hosts)), where=counts > 0)
@@ -5,11 +5,35 @@ Uses SSH ControlMaster for connection multiplexing (single persistent connection
 """
 
 import subprocess
-import os
-import tempfile
 import atexit
-from typing import Optional, List, NamedTuple
-from dataclasses import dataclass
+import random
+import sys
+import threading
+import time
+from typing import Optional, List, Dict, NamedTuple, Iterable, Iterator, Tuple, Union, BinaryIO
+from dataclasses import asdict, dataclass, replace
+
+from . import collector_agent
+from .transport import Transport, SSHTransport
+
+
+# Exit status ssh uses for its own (connection) errors
+SSH_CONNECTION_ERROR = 255
+
+# Per-host connection states tracked by SSHConnectionManager
+STATE_CONNECTED = "connected"  # Master verified and fetches succeeding
+STATE_DEGRADED = "degraded"    # Recent failures, still retried every cycle
+STATE_DOWN = "down"            # Circuit open, retried only after backoff
+
+
+@dataclass
+class HostConnectionState:
+    """Connection health record for a single SSH host."""
+    state: str = STATE_DEGRADED
+    last_verified: float = 0.0        # time.monotonic() of the last good check/fetch
+    consecutive_failures: int = 0
+    next_attempt_at: float = 0.0      # time.monotonic() before which a DOWN host is skipped
+    generation: int = 0               # Incremented every time a new master connection is opened
 
 
 class SSHConnectionManager:
@@ -18,87 +42,174 @@ class SSHConnectionManager:
 
     This ensures only ONE SSH connection is maintained to the remote server,
     and all subsequent SSH commands reuse this connection through the control socket.
+
+    Each host also has a HostConnectionState. A master that was verified
+    recently is trusted without another ``ssh -O check``. A host that fails
+    FAILURE_THRESHOLD times in a row is marked down, and further attempts are
+    refused until an exponentially growing, jittered backoff has elapsed.
+
+    Commands go through a Transport (SSH by default), so the same logic can
+    be exercised locally or against a FakeTransport via set_transport().
     """
 
     _instance = None
-    _control_dir = None
-    _active_connections = {}  # hostname -> control_path
+    _host_states = {}         # host string -> HostConnectionState
+    _state_lock = threading.Lock()
+
+    CHECK_INTERVAL = 60.0      # Seconds a verified master is trusted without a check
+    FAILURE_THRESHOLD = 3      # Consecutive failures before the circuit opens
+    BACKOFF_BASE = 5.0         # Seconds before the first retry of a down host
+    BACKOFF_MAX = 300.0        # Upper bound on the retry delay
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._control_dir = tempfile.mkdtemp(prefix='gpu_monitor_ssh_')
+            cls._instance.ssh_transport = SSHTransport()
+            cls._instance.transport = cls._instance.ssh_transport
             atexit.register(cls._instance.cleanup_all)
         return cls._instance
 
-    def _get_control_path(self, hostname: str, ssh_user: Optional[str] = None) -> str:
-        """Get the control socket path for a given host."""
-        key = f"{ssh_user}@{hostname}" if ssh_user else hostname
-        return os.path.join(self._control_dir, f"ctrl-{key.replace('@', '_at_')}.sock")
+    def set_transport(self, transport: Optional[Transport] = None) -> Transport:
+        """
+        Route all commands through the given transport.
+
+        Args:
+            transport: Transport to use, or None to restore SSH
+
+        Returns:
+            The previously active transport
+        """
+        previous = self.transport
+        self.transport = transport if transport is not None else self.ssh_transport
+        return previous
 
     def _get_host_string(self, hostname: str, ssh_user: Optional[str] = None) -> str:
         """Get the SSH host string (user@host or just host)."""
         return f"{ssh_user}@{hostname}" if ssh_user else hostname
 
+    def _get_host_state(self, hostname: str, ssh_user: Optional[str] = None) -> HostConnectionState:
+        """Get (creating if needed) the state record for a host."""
+        host_string = self._get_host_string(hostname, ssh_user)
+        with self._state_lock:
+            if host_string not in self._host_states:
+                self._host_states[host_string] = HostConnectionState()
+            return self._host_states[host_string]
+
+    def get_connection_state(self, hostname: str, ssh_user: Optional[str] = None) -> str:
+        """Get the current state (connected/degraded/down) of a host."""
+        return self._get_host_state(hostname, ssh_user).state
+
+    def get_connection_generation(self, hostname: str, ssh_user: Optional[str] = None) -> int:
+        """Get a counter that changes whenever the host is reconnected."""
+        return self._get_host_state(hostname, ssh_user).generation
+
+    def is_circuit_open(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Return True if the host is down and its retry backoff has not elapsed."""
+        state = self._get_host_state(hostname, ssh_user)
+        return state.state == STATE_DOWN and time.monotonic() < state.next_attempt_at
+
+    def is_recently_verified(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Return True if the master was verified within CHECK_INTERVAL."""
+        state = self._get_host_state(hostname, ssh_user)
+        return (
+            state.state == STATE_CONNECTED
+            and time.monotonic() - state.last_verified < self.CHECK_INTERVAL
+            and self.transport.has_connection(hostname, ssh_user)
+        )
+
+    def record_success(self, hostname: str, ssh_user: Optional[str] = None):
+        """Mark the host connected after a successful check, connect or fetch."""
+        state = self._get_host_state(hostname, ssh_user)
+        with self._state_lock:
+            state.state = STATE_CONNECTED
+            state.last_verified = time.monotonic()
+            state.consecutive_failures = 0
+            state.next_attempt_at = 0.0
+
+    def record_connected(self, hostname: str, ssh_user: Optional[str] = None):
+        """Mark a newly opened master connection, invalidating per-connection caches."""
+        state = self._get_host_state(hostname, ssh_user)
+        with self._state_lock:
+            state.generation += 1
+        self.record_success(hostname, ssh_user)
+
+    def record_failure(self, hostname: str, ssh_user: Optional[str] = None):
+        """Mark a connection failure, opening the circuit after repeated failures."""
+        state = self._get_host_state(hostname, ssh_user)
+        with self._state_lock:
+            state.consecutive_failures += 1
+            state.last_verified = 0.0
+            if state.consecutive_failures < self.FAILURE_THRESHOLD:
+                state.state = STATE_DEGRADED
+                return
+
+            # Exponential backoff with jitter so many down hosts don't retry in lockstep
+            exponent = state.consecutive_failures - self.FAILURE_THRESHOLD
+            delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** exponent))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            state.state = STATE_DOWN
+            state.next_attempt_at = time.monotonic() + delay
+
+        print(f"SSH host {self._get_host_string(hostname, ssh_user)} marked down, retrying in {delay:.0f}s", file=sys.stderr)
+
     def ensure_connection(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
         """
         Ensure a master SSH connection exists for the given host.
 
-        If no master connection exists, creates one. If one exists, verifies it's alive.
+        If no master connection exists, creates one. If one exists and was not
+        verified recently, verifies it's alive. Hosts whose circuit is open
+        are refused immediately without spawning ssh.
 
         Returns:
             True if connection is ready, False if failed
         """
-        control_path = self._get_control_path(hostname, ssh_user)
-        host_string = self._get_host_string(hostname, ssh_user)
+        if self.is_circuit_open(hostname, ssh_user):
+            return False
+
+        if self.is_recently_verified(hostname, ssh_user):
+            return True
 
         # Check if master connection already exists and is alive
-        if os.path.exists(control_path):
-            check_cmd = [
-                "ssh", "-O", "check",
-                "-o", f"ControlPath={control_path}",
-                host_string
-            ]
-            try:
-                subprocess.run(check_cmd, capture_output=True, timeout=5)
-                return True  # Connection is alive
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                # Connection dead, remove stale socket
-                try:
-                    os.remove(control_path)
-                except OSError:
-                    pass
+        transport = self.transport
+        if transport.has_connection(hostname, ssh_user) and transport.check(hostname, ssh_user):
+            self.record_success(hostname, ssh_user)
+            return True
 
         # Start a new master connection
-        master_cmd = [
-            "ssh",
-            "-o", f"ControlPath={control_path}",
-            "-o", "ControlMaster=yes",
-            "-o", "ControlPersist=600",  # Keep connection alive for 10 minutes
-            "-o", "ServerAliveInterval=30",  # Send keepalive every 30 seconds
-            "-o", "ServerAliveCountMax=3",
-            "-o", "BatchMode=yes",  # Never prompt for password
-            "-o", "ConnectTimeout=10",
-            "-N",  # Don't execute remote command, just connect
-            "-f",  # Go to background after connection
-            host_string
-        ]
+        if transport.connect(hostname, ssh_user, timeout):
+            self.record_connected(hostname, ssh_user)
+            return True
+
+        self.record_failure(hostname, ssh_user)
+        return False
+
+    def run(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """
+        Run a command on the host through the active transport.
 
+        Connection errors and timeouts count against the host's state;
+        a successful run marks the connection as verified.
+
+        Returns:
+            The command's stdout
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish in time
+            subprocess.CalledProcessError: If the command exited non-zero
+        """
         try:
-            result = subprocess.run(master_cmd, capture_output=True, text=True, timeout=timeout)
-            if result.returncode == 0:
-                self._active_connections[host_string] = control_path
-                print(f"SSH master connection established to {host_string}")
-                return True
-            else:
-                print(f"Failed to establish SSH master connection: {result.stderr}")
-                return False
+            output = self.transport.run(hostname, ssh_user, command, timeout)
         except subprocess.TimeoutExpired:
-            print(f"SSH master connection timed out for {host_string}")
-            return False
-        except Exception as e:
-            print(f"Error establishing SSH master connection: {e}")
-            return False
+            self.record_failure(hostname, ssh_user)
+            raise
+        except subprocess.CalledProcessError as e:
+            # ssh itself exits with 255 on connection errors; anything else is the remote command
+            if e.returncode == SSH_CONNECTION_ERROR:
+                self.record_failure(hostname, ssh_user)
+            raise
+
+        self.record_success(hostname, ssh_user)
+        return output
 
     def get_ssh_command(self, hostname: str, ssh_user: Optional[str] = None) -> List[str]:
         """
@@ -107,67 +218,28 @@ class SSHConnectionManager:
         Returns:
             List of SSH command arguments including ControlPath options
         """
-        control_path = self._get_control_path(hostname, ssh_user)
-        host_string = self._get_host_string(hostname, ssh_user)
+        return self.ssh_transport.get_ssh_command(hostname, ssh_user)
+
+    def get_run_command(self, hostname: str, ssh_user: Optional[str], command: str) -> List[str]:
+        """
+        Get arguments of a local process that runs a long-lived command on
+        the host through the active transport (e.g. for streaming output).
 
-        return [
-            "ssh",
-            "-o", f"ControlPath={control_path}",
-            "-o", "ControlMaster=auto",  # Use existing master or create new one
-            "-o", "BatchMode=yes",
-            host_string
-        ]
+        Raises:
+            NotImplementedError: If the active transport cannot run commands
+                as local processes (e.g. FakeTransport)
+        """
+        return self.transport.get_run_command(hostname, ssh_user, command)
 
     def close_connection(self, hostname: str, ssh_user: Optional[str] = None):
         """Close the master connection for a specific host."""
-        control_path = self._get_control_path(hostname, ssh_user)
-        host_string = self._get_host_string(hostname, ssh_user)
-
-        if os.path.exists(control_path):
-            close_cmd = [
-                "ssh", "-O", "exit",
-                "-o", f"ControlPath={control_path}",
-                host_string
-            ]
-            try:
-                subprocess.run(close_cmd, capture_output=True, timeout=5)
-                print(f"SSH connection closed for {host_string}")
-            except Exception as e:
-                print(f"Error closing SSH connection: {e}")
-
-            # Clean up socket file
-            try:
-                os.remove(control_path)
-            except OSError:
-                pass
-
-        if host_string in self._active_connections:
-            del self._active_connections[host_string]
+        self.transport.close(hostname, ssh_user)
 
     def cleanup_all(self):
         """Close all active SSH connections and clean up."""
-        print("Cleaning up SSH connections...")
-        for host_string, control_path in list(self._active_connections.items()):
-            if os.path.exists(control_path):
-                close_cmd = [
-                    "ssh", "-O", "exit",
-                    "-o", f"ControlPath={control_path}",
-                    host_string
-                ]
-                try:
-                    subprocess.run(close_cmd, capture_output=True, timeout=5)
-                except Exception:
-                    pass
-
-        # Clean up control directory
-        if self._control_dir and os.path.exists(self._control_dir):
-            try:
-                import shutil
-                shutil.rmtree(self._control_dir, ignore_errors=True)
-            except Exception:
-                pass
-
-        self._active_connections.clear()
+        self.ssh_transport.cleanup_all()
+        if self.transport is not self.ssh_transport:
+            self.transport.cleanup_all()
 
 
 # Global connection manager instance
@@ -181,6 +253,15 @@ def get_ssh_manager() -> SSHConnectionManager:
     return _ssh_manager
 
 
+class MetricSummary(NamedTuple):
+    """Statistics of one metric over a sampling window."""
+    min: float
+    mean: float
+    max: float
+    p95: float
+    samples: int
+
+
 @dataclass
 class GPUInfo:
     """Container for GPU information."""
@@ -192,6 +273,37 @@ class GPUInfo:
     memory_percent: float  # Percentage (0-100)
     temperature: int    # Celsius
     power_draw: float   # Watts
+    uuid: Optional[str] = None
+    # Per-metric window statistics, only set by fetch_gpu_summary. Keys are
+    # "utilization", "memory_used", "temperature" and "power_draw".
+    stats: Optional[Dict[str, MetricSummary]] = None
+
+
+@dataclass
+class GPUProcess:
+    """Container for a compute process running on a GPU."""
+    pid: int
+    process_name: str
+    used_memory: int    # MB
+    gpu_uuid: str
+    gpu_id: Optional[int] = None
+
+
+@dataclass
+class HostStats:
+    """Container for host-level load and memory statistics."""
+    load_1m: float
+    load_5m: float
+    load_15m: float
+    mem_total: int      # MB
+    mem_available: int  # MB
+
+    @property
+    def mem_percent(self) -> float:
+        """Percentage of host memory in use (0-100)."""
+        if self.mem_total <= 0:
+            return 0.0
+        return (self.mem_total - self.mem_available) / self.mem_total * 100
 
 
 class GPUData(NamedTuple):
@@ -199,9 +311,396 @@ class GPUData(NamedTuple):
     gpus: List[GPUInfo]
     hostname: str
     timestamp: str
+    processes: Optional[List[GPUProcess]] = None  # Only set by composite fetches
+    host_stats: Optional[HostStats] = None         # Only set by composite fetches
+
+
+def parse_gpu_csv(output: str) -> List[GPUInfo]:
+    """
+    Parse ``nvidia-smi --query-gpu`` CSV output into GPUInfo objects.
+
+    Expects the columns index, name, utilization.gpu, memory.used,
+    memory.total, temperature.gpu, power.draw (noheader, nounits),
+    optionally followed by uuid. Malformed rows are skipped with a warning.
+
+    Args:
+        output: Raw stdout from nvidia-smi
+
+    Returns:
+        List of GPUInfo objects, one per valid row
+    """
+    gpus = []
+    for line in output.strip().split('\n'):
+        if not line.strip():
+            continue
+
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 7:
+            continue
+
+        try:
+            gpu_id = int(parts[0])
+            name = parts[1]
+            utilization = float(parts[2])
+            memory_used = int(parts[3])
+            memory_total = int(parts[4])
+            memory_percent = (memory_used / memory_total * 100) if memory_total > 0 else 0
+            temperature = int(parts[5])
+            power_draw = float(parts[6])
+            uuid = parts[7] if len(parts) > 7 and parts[7] else None
+
+            gpus.append(GPUInfo(
+                gpu_id=gpu_id,
+                name=name,
+                utilization=utilization,
+                memory_used=memory_used,
+                memory_total=memory_total,
+                memory_percent=memory_percent,
+                temperature=temperature,
+                power_draw=power_draw,
+                uuid=uuid
+            ))
+        except (ValueError, IndexError) as e:
+            print(f"Warning: Failed to parse line: {line} - {e}", file=sys.stderr)
+            continue
 
+    return gpus
 
-def fetch_gpu_data(hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> Optional[GPUData]:
+
+# nvidia-smi command to get GPU info in CSV format
+# Query: index, name, utilization.gpu, memory.used, memory.total, temperature.gpu, power.draw
+NVIDIA_SMI_QUERY = (
+    "nvidia-smi "
+    "--query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw "
+    "--format=csv,noheader,nounits"
+)
+
+
+# Full query used to (re)build the inventory cache: dynamic fields plus the
+# static name, memory.total and uuid. Column order matches parse_gpu_csv.
+NVIDIA_SMI_FULL_QUERY = (
+    "nvidia-smi "
+    "--query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw,uuid "
+    "--format=csv,noheader,nounits"
+)
+
+# Steady-state query: only the fields that change between polls
+NVIDIA_SMI_DYNAMIC_QUERY = (
+    "nvidia-smi "
+    "--query-gpu=index,utilization.gpu,memory.used,temperature.gpu,power.draw "
+    "--format=csv,noheader,nounits"
+)
+
+
+@dataclass
+class GPUStaticInfo:
+    """Fields of a GPU that never change while it stays installed."""
+    gpu_id: int
+    uuid: Optional[str]
+    name: str
+    memory_total: int   # MB
+
+
+class GPUInventoryCache:
+    """
+    Caches the static GPU inventory of each host.
+
+    Entries are keyed by host and GPU index and remember the connection
+    generation they were built under, so a reconnect (which may mean a
+    rebooted host or swapped hardware) invalidates them automatically.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, Dict[int, GPUStaticInfo]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(hostname: str, ssh_user: Optional[str]) -> str:
+        return f"{ssh_user}@{hostname}" if ssh_user else hostname
+
+    def get(self, hostname: str, ssh_user: Optional[str], generation: int) -> Optional[Dict[int, GPUStaticInfo]]:
+        """Get the inventory for a host, or None if missing or stale."""
+        with self._lock:
+            entry = self._entries.get(self._key(hostname, ssh_user))
+        if entry is None or entry[0] != generation:
+            return None
+        return entry[1]
+
+    def update(self, hostname: str, ssh_user: Optional[str], generation: int, gpus: List[GPUInfo]):
+        """Store the inventory from a full query."""
+        inventory = {
+            gpu.gpu_id: GPUStaticInfo(gpu.gpu_id, gpu.uuid, gpu.name, gpu.memory_total)
+            for gpu in gpus
+        }
+        with self._lock:
+            self._entries[self._key(hostname, ssh_user)] = (generation, inventory)
+
+    def invalidate(self, hostname: str, ssh_user: Optional[str] = None):
+        """Forget the inventory for a host so the next poll runs a full query."""
+        with self._lock:
+            self._entries.pop(self._key(hostname, ssh_user), None)
+
+    def clear(self):
+        """Forget all cached inventories."""
+        with self._lock:
+            self._entries.clear()
+
+
+_inventory_cache = GPUInventoryCache()
+
+
+def get_inventory_cache() -> GPUInventoryCache:
+    """Get the shared GPU inventory cache."""
+    return _inventory_cache
+
+
+def select_poll_query(hostname: str, ssh_user: Optional[str],
+                      generation: int) -> Tuple[str, Optional[Dict[int, GPUStaticInfo]]]:
+    """
+    Choose the nvidia-smi query for the next poll of a host.
+
+    Returns:
+        (NVIDIA_SMI_DYNAMIC_QUERY, inventory) if the host's inventory is
+        cached for this connection generation, else (NVIDIA_SMI_FULL_QUERY, None)
+    """
+    inventory = _inventory_cache.get(hostname, ssh_user, generation)
+    if inventory:
+        return NVIDIA_SMI_DYNAMIC_QUERY, inventory
+    return NVIDIA_SMI_FULL_QUERY, None
+
+
+def parse_poll_output(hostname: str, ssh_user: Optional[str], generation: int, output: str,
+                      inventory: Optional[Dict[int, GPUStaticInfo]]) -> Optional[List[GPUInfo]]:
+    """
+    Parse the output of the query chosen by select_poll_query.
+
+    Full query results refresh the cached inventory.
+
+    Returns:
+        List of GPUInfo objects, or None if a dynamic poll no longer matches
+        the inventory and a full query is needed
+    """
+    if inventory is not None:
+        return parse_dynamic_gpu_csv(output, inventory)
+    gpus = parse_gpu_csv(output)
+    if gpus:
+        _inventory_cache.update(hostname, ssh_user, generation, gpus)
+    return gpus
+
+
+def parse_dynamic_gpu_csv(output: str, inventory: Dict[int, GPUStaticInfo]) -> Optional[List[GPUInfo]]:
+    """
+    Parse NVIDIA_SMI_DYNAMIC_QUERY output and merge it with the inventory.
+
+    Malformed rows are skipped with a warning, like parse_gpu_csv.
+
+    Returns:
+        List of GPUInfo objects, or None if the GPU count or indices no
+        longer match the inventory (a full query is needed)
+    """
+    lines = [line for line in output.strip().split('\n') if line.strip()]
+    if len(lines) != len(inventory):
+        return None
+
+    gpus = []
+    for line in lines:
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 5:
+            continue
+
+        try:
+            gpu_id = int(parts[0])
+            static = inventory.get(gpu_id)
+            if static is None:
+                return None
+            memory_used = int(parts[2])
+            gpus.append(GPUInfo(
+                gpu_id=gpu_id,
+                name=static.name,
+                utilization=float(parts[1]),
+                memory_used=memory_used,
+                memory_total=static.memory_total,
+                memory_percent=(memory_used / static.memory_total * 100) if static.memory_total > 0 else 0,
+                temperature=int(parts[3]),
+                power_draw=float(parts[4]),
+                uuid=static.uuid
+            ))
+        except (ValueError, IndexError) as e:
+            print(f"Warning: Failed to parse line: {line} - {e}", file=sys.stderr)
+            continue
+
+    return gpus
+
+
+# Marker that starts each section of the composite remote script output
+COMPOSITE_SECTION_MARKER = "@@gpu_monitor:"
+
+# One remote script returning GPU stats, compute processes and host stats.
+# Every section is framed by a marker line so the parser never depends on
+# the position or length of the other sections.
+COMPOSITE_QUERY = "; ".join([
+    f"echo '{COMPOSITE_SECTION_MARKER}gpu'",
+    "nvidia-smi "
+    "--query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw,uuid "
+    "--format=csv,noheader,nounits 2>/dev/null",
+    f"echo '{COMPOSITE_SECTION_MARKER}apps'",
+    "nvidia-smi --query-compute-apps=gpu_uuid,pid,process_name,used_memory "
+    "--format=csv,noheader,nounits 2>/dev/null",
+    f"echo '{COMPOSITE_SECTION_MARKER}loadavg'",
+    "cat /proc/loadavg 2>/dev/null",
+    f"echo '{COMPOSITE_SECTION_MARKER}meminfo'",
+    "cat /proc/meminfo 2>/dev/null",
+    f"echo '{COMPOSITE_SECTION_MARKER}end'",
+])
+
+
+def split_composite_sections(output: str) -> Dict[str, str]:
+    """
+    Split composite script output into its framed sections.
+
+    Args:
+        output: Raw stdout from COMPOSITE_QUERY
+
+    Returns:
+        Dict mapping section name to its body text
+    """
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith(COMPOSITE_SECTION_MARKER):
+            current = line[len(COMPOSITE_SECTION_MARKER):].strip()
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def parse_compute_apps_csv(output: str, gpus: Optional[List[GPUInfo]] = None) -> List[GPUProcess]:
+    """
+    Parse ``nvidia-smi --query-compute-apps`` CSV output.
+
+    Args:
+        output: CSV rows of gpu_uuid, pid, process_name, used_memory
+        gpus: GPUs with known UUIDs, used to resolve each process's gpu_id
+
+    Returns:
+        List of GPUProcess objects, one per valid row
+    """
+    uuid_to_id = {gpu.uuid: gpu.gpu_id for gpu in gpus or [] if gpu.uuid}
+    processes = []
+    for line in output.strip().split('\n'):
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 4:
+            continue
+        try:
+            processes.append(GPUProcess(
+                pid=int(parts[1]),
+                process_name=",".join(parts[2:-1]),
+                used_memory=int(parts[-1]),
+                gpu_uuid=parts[0],
+                gpu_id=uuid_to_id.get(parts[0])
+            ))
+        except ValueError as e:
+            print(f"Warning: Failed to parse process line: {line} - {e}", file=sys.stderr)
+    return processes
+
+
+def parse_host_stats(loadavg: str, meminfo: str) -> Optional[HostStats]:
+    """
+    Parse /proc/loadavg and /proc/meminfo contents into HostStats.
+
+    Returns:
+        HostStats, or None if either file could not be parsed
+    """
+    try:
+        load_1m, load_5m, load_15m = (float(v) for v in loadavg.split()[:3])
+    except ValueError:
+        return None
+
+    mem_kb = {}
+    for line in meminfo.splitlines():
+        key, _, value = line.partition(':')
+        fields = value.split()
+        if fields and fields[0].isdigit():
+            mem_kb[key.strip()] = int(fields[0])
+
+    if "MemTotal" not in mem_kb:
+        return None
+    mem_available = mem_kb.get("MemAvailable", mem_kb.get("MemFree", 0))
+
+    return HostStats(
+        load_1m=load_1m,
+        load_5m=load_5m,
+        load_15m=load_15m,
+        mem_total=mem_kb["MemTotal"] // 1024,
+        mem_available=mem_available // 1024
+    )
+
+
+def parse_composite_output(output: str, hostname: str, timestamp: str) -> Optional[GPUData]:
+    """
+    Parse composite script output into an extended GPUData.
+
+    Returns:
+        GPUData with processes and host_stats filled in, or None if no
+        GPU rows were returned
+    """
+    sections = split_composite_sections(output)
+    gpus = parse_gpu_csv(sections.get("gpu", ""))
+    if not gpus:
+        return None
+
+    return GPUData(
+        gpus=gpus,
+        hostname=hostname,
+        timestamp=timestamp,
+        processes=parse_compute_apps_csv(sections.get("apps", ""), gpus),
+        host_stats=parse_host_stats(sections.get("loadavg", ""), sections.get("meminfo", ""))
+    )
+
+
+def _fetch_gpu_data(hostname: str, ssh_user: Optional[str] = None, timeout: int = 10,
+                    composite: bool = False) -> Optional[GPUData]:
+    """
+    Fetch GPU data from a remote server, raising on SSH failures.
+
+    Same as fetch_gpu_data, but lets subprocess.TimeoutExpired and
+    subprocess.CalledProcessError propagate so callers can report them.
+    """
+    # Get the SSH connection manager and ensure connection is ready
+    ssh_manager = get_ssh_manager()
+    if not ssh_manager.ensure_connection(hostname, ssh_user, timeout):
+        raise ConnectionError(
+            f"SSH connection to {hostname} is {ssh_manager.get_connection_state(hostname, ssh_user)}"
+        )
+
+    # Get timestamp
+    import datetime
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+
+    if composite:
+        # Execute command with timeout (uses existing multiplexed connection)
+        output = ssh_manager.run(hostname, ssh_user, COMPOSITE_QUERY, timeout)
+        return parse_composite_output(output, hostname, timestamp)
+
+    # Steady state: query only dynamic fields and merge with the cached inventory
+    generation = ssh_manager.get_connection_generation(hostname, ssh_user)
+    query, inventory = select_poll_query(hostname, ssh_user, generation)
+    output = ssh_manager.run(hostname, ssh_user, query, timeout)
+    gpus = parse_poll_output(hostname, ssh_user, generation, output, inventory)
+    if gpus is None:
+        # The GPU set changed since the inventory was cached: full query
+        output = ssh_manager.run(hostname, ssh_user, NVIDIA_SMI_FULL_QUERY, timeout)
+        gpus = parse_poll_output(hostname, ssh_user, generation, output, None)
+
+    if not gpus:
+        return None
+
+    return GPUData(gpus=gpus, hostname=hostname, timestamp=timestamp)
+
+
+def fetch_gpu_data(hostname: str, ssh_user: Optional[str] = None, timeout: int = 10,
+                   composite: bool = False) -> Optional[GPUData]:
     """
     Fetch GPU utilization data from a remote server via SSH.
 
@@ -218,89 +717,462 @@ def fetch_gpu_data(hostname: str, ssh_user: Optional[str] = None, timeout: int =
         hostname: Remote server hostname or IP
         ssh_user: SSH username (defaults to current user if None)
         timeout: Command timeout in seconds
+        composite: Also collect per-process GPU memory, load average and
+            host memory in the same SSH round trip
 
     Returns:
         GPUData object with all GPU information, or None if failed
     """
     try:
-        # Get the SSH connection manager and ensure connection is ready
+        return _fetch_gpu_data(hostname, ssh_user, timeout, composite)
+    except subprocess.TimeoutExpired:
+        print(f"Error: SSH command timed out after {timeout} seconds", file=sys.stderr)
+        return None
+    except subprocess.CalledProcessError as e:
+        print(f"Error: SSH command failed: {e.stderr}", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"Error fetching GPU data: {e}", file=sys.stderr)
+        return None
+
+
+class HostResult(NamedTuple):
+    """Outcome of fetching a single host as part of fetch_many."""
+    hostname: str
+    data: Optional[GPUData]
+    error: Optional[str]
+    elapsed: float  # Seconds from submission to completion
+
+
+def _describe_fetch_error(e: Exception, timeout: int) -> str:
+    """Turn a fetch exception into a short per-host error message."""
+    if isinstance(e, subprocess.TimeoutExpired):
+        return f"SSH command timed out after {timeout} seconds"
+    if isinstance(e, subprocess.CalledProcessError):
+        stderr = (e.stderr or "").strip()
+        return f"SSH command failed: {stderr}" if stderr else f"SSH command failed with exit code {e.returncode}"
+    return f"Error fetching GPU data: {e}"
+
+
+def fetch_many(
+    hosts: Iterable[Union[str, Tuple[str, Optional[str]]]],
+    ssh_user: Optional[str] = None,
+    timeout: int = 10,
+    max_concurrency: int = 16,
+    deadline: Optional[float] = None,
+    composite: bool = False
+) -> Iterator[HostResult]:
+    """
+    Fetch GPU data from many hosts concurrently.
+
+    Each host is fetched with fetch_gpu_data semantics on a bounded thread
+    pool, and results are yielded as soon as each host completes, so a slow
+    host never delays the others.
+
+    Args:
+        hosts: Hostnames, or (hostname, ssh_user) tuples for per-host users
+        ssh_user: Default SSH username for hosts given as plain strings
+        timeout: Per-host command timeout in seconds
+        max_concurrency: Maximum number of hosts fetched at the same time
+        deadline: Overall time budget in seconds for the whole cycle. Hosts
+            still pending when it expires are reported as errors and are
+            not waited for.
+        composite: Use the single round-trip composite query per host
+
+    Yields:
+        HostResult for every host, in completion order
+    """
+    targets = []
+    seen = set()
+    for host in hosts:
+        target = (host, ssh_user) if isinstance(host, str) else (host[0], host[1])
+        if target not in seen:
+            seen.add(target)
+            targets.append(target)
+
+    if not targets:
+        return
+
+    # Imported here: only multi-host callers need a thread pool
+    from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_concurrency, len(targets))),
+        thread_name_prefix="gpu-fetch"
+    )
+    futures = {
+        executor.submit(_fetch_gpu_data, hostname, user, timeout, composite): hostname
+        for hostname, user in targets
+    }
+
+    try:
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                hostname = futures.pop(future)
+                elapsed = time.monotonic() - start
+                try:
+                    data = future.result()
+                except Exception as e:
+                    yield HostResult(hostname, None, _describe_fetch_error(e, timeout), elapsed)
+                    continue
+
+                if data is None:
+                    yield HostResult(hostname, None, "No GPU data returned", elapsed)
+                else:
+                    yield HostResult(hostname, data, None, elapsed)
+        except FuturesTimeoutError:
+            elapsed = time.monotonic() - start
+            for hostname in list(futures.values()):
+                yield HostResult(hostname, None, f"Deadline of {deadline} seconds exceeded", elapsed)
+            futures.clear()
+    finally:
+        # Never block the caller on hosts that are still hanging
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Where deploy_collector installs the collector agent on the server
+COLLECTOR_REMOTE_PATH = "~/.cache/gpu_usage_menubar/collector_agent.py"
+
+
+def get_collector_command(interval_ms: int = 1000, stub_gpus: Optional[int] = None) -> str:
+    """Get the remote command that runs the deployed collector agent."""
+    command = f"python3 {COLLECTOR_REMOTE_PATH} --interval-ms {interval_ms}"
+    if stub_gpus is not None:
+        command += f" --stub {stub_gpus}"
+    return command
+
+
+def deploy_collector(hostname: str, ssh_user: Optional[str] = None, timeout: int = 30) -> bool:
+    """
+    Copy the collector agent to a server over the existing connection.
+
+    The agent source is sent inline (base64) through the transport, so no
+    scp/sftp is required and the ControlMaster connection is reused.
+
+    Returns:
+        True if the agent was installed, False if failed
+    """
+    import base64
+    import inspect
+
+    source = inspect.getsource(collector_agent).encode("utf-8")
+    encoded = base64.b64encode(source).decode("ascii")
+    remote_dir = COLLECTOR_REMOTE_PATH.rsplit("/", 1)[0]
+    command = (
+        f"mkdir -p {remote_dir} && "
+        f"echo {encoded} | base64 -d > {COLLECTOR_REMOTE_PATH}.tmp && "
+        f"mv {COLLECTOR_REMOTE_PATH}.tmp {COLLECTOR_REMOTE_PATH}"
+    )
+
+    try:
         ssh_manager = get_ssh_manager()
-        ssh_manager.ensure_connection(hostname, ssh_user, timeout)
+        if not ssh_manager.ensure_connection(hostname, ssh_user, timeout):
+            return False
+        ssh_manager.run(hostname, ssh_user, command, timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        print(f"Error: Collector deployment timed out after {timeout} seconds", file=sys.stderr)
+        return False
+    except subprocess.CalledProcessError as e:
+        print(f"Error: Collector deployment failed: {e.stderr}", file=sys.stderr)
+        return False
 
-        # Build SSH command using multiplexed connection
-        ssh_cmd = ssh_manager.get_ssh_command(hostname, ssh_user)
 
-        # nvidia-smi command to get GPU info in CSV format
-        # Query: index, name, utilization.gpu, memory.used, memory.total, temperature.gpu, power.draw
-        nvidia_cmd = (
-            "nvidia-smi "
-            "--query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw "
-            "--format=csv,noheader,nounits"
-        )
+def parse_summary_csv(output: str) -> List[GPUInfo]:
+    """
+    Parse the collector agent's --summary CSV output.
+
+    Each GPUInfo reports the window mean as its utilization, memory,
+    temperature and power, with the full statistics in ``stats``.
+    Malformed rows are skipped with a warning.
+    """
+    metrics = collector_agent.SUMMARY_METRICS
+    gpus = []
+    for line in output.strip().split('\n'):
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 4 + 4 * len(metrics):
+            continue
 
-        ssh_cmd.append(nvidia_cmd)
+        try:
+            samples = int(parts[3])
+            stats = {}
+            for i, metric in enumerate(metrics):
+                values = [float(v) for v in parts[4 + 4 * i:8 + 4 * i]]
+                stats[metric] = MetricSummary(*values, samples=samples)
 
-        # Execute command with timeout (uses existing multiplexed connection)
-        result = subprocess.run(
-            ssh_cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            check=True
-        )
+            memory_total = int(parts[2])
+            memory_used = int(round(stats["memory_used"].mean))
+            gpus.append(GPUInfo(
+                gpu_id=int(parts[0]),
+                name=parts[1],
+                utilization=stats["utilization"].mean,
+                memory_used=memory_used,
+                memory_total=memory_total,
+                memory_percent=(memory_used / memory_total * 100) if memory_total > 0 else 0,
+                temperature=int(round(stats["temperature"].mean)),
+                power_draw=stats["power_draw"].mean,
+                stats=stats
+            ))
+        except (ValueError, IndexError) as e:
+            print(f"Warning: Failed to parse summary line: {line} - {e}", file=sys.stderr)
+            continue
 
-        # Parse output
-        gpus = []
-        for line in result.stdout.strip().split('\n'):
-            if not line.strip():
-                continue
+    return gpus
 
-            parts = [p.strip() for p in line.split(',')]
-            if len(parts) < 7:
-                continue
 
+def fetch_gpu_summary(hostname: str, ssh_user: Optional[str] = None, duration: float = 300,
+                      sample_ms: int = 100, timeout: int = 10) -> Optional[GPUData]:
+    """
+    Fetch min/mean/max/p95 GPU statistics sampled on the server over a window.
+
+    The deployed collector agent (see deploy_collector) samples every
+    sample_ms for duration seconds and returns only the summary, so short
+    bursts and idle gaps are accounted for without transferring raw samples.
+    The call blocks for the whole window.
+
+    Args:
+        hostname: Remote server hostname or IP
+        ssh_user: SSH username (defaults to current user if None)
+        duration: Sampling window in seconds, normally the refresh interval
+        sample_ms: Remote sampling interval in milliseconds
+        timeout: Extra time allowed on top of duration, in seconds
+
+    Returns:
+        GPUData whose GPUs carry ``stats``, or None if failed
+    """
+    command = (
+        f"python3 {COLLECTOR_REMOTE_PATH} --summary {duration:g} --interval-ms {sample_ms}"
+    )
+    try:
+        ssh_manager = get_ssh_manager()
+        if not ssh_manager.ensure_connection(hostname, ssh_user, timeout):
+            return None
+        output = ssh_manager.run(hostname, ssh_user, command, duration + timeout)
+    except subprocess.TimeoutExpired:
+        print(f"Error: SSH command timed out after {duration + timeout} seconds", file=sys.stderr)
+        return None
+    except subprocess.CalledProcessError as e:
+        print(f"Error: SSH command failed: {e.stderr}", file=sys.stderr)
+        return None
+
+    gpus = parse_summary_csv(output)
+    if not gpus:
+        return None
+
+    import datetime
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    return GPUData(gpus=gpus, hostname=hostname, timestamp=timestamp)
+
+
+class CollectorDecoder:
+    """
+    Incremental decoder for collector agent frames.
+
+    Feed it raw bytes as they arrive from the agent's stdout; it buffers
+    partial frames, remembers the GPU inventory, and returns a GPUData for
+    every complete sample or delta record.
+
+    The last full snapshot is kept so delta records (only the fields that
+    changed) can be applied to it. GPUInfo objects of GPUs that did not
+    change are shared between consecutive snapshots and must be treated as
+    read-only.
+    """
+
+    def __init__(self, hostname: str):
+        self.hostname = hostname
+        self.last_snapshot: Optional[GPUData] = None
+        self._buffer = bytearray()
+        self._inventory: Dict[int, Tuple[str, int]] = {}  # index -> (name, memory_total)
+        self._positions: Dict[int, int] = {}  # gpu index -> position in last_snapshot.gpus
+
+    def feed(self, data: bytes) -> List[GPUData]:
+        """Decode all complete frames in data, returning the samples they contain."""
+        self._buffer += data
+        snapshots = []
+        header = collector_agent.FRAME_HEADER
+        offset = 0
+        while len(self._buffer) - offset >= header.size:
+            length, record_type = header.unpack_from(self._buffer, offset)
+            end = offset + header.size + length
+            if end > len(self._buffer):
+                break
+            payload = memoryview(self._buffer)[offset + header.size:end]
             try:
-                gpu_id = int(parts[0])
-                name = parts[1]
-                utilization = float(parts[2])
-                memory_used = int(parts[3])
-                memory_total = int(parts[4])
-                memory_percent = (memory_used / memory_total * 100) if memory_total > 0 else 0
-                temperature = int(parts[5])
-                power_draw = float(parts[6])
-
-                gpus.append(GPUInfo(
-                    gpu_id=gpu_id,
-                    name=name,
-                    utilization=utilization,
-                    memory_used=memory_used,
-                    memory_total=memory_total,
-                    memory_percent=memory_percent,
-                    temperature=temperature,
-                    power_draw=power_draw
-                ))
-            except (ValueError, IndexError) as e:
-                print(f"Warning: Failed to parse line: {line} - {e}")
+                snapshot = self._decode_record(record_type, payload)
+            finally:
+                payload.release()
+            if snapshot is not None:
+                snapshots.append(snapshot)
+            offset = end
+        del self._buffer[:offset]
+        return snapshots
+
+    def _decode_record(self, record_type: int, payload: memoryview) -> Optional[GPUData]:
+        if record_type == collector_agent.RECORD_INVENTORY:
+            self._decode_inventory(payload)
+            return None
+        if record_type == collector_agent.RECORD_SAMPLE:
+            snapshot = self._decode_sample(payload)
+            if snapshot is not None:
+                # Keyframes may reorder or replace GPUs without changing their count
+                self._positions = {gpu.gpu_id: i for i, gpu in enumerate(snapshot.gpus)}
+                self.last_snapshot = snapshot
+            return snapshot
+        if record_type == collector_agent.RECORD_DELTA:
+            snapshot = self._decode_delta(payload)
+            if snapshot is not None:
+                self.last_snapshot = snapshot
+            return snapshot
+        return None  # Unknown record types are skipped for forward compatibility
+
+    def _decode_inventory(self, payload: memoryview):
+        (count,) = collector_agent.INVENTORY_HEADER.unpack_from(payload, 0)
+        offset = collector_agent.INVENTORY_HEADER.size
+        inventory = {}
+        for _ in range(count):
+            index, memory_total = collector_agent.INVENTORY_GPU.unpack_from(payload, offset)
+            offset += collector_agent.INVENTORY_GPU.size
+            name_length = payload[offset]
+            name = bytes(payload[offset + 1:offset + 1 + name_length]).decode("utf-8", "replace")
+            offset += 1 + name_length
+            inventory[index] = (name, memory_total)
+        if inventory.keys() != self._inventory.keys():
+            # Different GPUs: deltas wait for a keyframe instead of patching the old ones
+            self.last_snapshot = None
+            self._positions = {}
+        self._inventory = inventory
+
+    def _decode_delta(self, payload: memoryview) -> Optional[GPUData]:
+        if self.last_snapshot is None:
+            return None  # No base snapshot yet; wait for the next keyframe
+
+        timestamp, count = collector_agent.DELTA_HEADER.unpack_from(payload, 0)
+        offset = collector_agent.DELTA_HEADER.size
+        gpus = list(self.last_snapshot.gpus)
+        for _ in range(count):
+            index, mask = collector_agent.DELTA_GPU.unpack_from(payload, offset)
+            offset += collector_agent.DELTA_GPU.size
+            changes = {}
+            for attr, bit, fmt in collector_agent.DELTA_FIELDS:
+                if mask & bit:
+                    (changes[attr],) = fmt.unpack_from(payload, offset)
+                    offset += fmt.size
+
+            position = self._positions.get(index)
+            if position is None:
                 continue
+            gpu = replace(gpus[position], **changes)
+            if "memory_used" in changes:
+                gpu.memory_percent = (gpu.memory_used / gpu.memory_total * 100) if gpu.memory_total > 0 else 0
+            gpus[position] = gpu
+
+        import datetime
+        timestamp_str = datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+        return GPUData(gpus=gpus, hostname=self.hostname, timestamp=timestamp_str)
+
+    def _decode_sample(self, payload: memoryview) -> Optional[GPUData]:
+        timestamp, count = collector_agent.SAMPLE_HEADER.unpack_from(payload, 0)
+        gpus = []
+        for index, utilization, memory_used, temperature, power_draw in collector_agent.SAMPLE_GPU.iter_unpack(
+            payload[collector_agent.SAMPLE_HEADER.size:collector_agent.SAMPLE_HEADER.size + count * collector_agent.SAMPLE_GPU.size]
+        ):
+            name, memory_total = self._inventory.get(index, ("Unknown GPU", 0))
+            gpus.append(GPUInfo(
+                gpu_id=index,
+                name=name,
+                utilization=utilization,
+                memory_used=memory_used,
+                memory_total=memory_total,
+                memory_percent=(memory_used / memory_total * 100) if memory_total > 0 else 0,
+                temperature=temperature,
+                power_draw=power_draw
+            ))
 
         if not gpus:
             return None
 
-        # Get timestamp
         import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        timestamp_str = datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+        return GPUData(gpus=gpus, hostname=self.hostname, timestamp=timestamp_str)
 
-        return GPUData(gpus=gpus, hostname=hostname, timestamp=timestamp)
 
-    except subprocess.TimeoutExpired:
-        print(f"Error: SSH command timed out after {timeout} seconds")
-        return None
-    except subprocess.CalledProcessError as e:
-        print(f"Error: SSH command failed: {e.stderr}")
-        return None
-    except Exception as e:
-        print(f"Error fetching GPU data: {e}")
-        return None
+def read_collector_frames(stream: BinaryIO, hostname: str, chunk_size: int = 65536) -> Iterator[GPUData]:
+    """
+    Read collector agent frames from a binary stream until EOF.
+
+    Args:
+        stream: Binary file object, e.g. the agent process's stdout
+        hostname: Host the agent runs on
+
+    Yields:
+        GPUData for every sample record
+    """
+    decoder = CollectorDecoder(hostname)
+    read = getattr(stream, "read1", stream.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield from decoder.feed(chunk)
+
+
+def gpu_data_to_dict(gpu_data: GPUData) -> Dict:
+    """
+    Convert GPUData into plain dicts and lists (e.g. for JSON output).
+
+    Args:
+        gpu_data: GPUData object
+
+    Returns:
+        Dictionary with hostname, timestamp, gpus and, when present,
+        processes and host_stats
+    """
+    result = {
+        "hostname": gpu_data.hostname,
+        "timestamp": gpu_data.timestamp,
+        "gpus": [asdict(gpu) for gpu in gpu_data.gpus],
+    }
+    for gpu in result["gpus"]:
+        if gpu["stats"] is None:
+            del gpu["stats"]
+        else:
+            gpu["stats"] = {metric: summary._asdict() for metric, summary in gpu["stats"].items()}
+    if gpu_data.processes is not None:
+        result["processes"] = [asdict(proc) for proc in gpu_data.processes]
+    if gpu_data.host_stats is not None:
+        result["host_stats"] = asdict(gpu_data.host_stats)
+    return result
+
+
+def gpu_data_from_dict(record: Dict) -> GPUData:
+    """
+    Rebuild GPUData from the output of gpu_data_to_dict.
+
+    Args:
+        record: Dictionary as produced by gpu_data_to_dict (extra keys are ignored)
+
+    Returns:
+        GPUData object
+
+    Raises:
+        KeyError, TypeError: If the record is missing fields
+    """
+    gpus = []
+    for gpu in record["gpus"]:
+        gpu = dict(gpu)
+        if gpu.get("stats") is not None:
+            gpu["stats"] = {metric: MetricSummary(**summary) for metric, summary in gpu["stats"].items()}
+        gpus.append(GPUInfo(**gpu))
+    processes = record.get("processes")
+    host_stats = record.get("host_stats")
+    return GPUData(
+        gpus=gpus,
+        hostname=record["hostname"],
+        timestamp=record["timestamp"],
+        processes=None if processes is None else [GPUProcess(**proc) for proc in processes],
+        host_stats=None if host_stats is None else HostStats(**host_stats)
+    )
 
 
 def format_gpu_summary(gpu_data: GPUData) -> str:
@@ -325,6 +1197,25 @@ def format_gpu_summary(gpu_data: GPUData) -> str:
         lines.append(f"  Memory: {gpu.memory_used} MB / {gpu.memory_total} MB ({gpu.memory_percent:.0f}%)")
         lines.append(f"  Temperature: {gpu.temperature}°C")
         lines.append(f"  Power: {gpu.power_draw:.1f}W")
+        if gpu.stats and "utilization" in gpu.stats:
+            util = gpu.stats["utilization"]
+            lines.append(
+                f"  Utilization window: min {util.min:.0f}% / mean {util.mean:.0f}% / "
+                f"max {util.max:.0f}% / p95 {util.p95:.0f}% ({util.samples} samples)"
+            )
+        lines.append("")
+
+    if gpu_data.processes:
+        lines.append("Processes:")
+        for proc in gpu_data.processes:
+            gpu_label = f"GPU {proc.gpu_id}" if proc.gpu_id is not None else proc.gpu_uuid
+            lines.append(f"  [{gpu_label}] {proc.pid} {proc.process_name}: {proc.used_memory} MB")
+        lines.append("")
+
+    if gpu_data.host_stats:
+        stats = gpu_data.host_stats
+        lines.append(f"Host load: {stats.load_1m:.2f} {stats.load_5m:.2f} {stats.load_15m:.2f}")
+        lines.append(f"Host memory: {stats.mem_total - stats.mem_available} MB / {stats.mem_total} MB ({stats.mem_percent:.0f}%)")
         lines.append("")
 
     return "\n".join(lines)
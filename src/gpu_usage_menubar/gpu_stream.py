@@ -0,0 +1,271 @@
+"""
+Streaming GPU data collector.
+Keeps one long-running ``nvidia-smi --loop-ms`` process open over the SSH
+ControlMaster connection and turns its output into GPUData snapshots as lines
+arrive, instead of spawning a new ssh/nvidia-smi pair for every poll.
+"""
+
+import datetime
+import os
+import select
+import subprocess
+import sys
+import threading
+from typing import Callable, Iterator, List, Optional
+
+from .gpu_fetcher import (
+    CollectorDecoder, GPUData, GPUInfo, NVIDIA_SMI_QUERY,
+    get_collector_command, get_ssh_manager, parse_gpu_csv
+)
+
+
+class _SnapshotAssembler:
+    """
+    Groups streamed nvidia-smi rows into per-poll snapshots.
+
+    nvidia-smi prints one row per GPU per loop iteration with no explicit
+    separator, so a snapshot ends when a GPU index repeats (or goes back),
+    on a blank line, or as soon as the GPU count learned from the first
+    snapshot has been reached.
+    """
+
+    def __init__(self):
+        self._current: List[GPUInfo] = []
+        self._seen = set()
+        self._expected_count: Optional[int] = None
+
+    def feed(self, line: str) -> Optional[List[GPUInfo]]:
+        """Add one output line, returning a completed snapshot if any."""
+        if not line.strip():
+            return self._flush()
+
+        rows = parse_gpu_csv(line)
+        if not rows:
+            return None
+        gpu = rows[0]
+
+        completed = None
+        if gpu.gpu_id in self._seen or (self._current and gpu.gpu_id < self._current[-1].gpu_id):
+            completed = self._flush()
+
+        self._current.append(gpu)
+        self._seen.add(gpu.gpu_id)
+
+        if completed is None and self._expected_count and len(self._current) >= self._expected_count:
+            completed = self._flush()
+        return completed
+
+    def _flush(self) -> Optional[List[GPUInfo]]:
+        if not self._current:
+            return None
+        snapshot = self._current
+        if self._expected_count is None:
+            self._expected_count = len(snapshot)
+        self._current = []
+        self._seen = set()
+        return snapshot
+
+    def reset(self):
+        """Drop partial rows, e.g. after the stream restarts."""
+        self._current = []
+        self._seen = set()
+
+
+class GPUStream:
+    """
+    Long-lived nvidia-smi stream for one host.
+
+    Iterate over the stream to receive GPUData snapshots, or call start()
+    with a callback to consume them on a background thread. The remote
+    process is restarted with exponential backoff whenever it exits or stops
+    producing output. It is spawned through the SSH manager's active
+    transport; transports without local processes (FakeTransport) raise
+    NotImplementedError when iteration starts.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        ssh_user: Optional[str] = None,
+        interval_ms: int = 1000,
+        timeout: int = 10,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 30.0,
+        stall_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            hostname: Remote server hostname or IP
+            ssh_user: SSH username (defaults to current user if None)
+            interval_ms: nvidia-smi sampling interval in milliseconds
+            timeout: SSH connection timeout in seconds
+            restart_delay: Initial delay before restarting a dropped stream
+            max_restart_delay: Upper bound for the restart backoff
+            stall_timeout: Seconds without output before the stream is
+                considered hung and restarted (default: 3 intervals + timeout)
+        """
+        self.hostname = hostname
+        self.ssh_user = ssh_user
+        self.interval_ms = interval_ms
+        self.timeout = timeout
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stall_timeout = stall_timeout if stall_timeout is not None else 3 * interval_ms / 1000 + timeout
+        self.restarts = 0
+
+        self._stop_event = threading.Event()
+        self._proc: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _build_command(self) -> List[str]:
+        """Build the command that streams nvidia-smi output."""
+        ssh_manager = get_ssh_manager()
+        if not ssh_manager.ensure_connection(self.hostname, self.ssh_user, self.timeout):
+            raise ConnectionError(f"SSH connection to {self.hostname} is not available")
+        return ssh_manager.get_run_command(self.hostname, self.ssh_user,
+                                           f"{NVIDIA_SMI_QUERY} --loop-ms={self.interval_ms}")
+
+    def _read_chunks(self, proc: subprocess.Popen) -> Iterator[bytes]:
+        """Yield raw output until the process exits, stalls or is stopped."""
+        fd = proc.stdout.fileno()
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd], [], [], self.stall_timeout)
+            if not ready:
+                print(f"GPU stream for {self.hostname} stalled, restarting", file=sys.stderr)
+                return
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return  # EOF: remote process or connection ended
+            yield chunk
+
+    def _read_lines(self, proc: subprocess.Popen) -> Iterator[str]:
+        """Yield output lines until the process exits, stalls or is stopped."""
+        pending = b""
+        for chunk in self._read_chunks(proc):
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line.decode(errors="replace")
+
+    def _snapshots(self, proc: subprocess.Popen) -> Iterator[GPUData]:
+        """Turn the process output into GPUData snapshots."""
+        for line in self._read_lines(proc):
+            gpus = self._assembler.feed(line)
+            if gpus:
+                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+                yield GPUData(gpus=gpus, hostname=self.hostname, timestamp=timestamp)
+
+    def _terminate(self):
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def __iter__(self) -> Iterator[GPUData]:
+        """Yield GPUData snapshots until stop() is called."""
+        self._assembler = _SnapshotAssembler()
+        delay = self.restart_delay
+
+        while not self._stop_event.is_set():
+            try:
+                self._proc = subprocess.Popen(
+                    self._build_command(),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+                for gpu_data in self._snapshots(self._proc):
+                    delay = self.restart_delay  # Healthy again
+                    yield gpu_data
+            except OSError as e:
+                print(f"Error starting GPU stream for {self.hostname}: {e}", file=sys.stderr)
+            finally:
+                self._terminate()
+
+            if self._stop_event.is_set():
+                break
+
+            self._assembler.reset()
+            self.restarts += 1
+            print(f"GPU stream for {self.hostname} dropped, restarting in {delay:.1f}s", file=sys.stderr)
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.max_restart_delay)
+
+    def start(self, callback: Callable[[GPUData], None]) -> "GPUStream":
+        """
+        Consume the stream on a daemon thread.
+
+        Args:
+            callback: Called with each GPUData snapshot from the stream thread
+        """
+        def run():
+            for gpu_data in self:
+                try:
+                    callback(gpu_data)
+                except Exception as e:
+                    print(f"Error in GPU stream callback: {e}", file=sys.stderr)
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=run, name=f"gpu-stream-{self.hostname}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the stream and kill the remote nvidia-smi process."""
+        self._stop_event.set()
+        self._terminate()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class CollectorStream(GPUStream):
+    """
+    Stream from the resident collector agent instead of nvidia-smi.
+
+    The agent (see collector_agent and deploy_collector) samples on the
+    server and writes compact binary frames, so the client only unpacks
+    fixed-layout records instead of parsing CSV.
+    """
+
+    def __init__(self, hostname: str, ssh_user: Optional[str] = None, interval_ms: int = 1000,
+                 stub_gpus: Optional[int] = None, **kwargs):
+        """
+        Args:
+            stub_gpus: Run the agent with synthetic data for this many GPUs
+            **kwargs: Passed to GPUStream
+        """
+        super().__init__(hostname, ssh_user, interval_ms=interval_ms, **kwargs)
+        self.stub_gpus = stub_gpus
+
+    def _build_command(self) -> List[str]:
+        """Build the command that runs the deployed collector agent."""
+        ssh_manager = get_ssh_manager()
+        if not ssh_manager.ensure_connection(self.hostname, self.ssh_user, self.timeout):
+            raise ConnectionError(f"SSH connection to {self.hostname} is not available")
+        return ssh_manager.get_run_command(self.hostname, self.ssh_user,
+                                           get_collector_command(self.interval_ms, self.stub_gpus))
+
+    def _snapshots(self, proc: subprocess.Popen) -> Iterator[GPUData]:
+        """Decode binary collector frames into GPUData snapshots."""
+        decoder = CollectorDecoder(self.hostname)
+        for chunk in self._read_chunks(proc):
+            yield from decoder.feed(chunk)
+
+
+def stream_gpu_data(hostname: str, ssh_user: Optional[str] = None, interval_ms: int = 1000) -> Iterator[GPUData]:
+    """
+    Stream GPU snapshots from a remote server.
+
+    Convenience wrapper around GPUStream; the stream is stopped when the
+    generator is closed.
+    """
+    stream = GPUStream(hostname, ssh_user, interval_ms=interval_ms)
+    try:
+        yield from stream
+    finally:
+        stream.stop()
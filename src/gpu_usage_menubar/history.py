@@ -0,0 +1,207 @@
+"""
+In-process time-series history of GPU metrics.
+Keeps a fixed-capacity ring buffer per (host, GPU, metric) so trends, rates
+and sparklines can be computed from recent samples while memory stays bounded
+however long the app runs. Requires numpy (optional dependency).
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .gpu_fetcher import GPUData
+
+
+# GPUInfo fields recorded by HistoryStore.record()
+METRICS = ("utilization", "memory_used", "memory_percent", "temperature", "power_draw")
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of (monotonic timestamp, value) samples.
+
+    Every sample is written twice, at ``i`` and ``i + capacity``, so the
+    newest ``n`` samples are always one contiguous stretch of the backing
+    array. Appends are O(1) and windows are returned as NumPy views without
+    copying; callers that keep a window across later appends should copy it.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Args:
+            capacity: Maximum number of samples kept
+            dtype: NumPy dtype of the values
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        self._values = np.zeros(2 * capacity, dtype=dtype)
+        self._head = 0   # Next write position in [0, capacity)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the backing arrays."""
+        return self._times.nbytes + self._values.nbytes
+
+    def append(self, timestamp: float, value: float):
+        """
+        Add a sample, overwriting the oldest one when full.
+
+        Raises:
+            ValueError: If timestamp is older than the newest sample
+        """
+        head = self._head
+        if self._count and timestamp < self._times[head + self.capacity - 1]:
+            raise ValueError("timestamps must be monotonic")
+        self._times[head] = self._times[head + self.capacity] = timestamp
+        self._values[head] = self._values[head + self.capacity] = value
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def last(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the newest samples, oldest first.
+
+        Args:
+            n: Number of samples (default: all)
+
+        Returns:
+            Tuple of (timestamps, values) array views
+        """
+        n = self._count if n is None else max(0, min(n, self._count))
+        end = self._head + self.capacity
+        return self._times[end - n:end], self._values[end - n:end]
+
+    def since(self, timestamp: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the samples taken at or after timestamp, as array views."""
+        times, values = self.last()
+        start = int(np.searchsorted(times, timestamp, side="left"))
+        return times[start:], values[start:]
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """Get the newest (timestamp, value), or None if empty."""
+        if not self._count:
+            return None
+        index = self._head + self.capacity - 1
+        return float(self._times[index]), float(self._values[index])
+
+    def clear(self):
+        """Drop all samples."""
+        self._head = 0
+        self._count = 0
+
+
+class HistoryStore:
+    """
+    Ring buffers of GPU metrics keyed by (hostname, gpu_id, metric).
+
+    Buffers are created on first use with the store's capacity, so memory
+    per series is fixed; forget() releases the buffers of hosts that are no
+    longer monitored.
+    """
+
+    def __init__(self, capacity: int = 3600):
+        """
+        Args:
+            capacity: Samples kept per series (e.g. one hour at 1 Hz)
+        """
+        self.capacity = capacity
+        self._buffers: Dict[Tuple[str, int, str], RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def _buffer(self, hostname: str, gpu_id: int, metric: str) -> RingBuffer:
+        key = (hostname, gpu_id, metric)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = RingBuffer(self.capacity)
+        return buffer
+
+    def append(self, hostname: str, gpu_id: int, metric: str, value: float, timestamp: Optional[float] = None):
+        """
+        Record one metric value.
+
+        Args:
+            timestamp: time.monotonic() value of the sample (default: now)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            self._buffer(hostname, gpu_id, metric).append(timestamp, value)
+
+    def record(self, gpu_data: GPUData, timestamp: Optional[float] = None):
+        """
+        Record every metric of every GPU in a snapshot.
+
+        Args:
+            gpu_data: Snapshot to record
+            timestamp: time.monotonic() value of the snapshot (default: now)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            for gpu in gpu_data.gpus:
+                for metric in METRICS:
+                    self._buffer(gpu_data.hostname, gpu.gpu_id, metric).append(timestamp, getattr(gpu, metric))
+
+    def window(
+        self,
+        hostname: str,
+        gpu_id: int,
+        metric: str,
+        seconds: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get recent samples of one series as zero-copy array views.
+
+        Args:
+            hostname: Host the GPU belongs to
+            gpu_id: GPU index on the host
+            metric: One of METRICS (or any name passed to append())
+            seconds: Only return samples from the last this many seconds
+                (default: everything in the buffer)
+            now: Reference time.monotonic() value for seconds (default: now)
+
+        Returns:
+            Tuple of (timestamps, values), oldest first; empty if unknown
+        """
+        with self._lock:
+            buffer = self._buffers.get((hostname, gpu_id, metric))
+            if buffer is None:
+                return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+            if seconds is None:
+                return buffer.last()
+            if now is None:
+                now = time.monotonic()
+            return buffer.since(now - seconds)
+
+    def latest(self, hostname: str, gpu_id: int, metric: str) -> Optional[Tuple[float, float]]:
+        """Get the newest (timestamp, value) of one series, or None."""
+        with self._lock:
+            buffer = self._buffers.get((hostname, gpu_id, metric))
+            return buffer.latest() if buffer is not None else None
+
+    def keys(self) -> List[Tuple[str, int, str]]:
+        """List the (hostname, gpu_id, metric) series in the store."""
+        with self._lock:
+            return list(self._buffers)
+
+    def forget(self, hostname: str):
+        """Release all series of a host."""
+        with self._lock:
+            for key in [k for k in self._buffers if k[0] == hostname]:
+                del self._buffers[key]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by all ring buffers."""
+        with self._lock:
+            return sum(buffer.nbytes for buffer in self._buffers.values())
@@ -0,0 +1,401 @@
+"""
+On-disk append-only history of GPU samples.
+Each host gets a directory of segment files holding fixed-size binary
+records in time order. Writes go through a background thread so disk I/O and
+fsync never block the fetch loop; reads memory-map the segments and locate a
+time range with a sparse index, returning NumPy views of the mapped records.
+Requires numpy (optional dependency).
+"""
+
+import bisect
+import mmap
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from .gpu_fetcher import GPUData
+
+
+SEGMENT_MAGIC = b"GPUHLOG1"
+SEGMENT_SUFFIX = ".seg"
+
+# One record per GPU per sample; 32 bytes, little-endian
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),     # Epoch seconds
+    ("gpu_id", "<u2"),
+    ("temperature", "<i2"),   # Celsius
+    ("utilization", "<f4"),   # Percentage (0-100)
+    ("memory_used", "<u4"),   # MB
+    ("memory_total", "<u4"),  # MB
+    ("power_draw", "<f4"),    # Watts
+    ("reserved", "<u4"),
+])
+
+# Segment header: magic, version, record size (16 bytes, keeps records aligned)
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("record_size", "<u4")])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+FORMAT_VERSION = 1
+
+
+def encode_records(gpu_data: GPUData, timestamp: float) -> bytes:
+    """Encode every GPU of a snapshot as fixed-size records."""
+    gpus = gpu_data.gpus
+    records = np.zeros(len(gpus), dtype=RECORD_DTYPE)
+    records["timestamp"] = timestamp
+    records["gpu_id"] = [gpu.gpu_id for gpu in gpus]
+    records["temperature"] = [gpu.temperature for gpu in gpus]
+    records["utilization"] = [gpu.utilization for gpu in gpus]
+    records["memory_used"] = [gpu.memory_used for gpu in gpus]
+    records["memory_total"] = [gpu.memory_total for gpu in gpus]
+    records["power_draw"] = [gpu.power_draw for gpu in gpus]
+    return records.tobytes()
+
+
+def _segment_header() -> bytes:
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = SEGMENT_MAGIC
+    header["version"] = FORMAT_VERSION
+    header["record_size"] = RECORD_DTYPE.itemsize
+    return header.tobytes()
+
+
+class _Segment:
+    """A memory-mapped segment file with a sparse timestamp index."""
+
+    def __init__(self, path: str, start: float, index_stride: int):
+        self.path = path
+        self.start = start
+        self.index_stride = index_stride
+        self._mmap: Optional[mmap.mmap] = None
+        self._records: Optional[np.ndarray] = None
+        self._index: List[float] = []
+
+    def records(self) -> np.ndarray:
+        """Map the segment (again, if it has grown) and return its records."""
+        size = os.path.getsize(self.path)
+        count = max(0, (size - HEADER_SIZE) // RECORD_DTYPE.itemsize)
+        if self._records is None or len(self._records) != count:
+            self.close()
+            if count == 0:
+                return np.empty(0, dtype=RECORD_DTYPE)
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), HEADER_SIZE + count * RECORD_DTYPE.itemsize, access=mmap.ACCESS_READ)
+            header = np.frombuffer(self._mmap, dtype=HEADER_DTYPE, count=1)[0]
+            if header["magic"] != SEGMENT_MAGIC or header["record_size"] != RECORD_DTYPE.itemsize:
+                self.close()
+                raise ValueError(f"Not a history segment: {self.path}")
+            self._records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE)
+            # Every index_stride-th timestamp; only these are touched by bisect
+            self._index = self._records["timestamp"][::self.index_stride].tolist()
+        return self._records
+
+    def find(self, timestamp: float, side: str) -> int:
+        """Record position for timestamp, like np.searchsorted on the timestamps."""
+        records = self.records()
+        if side == "left":
+            block = max(0, bisect.bisect_left(self._index, timestamp) - 1)
+        else:
+            block = max(0, bisect.bisect_right(self._index, timestamp) - 1)
+        lo = block * self.index_stride
+        hi = min(len(records), lo + self.index_stride + 1)
+        return lo + int(np.searchsorted(records["timestamp"][lo:hi], timestamp, side=side))
+
+    def close(self):
+        self._records = None
+        self._index = []
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # Views of the mapping are still alive; it closes with them
+            self._mmap = None
+
+
+class _HostWriter:
+    """Current segment of one host, used only by the writer thread."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path: Optional[str] = None  # Current segment, None until the next one is started
+        self.file = None                 # Open handle of path, None while parked
+        self.start = 0.0
+        self.size = 0
+        self.dirty = False
+
+
+class HistoryLog:
+    """
+    Append-only, memory-mapped history of GPU samples for many hosts.
+
+    Segments are rotated when they exceed max_segment_bytes or are older
+    than max_segment_age; segments whose data is older than retention are
+    deleted. append() only encodes and enqueues the samples, so the fetch
+    loop never waits for the disk. At most max_open_files segments are kept
+    open; the least recently written one is closed and reopened for append
+    when its host reports again, so large fleets do not exhaust descriptors.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: float = 3600.0,
+        retention: Optional[float] = 7 * 24 * 3600.0,
+        fsync_interval: float = 5.0,
+        index_stride: int = 1024,
+        max_pending: int = 10000,
+        max_open_files: int = 64
+    ):
+        """
+        Args:
+            root: Directory holding one subdirectory per host
+            max_segment_bytes: Rotate a segment once it reaches this size
+            max_segment_age: Rotate a segment after this many seconds
+            retention: Delete data older than this many seconds (None keeps all)
+            fsync_interval: Seconds between fsyncs of written segments
+            index_stride: Records per sparse index entry
+            max_pending: Snapshots queued for the writer before new ones are dropped
+            max_open_files: Segment files kept open at once
+        """
+        if max_open_files < 1:
+            raise ValueError("max_open_files must be at least 1")
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.retention = retention
+        self.fsync_interval = fsync_interval
+        self.index_stride = index_stride
+        self.max_open_files = max_open_files
+        self.dropped = 0  # Snapshots lost to a full queue or a failed write
+
+        os.makedirs(root, exist_ok=True)
+        self._queue: "queue.Queue[Optional[Tuple[str, float, bytes]]]" = queue.Queue(max_pending)
+        self._writers: Dict[str, _HostWriter] = {}
+        self._open: "OrderedDict[str, _HostWriter]" = OrderedDict()  # Least recently written first
+        self._segments: Dict[str, List[_Segment]] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="history-log-writer", daemon=True)
+        self._thread.start()
+
+    def _host_dir(self, hostname: str) -> str:
+        return os.path.join(self.root, quote(hostname, safe=""))
+
+    # Writing (append() runs on the caller's thread, the rest on the writer thread)
+
+    def append(self, gpu_data: GPUData, timestamp: Optional[float] = None) -> bool:
+        """
+        Queue a snapshot for writing.
+
+        Args:
+            gpu_data: Snapshot to store
+            timestamp: Epoch seconds of the snapshot (default: now)
+
+        Returns:
+            False if the writer is too far behind and the snapshot was dropped
+        """
+        if not gpu_data.gpus:
+            return True
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self._queue.put_nowait((gpu_data.hostname, timestamp, encode_records(gpu_data, timestamp)))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        last_sync = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                item = ()
+
+            if item is None:
+                self._sync()
+                self._queue.task_done()
+                break
+            if item:
+                try:
+                    self._write(*item)
+                except OSError as e:
+                    self.dropped += 1
+                    print(f"Error writing GPU history: {e}", file=sys.stderr)
+                self._queue.task_done()
+
+            if time.monotonic() - last_sync >= self.fsync_interval:
+                self._sync()
+                last_sync = time.monotonic()
+
+        for writer in self._writers.values():
+            if writer.file is not None:
+                writer.file.close()
+
+    def _write(self, hostname: str, timestamp: float, data: bytes):
+        writer = self._writers.get(hostname)
+        if writer is None:
+            writer = self._writers[hostname] = _HostWriter(self._host_dir(hostname))
+            os.makedirs(writer.directory, exist_ok=True)
+
+        if writer.path is not None and (
+            writer.size >= self.max_segment_bytes or timestamp - writer.start >= self.max_segment_age
+        ):
+            self._close_segment(hostname, writer)
+
+        if writer.file is None:
+            self._make_room()
+            if writer.path is None:
+                self._open_segment(hostname, writer, timestamp)
+            else:
+                self._reopen_segment(writer)
+        self._open[hostname] = writer
+        self._open.move_to_end(hostname)
+
+        writer.file.write(data)
+        writer.size += len(data)
+        writer.dirty = True
+
+    def _open_segment(self, hostname: str, writer: _HostWriter, timestamp: float):
+        path = os.path.join(writer.directory, f"{int(timestamp * 1000):015d}{SEGMENT_SUFFIX}")
+        writer.file = open(path, "ab", buffering=0)  # Unbuffered: readers see every record
+        writer.path = path
+        if writer.file.tell() == 0:
+            writer.file.write(_segment_header())
+        writer.start = timestamp
+        writer.size = writer.file.tell()
+        with self._lock:
+            self._segments.pop(hostname, None)  # Rescan on next read
+        self._expire(hostname, timestamp)
+
+    def _reopen_segment(self, writer: _HostWriter):
+        writer.file = open(writer.path, "ab", buffering=0)
+        if writer.file.tell() == 0:  # Removed while parked
+            writer.file.write(_segment_header())
+        writer.size = writer.file.tell()
+
+    def _park(self, hostname: str, writer: _HostWriter):
+        """Close the file of a host's segment; the next write reopens it."""
+        # No fsync here: evictions happen on every write once the fleet is
+        # larger than max_open_files, and the kernel writes back closed files
+        self._open.pop(hostname, None)
+        try:
+            writer.file.flush()
+        finally:
+            writer.file.close()
+            writer.file = None
+            writer.dirty = False
+
+    def _make_room(self):
+        while len(self._open) >= self.max_open_files:
+            hostname, writer = next(iter(self._open.items()))
+            self._park(hostname, writer)
+
+    def _close_segment(self, hostname: str, writer: _HostWriter):
+        if writer.file is not None:
+            self._park(hostname, writer)
+        writer.path = None
+
+    def _sync(self):
+        for writer in self._writers.values():
+            if writer.file is not None and writer.dirty:
+                try:
+                    os.fsync(writer.file.fileno())
+                except OSError as e:
+                    print(f"Error syncing GPU history: {e}", file=sys.stderr)
+                writer.dirty = False
+
+    def _expire(self, hostname: str, now: float):
+        """Delete segments whose newest data is past retention."""
+        if self.retention is None:
+            return
+        cutoff = now - self.retention
+        with self._lock:
+            segments = self._scan(hostname)
+            # A segment only holds data older than the start of its successor
+            expired = [s for s, following in zip(segments, segments[1:]) if following.start < cutoff]
+            for segment in expired:
+                segment.close()
+                try:
+                    os.remove(segment.path)
+                except OSError:
+                    pass
+            if expired:
+                self._segments.pop(hostname, None)
+
+    def flush(self):
+        """Wait until every queued snapshot has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write pending snapshots, fsync and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        with self._lock:
+            for segments in self._segments.values():
+                for segment in segments:
+                    segment.close()
+            self._segments.clear()
+
+    # Reading
+
+    def _scan(self, hostname: str) -> List[_Segment]:
+        """Get the host's segments ordered by start time (self._lock must be held)."""
+        segments = self._segments.get(hostname)
+        if segments is None:
+            directory = self._host_dir(hostname)
+            names = sorted(n for n in os.listdir(directory) if n.endswith(SEGMENT_SUFFIX)) \
+                if os.path.isdir(directory) else []
+            segments = [
+                _Segment(os.path.join(directory, n), int(n[:-len(SEGMENT_SUFFIX)]) / 1000, self.index_stride)
+                for n in names
+            ]
+            self._segments[hostname] = segments
+        return segments
+
+    def hosts(self) -> List[str]:
+        """List the hosts that have history on disk."""
+        return sorted(unquote(name) for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def query(self, hostname: str, start: float, end: Optional[float] = None) -> Iterator[np.ndarray]:
+        """
+        Read the records of a host between start and end (inclusive).
+
+        Segments are located by bisecting their start times and records by
+        the per-segment sparse index, so only the matching pages are read.
+
+        Yields:
+            One RECORD_DTYPE array view of the mapped file per segment
+        """
+        with self._lock:
+            segments = self._scan(hostname)
+        first = max(0, bisect.bisect_right([s.start for s in segments], start) - 1)
+        for segment in segments[first:]:
+            if end is not None and segment.start > end:
+                break
+            # Segments are shared with the writer thread, which may expire them
+            with self._lock:
+                try:
+                    records = segment.records()
+                    lo = segment.find(start, "left")
+                    hi = len(records) if end is None else segment.find(end, "right")
+                except FileNotFoundError:
+                    continue  # Expired while reading
+            if hi > lo:
+                yield records[lo:hi]
+
+    def query_gpu(self, hostname: str, gpu_id: int, start: float, end: Optional[float] = None) -> np.ndarray:
+        """Read the records of one GPU between start and end as a single array."""
+        parts = [records[records["gpu_id"] == gpu_id] for records in self.query(hostname, start, end)]
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
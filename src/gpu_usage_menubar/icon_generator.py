@@ -1,11 +1,20 @@
 """
-Icon generator for dual GPU monitoring.
-Creates menubar icons showing utilization for two GPUs side by side.
+Icon generator for GPU monitoring.
+Creates menubar icons showing utilization for one or more GPUs side by side.
 """
 
-from PIL import Image, ImageDraw, ImageFont
 import io
-from typing import Optional, Tuple
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import struct
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, NamedTuple, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Pillow (and numpy for heatmaps) is imported on first render, so importing
+# this module stays cheap for callers that never draw an icon.
 
 
 # Color scheme
@@ -38,12 +47,143 @@ def get_utilization_color(percent: float) -> str:
         return COLORS["gpu_high"]
 
 
+class IconCache:
+    """
+    LRU cache of encoded icons.
+
+    Icons are keyed by their quantized geometry (filled bar heights and
+    colour buckets) rather than raw percentages, so every utilization value
+    that produces the same pixels is rendered and PNG-encoded only once.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Args:
+            maxsize: Maximum number of icons kept
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._icons: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._icons)
+
+    def get(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """
+        Get the icon for key, rendering it on a miss.
+
+        Args:
+            key: Quantized description of the icon
+            render: Produces the PNG bytes for key
+
+        Returns:
+            PNG image bytes
+        """
+        with self._lock:
+            icon = self._icons.get(key)
+            if icon is not None:
+                self._icons.move_to_end(key)
+                self.hits += 1
+                return icon
+            self.misses += 1
+
+        icon = render()
+
+        with self._lock:
+            self._icons[key] = icon
+            self._icons.move_to_end(key)
+            while len(self._icons) > self.maxsize:
+                self._icons.popitem(last=False)
+        return icon
+
+    def clear(self):
+        """Drop all icons and reset the counters."""
+        with self._lock:
+            self._icons.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Global icon cache instance
+_icon_cache = IconCache()
+
+def get_icon_cache() -> IconCache:
+    """Get the icon cache shared by the create_*_icon functions."""
+    return _icon_cache
+
+
+def _bar_fill(percent: float, bar_height: int) -> Tuple[int, Optional[str]]:
+    """Quantize a clamped percentage to (filled height, fill colour)."""
+    filled_height = int(bar_height * percent / 100)
+    # An empty bar looks the same whatever its colour bucket
+    return filled_height, get_utilization_color(percent) if filled_height > 0 else None
+
+
+# zlib level for icon PNGs; 6 is PIL's default, lower is faster to encode
+_png_compress_level = 6
+
+def set_png_compress_level(level: int):
+    """
+    Set the PNG compression level (0-9) used for all icons.
+
+    Menu bar icons are tiny, so a low level mostly trades a few hundred
+    bytes for faster encoding. Cached icons are dropped.
+    """
+    global _png_compress_level
+    if not 0 <= level <= 9:
+        raise ValueError("compress level must be between 0 and 9")
+    _png_compress_level = level
+    _icon_cache.clear()
+
+
+def _encode_png(img: "Image.Image") -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', compress_level=_png_compress_level)
+    return buffer.getvalue()
+
+
+class IconBuffer(NamedTuple):
+    """An encoded icon held in memory, ready to hand to a presenter."""
+    data: bytes
+    width: int
+    height: int
+    format: str = "png"  # "png" or "rgba" (raw 8-bit RGBA rows)
+
+    @classmethod
+    def from_png(cls, data: bytes) -> "IconBuffer":
+        """Wrap PNG bytes, reading the size from the IHDR chunk."""
+        if data[:8] != b'\x89PNG\r\n\x1a\n' or data[12:16] != b'IHDR':
+            raise ValueError("Not a PNG image")
+        width, height = struct.unpack(">II", data[16:24])
+        return cls(data, width, height, "png")
+
+    @classmethod
+    def from_image(cls, img: "Image.Image", format: str = "png") -> "IconBuffer":
+        """Encode a PIL image as PNG or raw RGBA."""
+        if format == "rgba":
+            return cls(img.convert('RGBA').tobytes(), img.width, img.height, "rgba")
+        if format == "png":
+            return cls(_encode_png(img), img.width, img.height, "png")
+        raise ValueError(f"Unknown icon format: {format}")
+
+    def to_image(self) -> "Image.Image":
+        """Decode back into a PIL image."""
+        from PIL import Image
+
+        if self.format == "rgba":
+            return Image.frombytes('RGBA', (self.width, self.height), self.data)
+        return Image.open(io.BytesIO(self.data))
+
+
 def create_dual_gpu_icon(gpu1_percent: float, gpu2_percent: float, size: int = 36) -> bytes:
     """
     Create a menu bar icon showing two GPU utilization levels side by side.
 
     Creates a compact icon with two vertical bars representing GPU0 and GPU1.
     Each bar is color-coded: green (low), orange (medium), red (high).
+    Icons are served from the icon cache when the bars look the same.
 
     Args:
         gpu1_percent: GPU 0 utilization (0-100)
@@ -57,6 +197,25 @@ def create_dual_gpu_icon(gpu1_percent: float, gpu2_percent: float, size: int = 3
     gpu1_percent = max(0, min(100, gpu1_percent))
     gpu2_percent = max(0, min(100, gpu2_percent))
 
+    padding = 3
+    bar_height = size - 2 * padding
+    gpu1_fill = _bar_fill(gpu1_percent, bar_height)
+    gpu2_fill = _bar_fill(gpu2_percent, bar_height)
+
+    return _icon_cache.get(
+        ("dual", size, gpu1_fill, gpu2_fill),
+        lambda: _render_dual_gpu_icon(gpu1_fill, gpu2_fill, size)
+    )
+
+
+def _render_dual_gpu_icon(gpu1_fill: Tuple[int, Optional[str]], gpu2_fill: Tuple[int, Optional[str]],
+                          size: int) -> bytes:
+    """Draw and encode a dual GPU icon from quantized bar fills."""
+    from PIL import Image, ImageDraw
+
+    gpu1_filled_height, gpu1_color = gpu1_fill
+    gpu2_filled_height, gpu2_color = gpu2_fill
+
     # Create image with transparency
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
@@ -67,7 +226,6 @@ def create_dual_gpu_icon(gpu1_percent: float, gpu2_percent: float, size: int = 3
     bar_height = size - 2 * padding
 
     # GPU 0 bar (left)
-    gpu1_filled_height = int(bar_height * gpu1_percent / 100)
     x1_left = padding
     x1_right = padding + bar_width
     y1_top = padding + (bar_height - gpu1_filled_height)
@@ -85,12 +243,11 @@ def create_dual_gpu_icon(gpu1_percent: float, gpu2_percent: float, size: int = 3
     if gpu1_filled_height > 0:
         draw.rectangle(
             [x1_left + 1, y1_top, x1_right - 1, y1_bottom - 1],
-            fill=get_utilization_color(gpu1_percent),
+            fill=gpu1_color,
             outline=None
         )
 
     # GPU 1 bar (right)
-    gpu2_filled_height = int(bar_height * gpu2_percent / 100)
     x2_left = x1_right + padding
     x2_right = x2_left + bar_width
     y2_top = padding + (bar_height - gpu2_filled_height)
@@ -108,14 +265,11 @@ def create_dual_gpu_icon(gpu1_percent: float, gpu2_percent: float, size: int = 3
     if gpu2_filled_height > 0:
         draw.rectangle(
             [x2_left + 1, y2_top, x2_right - 1, y2_bottom - 1],
-            fill=get_utilization_color(gpu2_percent),
+            fill=gpu2_color,
             outline=None
         )
 
-    # Convert to bytes
-    buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    return buffer.getvalue()
+    return _encode_png(img)
 
 
 def create_single_gpu_icon(gpu_percent: float, size: int = 36) -> bytes:
@@ -131,6 +285,19 @@ def create_single_gpu_icon(gpu_percent: float, size: int = 36) -> bytes:
     """
     gpu_percent = max(0, min(100, gpu_percent))
 
+    padding = 4
+    bar_height = size - 2 * padding
+    fill = _bar_fill(gpu_percent, bar_height)
+
+    return _icon_cache.get(("single", size, fill), lambda: _render_single_gpu_icon(fill, size))
+
+
+def _render_single_gpu_icon(fill: Tuple[int, Optional[str]], size: int) -> bytes:
+    """Draw and encode a single GPU icon from a quantized bar fill."""
+    from PIL import Image, ImageDraw
+
+    filled_height, color = fill
+
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
@@ -138,8 +305,6 @@ def create_single_gpu_icon(gpu_percent: float, size: int = 36) -> bytes:
     bar_width = size - 2 * padding
     bar_height = size - 2 * padding
 
-    filled_height = int(bar_height * gpu_percent / 100)
-
     # Background
     draw.rectangle(
         [padding, padding, padding + bar_width, padding + bar_height],
@@ -153,13 +318,310 @@ def create_single_gpu_icon(gpu_percent: float, size: int = 36) -> bytes:
         y_top = padding + (bar_height - filled_height)
         draw.rectangle(
             [padding + 2, y_top, padding + bar_width - 2, padding + bar_height - 2],
-            fill=get_utilization_color(gpu_percent),
+            fill=color,
             outline=None
         )
 
-    buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    return buffer.getvalue()
+    return _encode_png(img)
+
+
+def _multi_bar_layout(count: int, size: int) -> Tuple[int, int, int]:
+    """
+    Get (padding, bar_width, bar_height) for an icon with count bars.
+
+    Two or fewer bars use the dual icon's 3 px padding; more bars use 1 px
+    so that up to 8 bars still fit a 36 px icon.
+    """
+    padding = 3 if count <= 2 else 1
+    bar_width = (size - (count + 1) * padding) // count
+    bar_height = size - 2 * padding
+    return padding, bar_width, bar_height
+
+
+class _BarAtlas:
+    """
+    Every possible bar column for one icon geometry, rendered once.
+
+    The atlas is a single image holding one column tile per (filled height,
+    colour) combination; frames are composed by pasting tiles side by side.
+    """
+
+    def __init__(self, size: int, padding: int, bar_width: int, bar_height: int):
+        from PIL import Image, ImageDraw
+
+        self.size = size
+        self.tile_width = bar_width + 1  # Rectangles include both edges
+        fills = [(0, None)] + [
+            (height, color)
+            for color in (COLORS["gpu_low"], COLORS["gpu_medium"], COLORS["gpu_high"])
+            for height in range(1, bar_height + 1)
+        ]
+
+        self.image = Image.new('RGBA', (self.tile_width * len(fills), size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(self.image)
+        self.tiles: Dict[Tuple[int, Optional[str]], "Image.Image"] = {}
+        for i, (filled_height, color) in enumerate(fills):
+            x_left = i * self.tile_width
+            x_right = x_left + bar_width
+            # Same strokes as a bar of the dual icon
+            draw.rectangle(
+                [x_left, padding, x_right, padding + bar_height],
+                fill=COLORS["bg_empty"],
+                outline=COLORS["border"],
+                width=1
+            )
+            if filled_height > 0:
+                draw.rectangle(
+                    [x_left + 1, padding + (bar_height - filled_height), x_right - 1, padding + bar_height - 1],
+                    fill=color,
+                    outline=None
+                )
+
+        for i, fill in enumerate(fills):
+            x_left = i * self.tile_width
+            self.tiles[fill] = self.image.crop((x_left, 0, x_left + self.tile_width, size))
+
+
+@lru_cache(maxsize=16)
+def _get_bar_atlas(size: int, padding: int, bar_width: int, bar_height: int) -> _BarAtlas:
+    return _BarAtlas(size, padding, bar_width, bar_height)
+
+
+def create_multi_gpu_icon(percents: Sequence[float], size: int = 36) -> bytes:
+    """
+    Create a menu bar icon with one utilization bar per GPU.
+
+    Bars are pasted from a pre-rendered atlas of every possible column, so
+    render time does not grow with the amount of drawing per bar. For two
+    GPUs the result is pixel-identical to create_dual_gpu_icon.
+
+    Args:
+        percents: Utilization (0-100) of each GPU, in bar order
+        size: Icon size in pixels
+
+    Returns:
+        PNG image bytes
+
+    Raises:
+        ValueError: If there are no GPUs or too many bars to fit the size
+    """
+    if not percents:
+        raise ValueError("At least one GPU is required")
+
+    padding, bar_width, bar_height = _multi_bar_layout(len(percents), size)
+    if bar_width < 2:
+        raise ValueError(f"{len(percents)} GPU bars do not fit a {size}px icon")
+
+    fills = tuple(_bar_fill(max(0, min(100, p)), bar_height) for p in percents)
+
+    return _icon_cache.get(
+        ("multi", size, fills),
+        lambda: _render_multi_gpu_icon(fills, size)
+    )
+
+
+def _render_multi_gpu_icon(fills: Sequence[Tuple[int, Optional[str]]], size: int) -> bytes:
+    """Compose and encode an N-bar icon from atlas tiles."""
+    from PIL import Image
+
+    padding, bar_width, bar_height = _multi_bar_layout(len(fills), size)
+    atlas = _get_bar_atlas(size, padding, bar_width, bar_height)
+
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    for i, fill in enumerate(fills):
+        img.paste(atlas.tiles[fill], (padding + i * (bar_width + padding), 0))
+
+    return _encode_png(img)
+
+
+def _utilization_lut():
+    """
+    Build the RGBA colour lookup table for heatmaps.
+
+    Entries 0-100 hold the colour of each integer utilization (so the
+    buckets match get_utilization_color); entry 101 is used for cells
+    without a GPU (NaN).
+    """
+    import numpy as np
+
+    def rgba(color: str) -> Tuple[int, int, int, int]:
+        return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16), 255
+
+    lut = np.empty((102, 4), dtype=np.uint8)
+    for percent in range(101):
+        lut[percent] = rgba(get_utilization_color(percent))
+    lut[101] = rgba(COLORS["bg_empty"])
+    return lut
+
+
+_heatmap_lut = None
+
+
+def render_fleet_heatmap(utilization, cell_width: int = 4, cell_height: int = 4) -> "Image.Image":
+    """
+    Render a hosts x GPUs utilization grid as an image.
+
+    Colours come from a lookup table built from COLORS, cells are scaled
+    with nearest-neighbour repeats and the image is created with a single
+    Image.fromarray call, so no per-cell drawing happens. Requires numpy.
+
+    Args:
+        utilization: 2-D array-like of utilization (0-100), one row per
+            host and one column per GPU; NaN marks missing GPUs
+        cell_width: Width of each cell in pixels
+        cell_height: Height of each cell in pixels
+
+    Returns:
+        RGBA image of size (columns * cell_width, rows * cell_height)
+    """
+    import numpy as np
+    from PIL import Image
+
+    global _heatmap_lut
+    if _heatmap_lut is None:
+        _heatmap_lut = _utilization_lut()
+
+    values = np.asarray(utilization, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError("utilization must be a 2-D array")
+
+    # Truncate like int() so the buckets match get_utilization_color
+    index = np.full(values.shape, 101, dtype=np.intp)
+    present = ~np.isnan(values)
+    index[present] = np.clip(values[present], 0, 100).astype(np.intp)
+
+    pixels = _heatmap_lut[index]
+    if cell_height > 1:
+        pixels = np.repeat(pixels, cell_height, axis=0)
+    if cell_width > 1:
+        pixels = np.repeat(pixels, cell_width, axis=1)
+    return Image.fromarray(np.ascontiguousarray(pixels), 'RGBA')
+
+
+def create_fleet_heatmap(utilization, cell_width: int = 4, cell_height: int = 4) -> bytes:
+    """
+    Create a PNG heatmap of every GPU in the fleet.
+
+    Args:
+        utilization: 2-D array-like of utilization (0-100), hosts x GPUs
+        cell_width: Width of each cell in pixels
+        cell_height: Height of each cell in pixels
+
+    Returns:
+        PNG image bytes
+    """
+    return _encode_png(render_fleet_heatmap(utilization, cell_width, cell_height))
+
+
+class SparklineIcon:
+    """
+    Menu bar icon charting the recent utilization of each GPU.
+
+    Each GPU gets a horizontal lane showing its last samples as coloured
+    columns, newest on the right. The chart is kept as a pixel buffer:
+    push() scrolls it one column left and draws only the new column, so the
+    cost per refresh does not depend on how many samples are shown.
+    """
+
+    def __init__(self, gpu_count: int, size: int = 36):
+        """
+        Args:
+            gpu_count: Number of GPU lanes
+            size: Icon size in pixels
+
+        Raises:
+            ValueError: If the lanes do not fit the icon size
+        """
+        from PIL import Image, ImageDraw
+
+        self.gpu_count = gpu_count
+        self.size = size
+
+        padding = 2
+        gap = 1
+        lane_height = (size - 2 * padding - (gpu_count - 1) * gap) // max(1, gpu_count)
+        if gpu_count < 1 or lane_height < 3:
+            raise ValueError(f"{gpu_count} GPU lanes do not fit a {size}px icon")
+
+        # Chart interior (inside the lane borders)
+        self._left = padding + 1
+        self._right = size - padding - 2
+        self.samples = self._right - self._left + 1  # Columns = samples shown
+        self._lanes = []  # (interior top, interior bottom) per GPU
+
+        self.image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(self.image)
+        for i in range(gpu_count):
+            top = padding + i * (lane_height + gap)
+            bottom = top + lane_height - 1
+            draw.rectangle(
+                [padding, top, size - padding - 1, bottom],
+                fill=COLORS["bg_dark"],
+                outline=COLORS["border"],
+                width=1
+            )
+            self._lanes.append((top + 1, bottom - 1))
+
+    @classmethod
+    def from_history(cls, store, hostname: str, gpu_ids: Sequence[int], size: int = 36) -> "SparklineIcon":
+        """
+        Create a sparkline pre-filled from a history.HistoryStore.
+
+        Args:
+            store: HistoryStore holding "utilization" series
+            hostname: Host whose GPUs are charted
+            gpu_ids: GPUs to chart, one lane each
+            size: Icon size in pixels
+        """
+        icon = cls(len(gpu_ids), size)
+        series = [store.window(hostname, gpu_id, "utilization")[1][-icon.samples:] for gpu_id in gpu_ids]
+        length = max((len(values) for values in series), default=0)
+        # GPUs with a shorter history start with empty columns
+        padded = [[0.0] * (length - len(values)) + [float(v) for v in values] for values in series]
+        for column in zip(*padded):
+            icon._draw_column(column)
+        return icon
+
+    def _draw_column(self, percents: Sequence[float]):
+        """Scroll the chart one column left and draw percents at the right edge."""
+        if len(percents) != self.gpu_count:
+            raise ValueError(f"Expected {self.gpu_count} GPU values, got {len(percents)}")
+        from PIL import ImageDraw
+
+        # Shift everything right of the first chart column one pixel left;
+        # borders are uniform along x, so only the lane interiors change
+        strip = self.image.crop((self._left + 1, 0, self._right + 1, self.size))
+        self.image.paste(strip, (self._left, 0))
+
+        draw = ImageDraw.Draw(self.image)
+        x = self._right
+        for (top, bottom), percent in zip(self._lanes, percents):
+            percent = max(0, min(100, percent))
+            draw.line([x, top, x, bottom], fill=COLORS["bg_dark"])
+            filled_height = int((bottom - top + 1) * percent / 100)
+            if filled_height > 0:
+                draw.line([x, bottom - filled_height + 1, x, bottom], fill=get_utilization_color(percent))
+
+    def push(self, percents: Sequence[float]) -> bytes:
+        """
+        Add one sample per GPU and get the updated icon.
+
+        Args:
+            percents: Utilization (0-100) of each GPU, in lane order
+
+        Returns:
+            PNG image bytes
+        """
+        self._draw_column(percents)
+        return _encode_png(self.image)
+
+    def to_png(self) -> bytes:
+        """Encode the current chart without adding a sample."""
+        return _encode_png(self.image)
+
+    def to_buffer(self, format: str = "png") -> IconBuffer:
+        """Get the current chart as an IconBuffer (PNG or raw RGBA)."""
+        return IconBuffer.from_image(self.image, format)
 
 
 def create_error_icon(size: int = 36) -> bytes:
@@ -172,6 +634,13 @@ def create_error_icon(size: int = 36) -> bytes:
     Returns:
         PNG image bytes
     """
+    return _icon_cache.get(("error", size), lambda: _render_error_icon(size))
+
+
+def _render_error_icon(size: int) -> bytes:
+    """Draw and encode the error icon."""
+    from PIL import Image, ImageDraw
+
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
@@ -180,9 +649,7 @@ def create_error_icon(size: int = 36) -> bytes:
     draw.line([padding, padding, size - padding, size - padding], fill='#ff3333', width=3)
     draw.line([padding, size - padding, size - padding, padding], fill='#ff3333', width=3)
 
-    buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    return buffer.getvalue()
+    return _encode_png(img)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""
+Persisted last-known GPU snapshot per host.
+Every successful fetch is written to a small JSON file so the next launch can
+show real numbers immediately, marked stale, while the first live fetch is
+still waiting for the SSH handshake.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from .gpu_fetcher import GPUData, gpu_data_from_dict, gpu_data_to_dict
+from .snapshot_cache import SNAPSHOT_FRESH, CachedSnapshot
+
+DEFAULT_PATH = os.path.expanduser("~/Library/Caches/gpu-usage-menubar/last_snapshot.json")
+
+FORMAT_VERSION = 1
+
+
+class StoredSnapshot(NamedTuple):
+    """A GPUData loaded from disk with the time it was saved."""
+    data: GPUData
+    saved_at: float  # Epoch seconds
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the snapshot was saved."""
+        return max(0.0, (time.time() if now is None else now) - self.saved_at)
+
+
+def format_age(seconds: float) -> str:
+    """Format an age in seconds as a short string such as "45s" or "3h"."""
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+
+class LastSnapshotStore:
+    """
+    JSON file holding the latest GPUData of every host.
+
+    Writes go to a temporary file in the same directory that is then renamed
+    over the old one, so a crash mid-write never leaves a truncated cache.
+    Unreadable or incompatible files are treated as empty.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Args:
+            path: Cache file location (parent directories are created on save)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: Optional[Dict[str, Dict]] = None
+        self._recorded: Dict[str, GPUData] = {}  # Last snapshot passed to record() per host
+
+    def _read(self) -> Dict[str, Dict]:
+        if self._records is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    content = json.load(f)
+                if content.get("version") != FORMAT_VERSION:
+                    raise ValueError(f"unsupported version {content.get('version')!r}")
+                self._records = dict(content["hosts"])
+            except FileNotFoundError:
+                self._records = {}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                logging.warning(f"Ignoring unreadable snapshot cache {self.path}: {e}")
+                self._records = {}
+        return self._records
+
+    def load(self, hostname: str, max_age: Optional[float] = None) -> Optional[StoredSnapshot]:
+        """
+        Get the last saved snapshot of a host.
+
+        Args:
+            hostname: Host to look up
+            max_age: Ignore snapshots older than this many seconds
+
+        Returns:
+            StoredSnapshot, or None if there is no usable snapshot
+        """
+        with self._lock:
+            record = self._read().get(hostname)
+        if record is None:
+            return None
+        try:
+            snapshot = StoredSnapshot(gpu_data_from_dict(record["data"]), float(record["saved_at"]))
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning(f"Ignoring cached snapshot of {hostname}: {e}")
+            return None
+        if max_age is not None and snapshot.age() > max_age:
+            return None
+        return snapshot
+
+    def save(self, gpu_data: GPUData, saved_at: Optional[float] = None):
+        """
+        Replace the stored snapshot of gpu_data.hostname.
+
+        Args:
+            gpu_data: Successful fetch result
+            saved_at: Epoch seconds of the fetch (default: now)
+        """
+        with self._lock:
+            records = self._read()
+            records[gpu_data.hostname] = {
+                "saved_at": time.time() if saved_at is None else saved_at,
+                "data": gpu_data_to_dict(gpu_data),
+            }
+            content = json.dumps({"version": FORMAT_VERSION, "hosts": records}, separators=(",", ":"))
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".last_snapshot-", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def record(self, snapshot: CachedSnapshot) -> bool:
+        """
+        Save a snapshot reported by SnapshotCache if it holds newly fetched data.
+
+        Failed revalidations and repeated reports of data already saved are
+        skipped, so the stored time is always when the data was fetched.
+
+        Args:
+            snapshot: Snapshot passed to SnapshotCache's on_update
+
+        Returns:
+            True if the snapshot was saved
+        """
+        if snapshot.state != SNAPSHOT_FRESH or snapshot.error is not None:
+            return False
+        if self._recorded.get(snapshot.hostname) is snapshot.data:
+            return False
+        self.save(snapshot.data, saved_at=time.time() - snapshot.age)
+        self._recorded[snapshot.hostname] = snapshot.data
+        return True
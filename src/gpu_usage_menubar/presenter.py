@@ -0,0 +1,58 @@
+"""
+Platform-neutral icon presenters.
+The app hands every rendered icon to a presenter instead of writing it to a
+file, so the same rendering pipeline can drive the macOS status item, tests
+and headless consumers.
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from .icon_generator import IconBuffer
+
+
+class IconPresenter(ABC):
+    """Interface for something that displays status icons."""
+
+    @abstractmethod
+    def present(self, icon: IconBuffer, title: str = ""):
+        """
+        Display an icon.
+
+        Args:
+            icon: Encoded icon (PNG or raw RGBA)
+            title: Optional text shown next to the icon
+        """
+
+    @abstractmethod
+    def clear(self, title: str = ""):
+        """Remove the icon, optionally leaving a text title."""
+
+
+class MemoryPresenter(IconPresenter):
+    """Presenter that keeps the frames it receives, for tests and headless use."""
+
+    def __init__(self, keep: int = 1):
+        """
+        Args:
+            keep: Number of most recent frames to remember
+        """
+        self.keep = keep
+        self.frames: List[IconBuffer] = []
+        self.title = ""
+        self.presented = 0
+
+    @property
+    def icon(self) -> Optional[IconBuffer]:
+        """The icon currently shown, or None."""
+        return self.frames[-1] if self.frames else None
+
+    def present(self, icon: IconBuffer, title: str = ""):
+        self.frames.append(icon)
+        del self.frames[:-self.keep]
+        self.title = title
+        self.presented += 1
+
+    def clear(self, title: str = ""):
+        self.frames = []
+        self.title = title
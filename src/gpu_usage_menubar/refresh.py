@@ -0,0 +1,123 @@
+"""
+Single-flight refresh coordination.
+Refresh triggers (timer ticks, wake notifications, manual refreshes) ask the
+coordinator for a host's data instead of fetching it themselves. Concurrent
+requests for a host share one in-flight fetch, and requests that need newer
+data than the running fetch can provide collapse into a single follow-up, so
+a burst of triggers costs at most two remote calls instead of one per trigger.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class _Flight:
+    """Fetch state of a single host."""
+    current: Future
+    follow_up: Optional[Future] = None
+
+
+class RefreshCoordinator:
+    """
+    Runs at most one fetch per host at a time and hands out futures for it.
+
+    Each host has at most one running fetch and at most one queued follow-up.
+    request() returns the running fetch's future, or with fresh=True the
+    follow-up's, which starts as soon as the running fetch finishes.
+    """
+
+    def __init__(self, fetch: Callable[[str], object], max_workers: int = 4):
+        """
+        Args:
+            fetch: Blocking fetch for one host; its return value (or exception)
+                becomes the future's result
+            max_workers: Maximum hosts fetched in parallel
+        """
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.requests = 0  # Calls to request()
+        self.fetches = 0   # Fetches actually started
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def request(self, hostname: str, fresh: bool = False) -> Future:
+        """
+        Ask for a refresh of a host.
+
+        Args:
+            hostname: Host to refresh
+            fresh: Require a fetch that starts after this call. If one is
+                already running, share the single follow-up queued behind it.
+
+        Returns:
+            Future resolving to the fetch result
+
+        Raises:
+            RuntimeError: If the coordinator has been closed
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("RefreshCoordinator is closed")
+            self.requests += 1
+            flight = self._flights.get(hostname)
+            if flight is None:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._flights[hostname] = _Flight(future)
+                self._submit(hostname, future)
+                return future
+            if not fresh:
+                return flight.current
+            if flight.follow_up is None or flight.follow_up.cancelled():
+                flight.follow_up = Future()
+            return flight.follow_up
+
+    def in_flight(self, hostname: str) -> bool:
+        """Whether a fetch of the host is running."""
+        with self._lock:
+            return hostname in self._flights
+
+    def _submit(self, hostname: str, future: Future):
+        # Called with self._lock held
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="refresh")
+        self.fetches += 1
+        self._executor.submit(self._run, hostname, future)
+
+    def _run(self, hostname: str, future: Future):
+        try:
+            result = self.fetch(hostname)
+        except Exception as e:
+            error, result = e, None
+        else:
+            error = None
+
+        with self._lock:
+            flight = self._flights[hostname]
+            follow_up, flight.follow_up = flight.follow_up, None
+            if follow_up is not None and self._closed:
+                follow_up.cancel()
+            elif follow_up is not None and follow_up.set_running_or_notify_cancel():
+                flight.current = follow_up
+                self._submit(hostname, follow_up)
+            if flight.current is future:
+                del self._flights[hostname]
+
+        # Resolve outside the lock; done callbacks may request again
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def close(self):
+        """Stop accepting requests; running fetches finish in the background."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,181 @@
+"""
+Multi-resolution rollups of GPU metrics.
+Every GPUData sample updates min/max/sum/count aggregates for 1 second,
+1 minute and 1 hour buckets in SQLite, so long time ranges are read from a
+few pre-aggregated rows instead of raw samples. Each tier has its own
+retention, so fine-grained data ages out while hourly data is kept for months.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+from .gpu_fetcher import GPUData
+
+
+class RollupTier(NamedTuple):
+    """One resolution level of the rollup store."""
+    name: str
+    seconds: int     # Bucket width
+    retention: float  # Seconds of history kept
+
+
+DEFAULT_TIERS = (
+    RollupTier("1s", 1, 6 * 3600),
+    RollupTier("1m", 60, 14 * 24 * 3600),
+    RollupTier("1h", 3600, 400 * 24 * 3600),
+)
+
+# GPUInfo fields that are rolled up
+ROLLUP_METRICS = ("utilization", "memory_used", "memory_percent", "temperature", "power_draw")
+
+
+class RollupPoint(NamedTuple):
+    """Aggregate of one metric over one bucket."""
+    timestamp: float  # Bucket start, epoch seconds
+    min: float
+    max: float
+    mean: float
+    count: int
+
+
+class RollupStore:
+    """
+    SQLite-backed 1s/1m/1h rollups keyed by host, GPU and metric.
+
+    record() folds each sample into the current bucket of every tier with an
+    UPSERT, so no tier is ever recomputed from raw data. query() picks the
+    coarsest tier whose bucket width does not exceed the requested resolution.
+    """
+
+    def __init__(self, path: str, tiers: Sequence[RollupTier] = DEFAULT_TIERS, prune_interval: float = 60.0):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a transient store)
+            tiers: Resolution levels, finest first
+            prune_interval: Minimum seconds between retention passes
+        """
+        self.tiers = sorted(tiers, key=lambda tier: tier.seconds)
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for tier in self.tiers:
+                self._conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self._table(tier)} (
+                        hostname TEXT NOT NULL,
+                        gpu_id INTEGER NOT NULL,
+                        metric TEXT NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        min REAL NOT NULL,
+                        max REAL NOT NULL,
+                        sum REAL NOT NULL,
+                        count INTEGER NOT NULL,
+                        PRIMARY KEY (hostname, gpu_id, metric, bucket)
+                    ) WITHOUT ROWID
+                """)
+
+    @staticmethod
+    def _table(tier: RollupTier) -> str:
+        return f"rollup_{tier.seconds}s"
+
+    def record(self, gpu_data: GPUData, timestamp: Optional[float] = None):
+        """
+        Fold one snapshot into every tier.
+
+        Args:
+            gpu_data: Snapshot to aggregate; metrics that are not finite
+                (e.g. power_draw of a GPU without power readings) are skipped
+            timestamp: Epoch seconds of the snapshot (default: now)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        values = [
+            (gpu.gpu_id, metric, float(getattr(gpu, metric)))
+            for gpu in gpu_data.gpus
+            for metric in ROLLUP_METRICS
+        ]
+        # SQLite stores NaN as NULL, which the NOT NULL columns reject
+        values = [(gpu_id, metric, v) for gpu_id, metric, v in values if math.isfinite(v)]
+        if not values:
+            return
+
+        with self._lock, self._conn:
+            for tier in self.tiers:
+                bucket = int(timestamp // tier.seconds)
+                self._conn.executemany(f"""
+                    INSERT INTO {self._table(tier)} (hostname, gpu_id, metric, bucket, min, max, sum, count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT (hostname, gpu_id, metric, bucket) DO UPDATE SET
+                        min = MIN(min, excluded.min),
+                        max = MAX(max, excluded.max),
+                        sum = sum + excluded.sum,
+                        count = count + 1
+                """, [(gpu_data.hostname, gpu_id, metric, bucket, v, v, v) for gpu_id, metric, v in values])
+
+            if timestamp - self._last_prune >= self.prune_interval:
+                self._prune(timestamp)
+                self._last_prune = timestamp
+
+    def _prune(self, now: float):
+        for tier in self.tiers:
+            cutoff = int((now - tier.retention) // tier.seconds)
+            self._conn.execute(f"DELETE FROM {self._table(tier)} WHERE bucket < ?", (cutoff,))
+
+    def prune(self, now: Optional[float] = None):
+        """Apply the retention policy of every tier now."""
+        with self._lock, self._conn:
+            self._prune(time.time() if now is None else now)
+
+    def select_tier(self, resolution: float) -> RollupTier:
+        """Get the coarsest tier with buckets no wider than resolution."""
+        eligible = [tier for tier in self.tiers if tier.seconds <= resolution]
+        return eligible[-1] if eligible else self.tiers[0]
+
+    def query(
+        self,
+        hostname: str,
+        gpu_id: int,
+        metric: str,
+        start: float,
+        end: Optional[float] = None,
+        resolution: float = 1.0
+    ) -> List[RollupPoint]:
+        """
+        Read aggregates of one metric over a time range.
+
+        Args:
+            hostname: Host the GPU belongs to
+            gpu_id: GPU index on the host
+            metric: One of ROLLUP_METRICS
+            start: Range start, epoch seconds
+            end: Range end, epoch seconds (default: now)
+            resolution: Widest acceptable bucket in seconds
+
+        Returns:
+            RollupPoints ordered by time
+        """
+        tier = self.select_tier(resolution)
+        if end is None:
+            end = time.time()
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT bucket, min, max, sum, count FROM {self._table(tier)}
+                WHERE hostname = ? AND gpu_id = ? AND metric = ? AND bucket BETWEEN ? AND ?
+                ORDER BY bucket
+            """, (hostname, gpu_id, metric, int(start // tier.seconds), int(end // tier.seconds))).fetchall()
+        return [
+            RollupPoint(bucket * tier.seconds, low, high, total / count, count)
+            for bucket, low, high, total, count in rows
+        ]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
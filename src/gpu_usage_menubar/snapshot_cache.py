@@ -0,0 +1,207 @@
+"""
+Stale-while-revalidate cache in front of fetch_gpu_data.
+Reads return the latest snapshot of a host immediately and never wait on
+SSH. Snapshots older than a freshness TTL are refetched in the background,
+and a failed refetch keeps the previous data in service (marked stale, with
+its age) until it exceeds a maximum staleness, so a single timed-out fetch
+no longer replaces good data with an error.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, NamedTuple, Optional, Set
+
+from .gpu_fetcher import GPUData
+from .refresh import RefreshCoordinator
+
+# Snapshot states reported by SnapshotCache.get
+SNAPSHOT_FRESH = "fresh"      # Younger than the freshness TTL
+SNAPSHOT_STALE = "stale"      # Older than the TTL but within max staleness
+SNAPSHOT_PENDING = "pending"  # No usable data yet, first fetch in progress
+SNAPSHOT_ERROR = "error"      # No usable data and the last fetch failed
+
+
+class CachedSnapshot(NamedTuple):
+    """What SnapshotCache.get returns for one host."""
+    hostname: str
+    state: str
+    data: Optional[GPUData]  # None for SNAPSHOT_PENDING and SNAPSHOT_ERROR
+    age: Optional[float]     # Seconds since data was fetched
+    error: Optional[str]     # Message of the last failed fetch, cleared on success
+    revalidating: bool       # A background fetch is in flight
+
+
+@dataclass
+class _Entry:
+    """Cache record for a single host."""
+    data: Optional[GPUData] = None
+    fetched_at: float = 0.0
+    error: Optional[str] = None
+    last_attempt: Optional[float] = None
+    pending: Set[Future] = field(default_factory=set)  # Coordinator futures not yet applied
+
+
+class SnapshotCache:
+    """
+    Per-host GPUData cache with background revalidation.
+
+    A host is refetched when its data is older than fresh_ttl, at most once
+    per fresh_ttl while fetches keep failing. Data kept after a failed fetch
+    is reported as SNAPSHOT_STALE whatever its age, and data older than
+    max_staleness is no longer served; get() then reports SNAPSHOT_ERROR (or
+    SNAPSHOT_PENDING while a fetch is still running). Fetches go through a
+    RefreshCoordinator, so overlapping triggers share one remote call.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Optional[GPUData]],
+        fresh_ttl: float = 30.0,
+        max_staleness: float = 900.0,
+        on_update: Optional[Callable[[CachedSnapshot], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        coordinator: Optional[RefreshCoordinator] = None
+    ):
+        """
+        Args:
+            fetch: Blocking fetch for one host, returning None or raising on failure
+            fresh_ttl: Seconds a snapshot is served without revalidation
+            max_staleness: Seconds a snapshot is served at all
+            on_update: Called from the fetch thread after every revalidation
+            clock: Monotonic time source
+            coordinator: Shared coordinator to fetch through (default: a
+                private one wrapping fetch)
+        """
+        if max_staleness < fresh_ttl:
+            raise ValueError("max_staleness must not be shorter than fresh_ttl")
+        self.fetch = fetch
+        self.fresh_ttl = fresh_ttl
+        self.max_staleness = max_staleness
+        self.on_update = on_update
+        self.clock = clock
+        self._owns_coordinator = coordinator is None
+        self.coordinator = coordinator or RefreshCoordinator(fetch)
+        self._lock = threading.Lock()
+        self._applied = threading.Condition(self._lock)
+        self._entries: Dict[str, _Entry] = {}
+
+    def _snapshot(self, hostname: str, entry: _Entry, now: float) -> CachedSnapshot:
+        revalidating = bool(entry.pending)
+        age = now - entry.fetched_at if entry.data is not None else None
+        if age is not None and age <= self.max_staleness:
+            # Data kept after a failed refetch is stale even within the TTL
+            state = SNAPSHOT_FRESH if age <= self.fresh_ttl and entry.error is None else SNAPSHOT_STALE
+            return CachedSnapshot(hostname, state, entry.data, age, entry.error, revalidating)
+        state = SNAPSHOT_PENDING if revalidating else SNAPSHOT_ERROR
+        return CachedSnapshot(hostname, state, None, age, entry.error, revalidating)
+
+    def _should_revalidate(self, entry: _Entry, now: float) -> bool:
+        if entry.pending:
+            return False
+        if entry.data is not None and now - entry.fetched_at <= self.fresh_ttl:
+            return False
+        return entry.last_attempt is None or now - entry.last_attempt >= self.fresh_ttl
+
+    def get(self, hostname: str) -> CachedSnapshot:
+        """
+        Get the cached snapshot of a host without blocking.
+
+        Starts a background revalidation if the data is older than fresh_ttl
+        (or missing) and none is already running.
+        """
+        with self._lock:
+            entry = self._entries.setdefault(hostname, _Entry())
+            revalidate = self._should_revalidate(entry, self.clock())
+        if revalidate:
+            self._request(hostname, fresh=False)
+        with self._lock:
+            return self._snapshot(hostname, entry, self.clock())
+
+    def refresh(self, hostname: str) -> CachedSnapshot:
+        """
+        Like get(), but always revalidate. If a fetch is already running,
+        the host is fetched once more after it (shared by all such calls).
+        """
+        with self._lock:
+            entry = self._entries.setdefault(hostname, _Entry())
+        self._request(hostname, fresh=True)
+        with self._lock:
+            return self._snapshot(hostname, entry, self.clock())
+
+    def put(self, gpu_data: GPUData, age: float = 0.0):
+        """
+        Store a snapshot obtained elsewhere (e.g. loaded from disk at startup).
+
+        Args:
+            gpu_data: Snapshot to store under gpu_data.hostname
+            age: Seconds since the snapshot was taken
+        """
+        with self._lock:
+            entry = self._entries.setdefault(gpu_data.hostname, _Entry())
+            fetched_at = self.clock() - age
+            if entry.data is None or fetched_at > entry.fetched_at:
+                entry.data = gpu_data
+                entry.fetched_at = fetched_at
+
+    def wait(self, hostname: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for an in-flight revalidation of a host to finish.
+
+        Returns:
+            True if no revalidation is running anymore
+        """
+        with self._lock:
+            entry = self._entries.get(hostname)
+            if entry is None:
+                return True
+            return self._applied.wait_for(lambda: not entry.pending, timeout)
+
+    def close(self):
+        """Stop the private coordinator (a shared one is left running)."""
+        if self._owns_coordinator:
+            self.coordinator.close()
+
+    def _request(self, hostname: str, fresh: bool):
+        future = self.coordinator.request(hostname, fresh=fresh)
+        with self._lock:
+            entry = self._entries[hostname]
+            entry.last_attempt = self.clock()
+            if future in entry.pending:
+                return
+            entry.pending.add(future)
+        # Outside the lock: runs immediately if the future is already done
+        future.add_done_callback(partial(self._revalidated, hostname))
+
+    def _revalidated(self, hostname: str, future: Future):
+        data = None
+        error = None
+        try:
+            data = future.result()
+            if data is None or not data.gpus:
+                data = None
+                error = "Failed to fetch GPU data"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        if error is not None:
+            logging.warning(f"Revalidation of {hostname} failed: {error}")
+
+        with self._lock:
+            entry = self._entries[hostname]
+            now = self.clock()
+            if data is not None:
+                entry.data = data
+                entry.fetched_at = now
+            entry.error = error
+            entry.pending.discard(future)
+            self._applied.notify_all()
+            snapshot = self._snapshot(hostname, entry, now)
+
+        if self.on_update is not None:
+            try:
+                self.on_update(snapshot)
+            except Exception as e:
+                logging.error(f"Snapshot update callback failed for {hostname}: {e}")
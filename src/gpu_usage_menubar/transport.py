@@ -0,0 +1,531 @@
+"""
+Transports for running commands on GPU hosts.
+SSHConnectionManager and fetch_gpu_data are written against the Transport
+interface, so the same pipeline can run over SSH ControlMaster, on the local
+machine, or against an in-memory fake for tests and load testing.
+"""
+
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+
+async def run_process_async(cmd: List[str], timeout: float) -> Tuple[str, str]:
+    """
+    Run a command as an asyncio subprocess and collect its output.
+
+    The child process is killed if the timeout expires or the awaiting task
+    is cancelled, so no orphaned ssh processes are left behind.
+
+    Returns:
+        Tuple of (stdout, stderr)
+
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time
+        subprocess.CalledProcessError: If the command exited non-zero
+    """
+    import asyncio  # Loads concurrent.futures; only needed by asyncio callers
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except BaseException as e:
+        # Timeout or cancellation: make sure the child does not outlive us
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            try:
+                await asyncio.shield(proc.wait())
+            except asyncio.CancelledError:
+                pass
+        if isinstance(e, asyncio.TimeoutError):
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+        raise
+
+    stdout_text = stdout.decode(errors="replace")
+    stderr_text = stderr.decode(errors="replace")
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout_text, stderr_text)
+    return stdout_text, stderr_text
+
+
+async def _in_thread(func: Callable, *args):
+    """Run a blocking call on the event loop's default executor."""
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+class Transport(ABC):
+    """
+    Interface for connecting to hosts and running commands on them.
+
+    Subclasses must implement run(); the connection methods default to a
+    transport without persistent connections, and the asyncio variants
+    (run_async() etc.) default to calling the blocking ones on a worker
+    thread.
+
+    run() reports failures the same way subprocess.run(check=True) does:
+    subprocess.TimeoutExpired on timeout and subprocess.CalledProcessError on
+    a non-zero exit, with exit status 255 reserved for connection errors.
+    """
+
+    def has_connection(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Return True if a connection to the host appears to be open."""
+        return True
+
+    def check(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Verify that an open connection is still alive."""
+        return True
+
+    def connect(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
+        """Open a connection to the host. Returns True on success."""
+        return True
+
+    @abstractmethod
+    def run(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Run a shell command on the host and return its stdout."""
+
+    def get_run_command(self, hostname: str, ssh_user: Optional[str], command: str) -> List[str]:
+        """
+        Get arguments of a local process that runs a command on the host.
+
+        Used for long-running commands whose output is streamed.
+
+        Raises:
+            NotImplementedError: If the transport does not run commands
+                through local processes
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot run streaming commands")
+
+    def close(self, hostname: str, ssh_user: Optional[str] = None):
+        """Close the connection to the host, if any."""
+
+    def cleanup_all(self):
+        """Close all connections and release resources."""
+
+    async def check_async(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Asyncio counterpart of check()."""
+        return await _in_thread(self.check, hostname, ssh_user)
+
+    async def connect_async(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
+        """Asyncio counterpart of connect()."""
+        return await _in_thread(self.connect, hostname, ssh_user, timeout)
+
+    async def run_async(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Asyncio counterpart of run()."""
+        return await _in_thread(self.run, hostname, ssh_user, command, timeout)
+
+    async def close_async(self, hostname: str, ssh_user: Optional[str] = None):
+        """Asyncio counterpart of close()."""
+        await _in_thread(self.close, hostname, ssh_user)
+
+
+class SSHTransport(Transport):
+    """
+    Runs commands over SSH using one ControlMaster connection per host.
+
+    Only ONE SSH connection is maintained to each remote server, and all
+    commands reuse it through the control socket.
+    """
+
+    def __init__(self):
+        self._control_dir = tempfile.mkdtemp(prefix='gpu_monitor_ssh_')
+        self._active_connections = {}  # host string -> control_path
+
+    def get_control_path(self, hostname: str, ssh_user: Optional[str] = None) -> str:
+        """Get the control socket path for a given host."""
+        key = f"{ssh_user}@{hostname}" if ssh_user else hostname
+        return os.path.join(self._control_dir, f"ctrl-{key.replace('@', '_at_')}.sock")
+
+    def get_host_string(self, hostname: str, ssh_user: Optional[str] = None) -> str:
+        """Get the SSH host string (user@host or just host)."""
+        return f"{ssh_user}@{hostname}" if ssh_user else hostname
+
+    def get_master_command(self, hostname: str, ssh_user: Optional[str] = None) -> List[str]:
+        """
+        Get SSH command arguments that start a background master connection.
+
+        Returns:
+            List of SSH command arguments for the ControlMaster process
+        """
+        control_path = self.get_control_path(hostname, ssh_user)
+        host_string = self.get_host_string(hostname, ssh_user)
+
+        return [
+            "ssh",
+            "-o", f"ControlPath={control_path}",
+            "-o", "ControlMaster=yes",
+            "-o", "ControlPersist=600",  # Keep connection alive for 10 minutes
+            "-o", "ServerAliveInterval=30",  # Send keepalive every 30 seconds
+            "-o", "ServerAliveCountMax=3",
+            "-o", "BatchMode=yes",  # Never prompt for password
+            "-o", "ConnectTimeout=10",
+            "-N",  # Don't execute remote command, just connect
+            "-f",  # Go to background after connection
+            host_string
+        ]
+
+    def get_control_command(self, operation: str, hostname: str, ssh_user: Optional[str] = None) -> List[str]:
+        """
+        Get SSH command arguments that send a control request to the master.
+
+        Args:
+            operation: ssh -O operation, e.g. "check" or "exit"
+
+        Returns:
+            List of SSH command arguments
+        """
+        control_path = self.get_control_path(hostname, ssh_user)
+        host_string = self.get_host_string(hostname, ssh_user)
+
+        return [
+            "ssh", "-O", operation,
+            "-o", f"ControlPath={control_path}",
+            host_string
+        ]
+
+    def get_ssh_command(self, hostname: str, ssh_user: Optional[str] = None) -> List[str]:
+        """
+        Get SSH command arguments that use the multiplexed connection.
+
+        Returns:
+            List of SSH command arguments including ControlPath options
+        """
+        control_path = self.get_control_path(hostname, ssh_user)
+        host_string = self.get_host_string(hostname, ssh_user)
+
+        return [
+            "ssh",
+            "-o", f"ControlPath={control_path}",
+            "-o", "ControlMaster=auto",  # Use existing master or create new one
+            "-o", "BatchMode=yes",
+            host_string
+        ]
+
+    def register_connection(self, hostname: str, ssh_user: Optional[str] = None):
+        """Record a master connection opened outside connect() for cleanup."""
+        host_string = self.get_host_string(hostname, ssh_user)
+        self._active_connections[host_string] = self.get_control_path(hostname, ssh_user)
+
+    def unregister_connection(self, hostname: str, ssh_user: Optional[str] = None):
+        """Forget a master connection that was closed outside close()."""
+        self._active_connections.pop(self.get_host_string(hostname, ssh_user), None)
+
+    def has_connection(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Return True if a control socket exists for the host."""
+        return os.path.exists(self.get_control_path(hostname, ssh_user))
+
+    def check(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Verify the master with ssh -O check, removing the socket if it is dead."""
+        control_path = self.get_control_path(hostname, ssh_user)
+        check_cmd = self.get_control_command("check", hostname, ssh_user)
+        try:
+            result = subprocess.run(check_cmd, capture_output=True, timeout=5)
+            if result.returncode == 0:
+                return True  # Connection is alive
+        except subprocess.TimeoutExpired:
+            pass
+
+        # Connection dead, remove stale socket
+        try:
+            os.remove(control_path)
+        except OSError:
+            pass
+        return False
+
+    def connect(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
+        """Start a new master connection."""
+        host_string = self.get_host_string(hostname, ssh_user)
+        master_cmd = self.get_master_command(hostname, ssh_user)
+
+        try:
+            result = subprocess.run(master_cmd, capture_output=True, text=True, timeout=timeout)
+            if result.returncode == 0:
+                self.register_connection(hostname, ssh_user)
+                print(f"SSH master connection established to {host_string}", file=sys.stderr)
+                return True
+            else:
+                print(f"Failed to establish SSH master connection: {result.stderr}", file=sys.stderr)
+        except subprocess.TimeoutExpired:
+            print(f"SSH master connection timed out for {host_string}", file=sys.stderr)
+        except Exception as e:
+            print(f"Error establishing SSH master connection: {e}", file=sys.stderr)
+        return False
+
+    def get_run_command(self, hostname: str, ssh_user: Optional[str], command: str) -> List[str]:
+        """Get ssh arguments that run a command through the multiplexed connection."""
+        return self.get_ssh_command(hostname, ssh_user) + [command]
+
+    def run(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Run a command through the multiplexed connection."""
+        result = subprocess.run(
+            self.get_run_command(hostname, ssh_user, command),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=True
+        )
+        return result.stdout
+
+    def close(self, hostname: str, ssh_user: Optional[str] = None):
+        """Close the master connection for a specific host."""
+        control_path = self.get_control_path(hostname, ssh_user)
+        host_string = self.get_host_string(hostname, ssh_user)
+
+        if os.path.exists(control_path):
+            close_cmd = self.get_control_command("exit", hostname, ssh_user)
+            try:
+                subprocess.run(close_cmd, capture_output=True, timeout=5)
+                print(f"SSH connection closed for {host_string}", file=sys.stderr)
+            except Exception as e:
+                print(f"Error closing SSH connection: {e}", file=sys.stderr)
+
+            # Clean up socket file
+            try:
+                os.remove(control_path)
+            except OSError:
+                pass
+
+        self.unregister_connection(hostname, ssh_user)
+
+    def cleanup_all(self):
+        """Close all active SSH connections and clean up."""
+        print("Cleaning up SSH connections...", file=sys.stderr)
+        for host_string, control_path in list(self._active_connections.items()):
+            if os.path.exists(control_path):
+                close_cmd = [
+                    "ssh", "-O", "exit",
+                    "-o", f"ControlPath={control_path}",
+                    host_string
+                ]
+                try:
+                    subprocess.run(close_cmd, capture_output=True, timeout=5)
+                except Exception:
+                    pass
+
+        # Clean up control directory
+        if self._control_dir and os.path.exists(self._control_dir):
+            shutil.rmtree(self._control_dir, ignore_errors=True)
+
+        self._active_connections.clear()
+
+    async def check_async(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Asyncio counterpart of check()."""
+        try:
+            await run_process_async(self.get_control_command("check", hostname, ssh_user), 5)
+            return True  # Connection is alive
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            pass
+
+        # Connection dead, remove stale socket
+        try:
+            os.remove(self.get_control_path(hostname, ssh_user))
+        except OSError:
+            pass
+        return False
+
+    async def connect_async(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
+        """Asyncio counterpart of connect()."""
+        host_string = self.get_host_string(hostname, ssh_user)
+        try:
+            await run_process_async(self.get_master_command(hostname, ssh_user), timeout)
+        except subprocess.TimeoutExpired:
+            print(f"SSH master connection timed out for {host_string}", file=sys.stderr)
+            return False
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"Failed to establish SSH master connection: {getattr(e, 'stderr', e)}", file=sys.stderr)
+            return False
+
+        self.register_connection(hostname, ssh_user)
+        print(f"SSH master connection established to {host_string}", file=sys.stderr)
+        return True
+
+    async def run_async(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Run a command through the multiplexed connection without blocking the event loop."""
+        stdout, _ = await run_process_async(self.get_run_command(hostname, ssh_user, command), timeout)
+        return stdout
+
+    async def close_async(self, hostname: str, ssh_user: Optional[str] = None):
+        """Asyncio counterpart of close()."""
+        control_path = self.get_control_path(hostname, ssh_user)
+        host_string = self.get_host_string(hostname, ssh_user)
+
+        if os.path.exists(control_path):
+            try:
+                await run_process_async(self.get_control_command("exit", hostname, ssh_user), 5)
+                print(f"SSH connection closed for {host_string}", file=sys.stderr)
+            except Exception as e:
+                print(f"Error closing SSH connection: {e}", file=sys.stderr)
+
+            try:
+                os.remove(control_path)
+            except OSError:
+                pass
+
+        self.unregister_connection(hostname, ssh_user)
+
+
+class LocalTransport(Transport):
+    """Runs commands on the local machine, ignoring the hostname."""
+
+    def get_run_command(self, hostname: str, ssh_user: Optional[str], command: str) -> List[str]:
+        """Get arguments that run a command in a local shell."""
+        return ["/bin/sh", "-c", command]
+
+    def run(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Run a command in a local shell."""
+        result = subprocess.run(
+            command,
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=True
+        )
+        return result.stdout
+
+    async def run_async(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Run a command in a local shell without blocking the event loop."""
+        stdout, _ = await run_process_async(self.get_run_command(hostname, ssh_user, command), timeout)
+        return stdout
+
+
+# Synthetic values for nvidia-smi --query-gpu fields, keyed by field name
+_FAKE_GPU_FIELDS: Dict[str, Callable[[random.Random, str, int], str]] = {
+    "index": lambda rng, host, i: str(i),
+    "name": lambda rng, host, i: "NVIDIA A100-SXM4-80GB",
+    "uuid": lambda rng, host, i: f"GPU-{zlib.crc32(f'{host}:{i}'.encode()):08x}-fake",
+    "utilization.gpu": lambda rng, host, i: str(rng.randint(0, 100)),
+    "memory.used": lambda rng, host, i: str(rng.randint(0, 81920)),
+    "memory.total": lambda rng, host, i: "81920",
+    "temperature.gpu": lambda rng, host, i: str(rng.randint(30, 85)),
+    "power.draw": lambda rng, host, i: f"{rng.uniform(50, 400):.2f}",
+}
+
+_QUERY_GPU_RE = re.compile(r"--query-gpu=([\w.,]+)")
+
+
+class FakeTransport(Transport):
+    """
+    In-memory transport that replays canned nvidia-smi output.
+
+    Commands are never executed. For each host the transport returns the
+    canned output given in ``outputs`` (a string, or a callable taking the
+    command), or otherwise synthesizes ``--query-gpu`` CSV rows for
+    ``gpus_per_host`` GPUs. Latency, random failures, down hosts and hung
+    hosts are simulated so the parse/aggregate pipeline can be profiled
+    against thousands of hosts without real servers.
+    """
+
+    def __init__(
+        self,
+        outputs: Optional[Dict[str, Union[str, Callable[[str], str]]]] = None,
+        gpus_per_host: int = 2,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        down_hosts: Iterable[str] = (),
+        hung_hosts: Iterable[str] = (),
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            outputs: Canned stdout per hostname
+            gpus_per_host: GPU rows to synthesize for hosts without canned output
+            latency: Seconds every run() takes
+            jitter: Extra random latency in seconds, uniform in [0, jitter]
+            failure_rate: Probability that a run() fails with a connection error
+            down_hosts: Hosts whose connect() and run() always fail
+            hung_hosts: Hosts whose run() blocks until the timeout expires
+            seed: Seed for the random latency, failures and synthetic values
+        """
+        self.outputs = dict(outputs or {})
+        self.gpus_per_host = gpus_per_host
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.down_hosts = set(down_hosts)
+        self.hung_hosts = set(hung_hosts)
+        self.commands: List[str] = []  # Every command run, for assertions
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def connect(self, hostname: str, ssh_user: Optional[str] = None, timeout: int = 10) -> bool:
+        """Fail for down hosts, succeed otherwise."""
+        return hostname not in self.down_hosts
+
+    def check(self, hostname: str, ssh_user: Optional[str] = None) -> bool:
+        """Fail for down hosts, succeed otherwise."""
+        return hostname not in self.down_hosts
+
+    def _render_query(self, hostname: str, command: str, rng: random.Random) -> str:
+        match = _QUERY_GPU_RE.search(command)
+        if not match:
+            return ""
+        fields = match.group(1).split(",")
+        rows = []
+        for i in range(self.gpus_per_host):
+            values = [_FAKE_GPU_FIELDS[f](rng, hostname, i) if f in _FAKE_GPU_FIELDS else "[N/A]" for f in fields]
+            rows.append(", ".join(values))
+        return "\n".join(rows) + "\n"
+
+    def _simulate(self, hostname: str, command: str, timeout: float) -> Tuple[float, Optional[Exception], random.Random]:
+        """Record a command and decide its latency and failure, if any."""
+        with self._lock:
+            self.commands.append(command)
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.failure_rate
+            rng = random.Random(self._rng.random())
+
+        if hostname in self.hung_hosts or delay > timeout:
+            return timeout, subprocess.TimeoutExpired(command, timeout), rng
+        if failed or hostname in self.down_hosts:
+            error = subprocess.CalledProcessError(255, command, "", f"ssh: connect to host {hostname}: Connection refused")
+            return delay, error, rng
+        return delay, None, rng
+
+    def _output(self, hostname: str, command: str, rng: random.Random) -> str:
+        output = self.outputs.get(hostname)
+        if callable(output):
+            return output(command)
+        if output is not None:
+            return output
+        return self._render_query(hostname, command, rng)
+
+    def run(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Return canned or synthetic output after the simulated latency."""
+        delay, error, rng = self._simulate(hostname, command, timeout)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return self._output(hostname, command, rng)
+
+    async def run_async(self, hostname: str, ssh_user: Optional[str], command: str, timeout: float) -> str:
+        """Like run(), but waits out the simulated latency on the event loop."""
+        import asyncio
+
+        delay, error, rng = self._simulate(hostname, command, timeout)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return self._output(hostname, command, rng)
@@ -0,0 +1,35 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+from gpu_usage_menubar import gpu_fetcher
+from gpu_usage_menubar.gpu_fetcher import GPUData, GPUInfo, get_ssh_manager
+
+
+def _make_gpu_data(utilization=50.0, hostname="node1", gpus=1):
+    """GPUData with `gpus` GPUs; GPU i reports utilization + i and 40 + i degrees."""
+    return GPUData(
+        gpus=[GPUInfo(i, "GPU", utilization + i, 1000, 8000, 12.5, 40 + i, 200.0) for i in range(gpus)],
+        hostname=hostname,
+        timestamp="12:00:00"
+    )
+
+
+@pytest.fixture
+def make_gpu_data():
+    """Factory for GPUData snapshots: make_gpu_data(utilization=50.0, hostname="node1", gpus=1)."""
+    return _make_gpu_data
+
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    """Install a transport on the SSH manager for the duration of a test: use_transport(transport)."""
+    # Fresh host states restart connection generations, so cached inventories must go too
+    monkeypatch.setattr(gpu_fetcher.SSHConnectionManager, "_host_states", {})
+    gpu_fetcher.get_inventory_cache().clear()
+    manager = get_ssh_manager()
+    previous = manager.transport
+    yield manager.set_transport
+    manager.set_transport(previous)
+    gpu_fetcher.get_inventory_cache().clear()
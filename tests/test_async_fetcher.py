@@ -0,0 +1,100 @@
+"""
+Tests for asyncio GPU fetcher module.
+"""
+
+import asyncio
+
+import pytest
+from gpu_usage_menubar import async_fetcher, gpu_fetcher
+from gpu_usage_menubar.async_fetcher import async_fetch_gpu_data, async_fetch_many
+from gpu_usage_menubar.gpu_fetcher import fetch_gpu_data, get_ssh_manager
+from gpu_usage_menubar.transport import FakeTransport
+
+
+SAMPLE_OUTPUT = "0, Tesla T4, 30, 1024, 15360, 45, 35.00\n"
+
+
+class TestAsyncFetch:
+    """Tests for async_fetch_gpu_data and async_fetch_many."""
+
+    @pytest.fixture(autouse=True)
+    def transport(self, use_transport, monkeypatch):
+        """Serve canned nvidia-smi output in-process; spawning ssh fails the test."""
+        async def no_subprocess(*args, **kwargs):
+            raise AssertionError("ssh must not be spawned")
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", no_subprocess)
+        transport = FakeTransport(outputs={"node1": SAMPLE_OUTPUT}, down_hosts={"down"}, seed=1)
+        use_transport(transport)
+        return transport
+
+    def test_fetch_gpu_data(self):
+        """Test that output is parsed into GPUData."""
+        data = asyncio.run(async_fetch_gpu_data("node1"))
+        assert data.hostname == "node1"
+        assert data.gpus[0].name == "Tesla T4"
+
+    def test_fetch_failure_returns_none(self, transport):
+        """Test that SSH failures return None."""
+        assert asyncio.run(async_fetch_gpu_data("down")) is None
+        transport.failure_rate = 1.0
+        assert asyncio.run(async_fetch_gpu_data("node1")) is None
+
+    def test_fetch_many(self, transport):
+        """Test that every host is reported, including failures."""
+        async def collect():
+            return [r async for r in async_fetch_many(["a", "b", "down"])]
+
+        results = {r.hostname: r for r in asyncio.run(collect())}
+        assert set(results) == {"a", "b", "down"}
+        assert results["a"].data is not None
+        assert "SSH connection to down is degraded" in results["down"].error
+        assert len(transport.commands) == 2  # The down host fails to connect
+
+    def test_fetch_many_simulated_fleet(self, transport):
+        """Test that latency and hung hosts of a fake fleet are awaited on the event loop."""
+        transport.latency = 0.05
+        transport.hung_hosts = {"sim-7"}
+
+        async def collect():
+            return [r async for r in async_fetch_many([f"sim-{i}" for i in range(200)], timeout=1, deadline=0.5)]
+
+        results = {r.hostname: r for r in asyncio.run(collect())}
+        assert len(results) == 200
+        assert "Deadline" in results["sim-7"].error
+        assert sum(r.data is not None for r in results.values()) == 199
+
+    def test_fetch_many_deduplicates_hosts(self):
+        """Test that repeated hosts are fetched once, in first-seen order."""
+        async def collect():
+            return [r async for r in async_fetch_many(["a", "b", "a", ("b", None), "c"] * 50)]
+
+        assert sorted(r.hostname for r in asyncio.run(collect())) == ["a", "b", "c"]
+
+    def test_polls_share_inventory_with_sync_fetcher(self, transport):
+        """Test that async polls use the dynamic query once the inventory is cached by either path."""
+        asyncio.run(async_fetch_gpu_data("a"))
+        asyncio.run(async_fetch_gpu_data("a"))
+        fetch_gpu_data("a")
+        assert transport.commands == [gpu_fetcher.NVIDIA_SMI_FULL_QUERY] + [gpu_fetcher.NVIDIA_SMI_DYNAMIC_QUERY] * 2
+
+    def test_async_reconnect_invalidates_inventory(self, transport, monkeypatch):
+        """Test that a master opened by the async manager bumps the connection generation."""
+        monkeypatch.setattr(FakeTransport, "has_connection", lambda self, hostname, ssh_user=None: False)
+        manager = get_ssh_manager()
+        asyncio.run(async_fetch_gpu_data("a"))
+        assert manager.get_connection_generation("a") == 1
+
+        manager.record_failure("a")  # Forces the next poll to reconnect
+        asyncio.run(async_fetch_gpu_data("a"))
+        assert manager.get_connection_generation("a") == 2
+        assert transport.commands == [gpu_fetcher.NVIDIA_SMI_FULL_QUERY] * 2
+
+    def test_close_connection_unregisters(self, use_transport):
+        """Test that closing a host forgets its master connection."""
+        use_transport(None)  # SSH
+        ssh = get_ssh_manager().ssh_transport
+        ssh.register_connection("node1", "alice")
+        assert ssh.get_host_string("node1", "alice") in ssh._active_connections
+        asyncio.run(async_fetcher.AsyncSSHConnectionManager().close_connection("node1", "alice"))
+        assert ssh.get_host_string("node1", "alice") not in ssh._active_connections
@@ -0,0 +1,73 @@
+"""
+Tests for bulk_parser module.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gpu_usage_menubar.bulk_parser import parse_bulk
+from gpu_usage_menubar.gpu_fetcher import NVIDIA_SMI_QUERY, parse_gpu_csv
+from gpu_usage_menubar.transport import FakeTransport
+
+
+MIXED_OUTPUT = """0, NVIDIA A100, 45, 10240, 40960, 65, 250.5
+1, NVIDIA A100, [N/A], 20480, 40960, 70, 300.0
+garbage line
+
+2, NVIDIA A100, 80, 30720, 40960, 75, 350.0, GPU-abc
+3, NVIDIA A100, 12.5, 1.5, 40960, 60, 100.0
+4, NVIDIA A100, 5, 100, 0, 30, 50.0
+"""
+
+
+class TestParseBulk:
+    """Tests for parse_bulk."""
+
+    def test_matches_per_row_parser(self):
+        """Test that bulk parsing returns exactly what parse_gpu_csv returns per host."""
+        transport = FakeTransport(gpus_per_host=8, seed=3)
+        outputs = {f"node{i}": transport.run(f"node{i}", None, NVIDIA_SMI_QUERY, 5) for i in range(5)}
+        outputs["mixed"] = MIXED_OUTPUT
+
+        table = parse_bulk(outputs)
+
+        expected = [(host, parse_gpu_csv(output)) for host, output in outputs.items()]
+        actual = [(d.hostname, d.gpus) for d in table.to_gpu_data()]
+        assert actual == expected
+
+    def test_drops_malformed_rows(self):
+        """Test that [N/A], short rows and non-integer memory are dropped."""
+        table = parse_bulk({"host": MIXED_OUTPUT})
+        assert table.gpu_id.tolist() == [0, 2, 4]
+        assert table.uuid.tolist() == ["", "GPU-abc", ""]
+        assert table.memory_percent.tolist() == [25.0, 75.0, 0.0]
+
+    @pytest.mark.parametrize("row", [
+        "45.0, NVIDIA A100, 45, 10240, 40960, 65, 250.5",
+        "0, NVIDIA A100, 45, 10240.0, 40960, 65, 250.5",
+        "0, NVIDIA A100, 45, 10240, 40960, 65.0, 250.5",
+        "0, NVIDIA A100, 45, 1e4, 40960, 65, 250.5",
+        "0, NVIDIA A100, 45, 10_240, 40960, +65, 250.5",
+        "0, NVIDIA A100, nan, 10240, 40960, 65, inf",
+    ])
+    def test_integer_rules_match_per_row_parser(self, row):
+        """Test that both parsers accept or reject the same numeric spellings."""
+        output = f"{row}\n1, NVIDIA A100, 10, 1024, 40960, 40, 60.0\n"
+        table = parse_bulk({"host": output})
+        expected = parse_gpu_csv(output)
+        assert [gpu.gpu_id for gpu in expected] == table.gpu_id.tolist()
+        if len(expected) == 2:
+            assert table.to_gpu_data()[0].gpus[0].memory_used == expected[0].memory_used
+
+    def test_host_index(self):
+        """Test that every row points back at its host."""
+        table = parse_bulk([("a", MIXED_OUTPUT), ("b", ""), ("c", "0, GPU, 1, 2, 4, 5, 6")])
+        assert table.hosts == ["a", "b", "c"]
+        assert table.host_index.tolist() == [0, 0, 0, 2]
+
+    def test_empty(self):
+        """Test that empty input gives an empty table."""
+        table = parse_bulk({"a": "", "b": "no gpus here"})
+        assert len(table) == 0
+        assert table.to_gpu_data() == []
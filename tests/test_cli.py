@@ -0,0 +1,60 @@
+"""
+Tests for cli module.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from gpu_usage_menubar.cli import main
+
+
+class TestHeadless:
+    """Tests for headless mode."""
+
+    def test_json_lines(self, use_transport, capsys):
+        """Test that every host is printed as one JSON object per line."""
+        assert main(["--headless", "--fake-gpus", "2", "--count", "1", "--host", "a", "--host", "b"]) == 0
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert sorted(r["hostname"] for r in records) == ["a", "b"]
+        assert all(len(r["gpus"]) == 2 for r in records)
+        assert set(records[0]["gpus"][0]) >= {"gpu_id", "utilization", "memory_used", "power_draw"}
+
+    def test_summary_format(self, use_transport, capsys):
+        """Test human-readable summaries."""
+        assert main(["--headless", "--fake-gpus", "1", "--count", "1", "--host", "a", "--format", "summary"]) == 0
+        out = capsys.readouterr().out
+        assert "Server: a" in out
+        assert "GPU 0:" in out
+
+    def test_json_stdout_is_only_json(self):
+        """Test that diagnostics, including the exit-time cleanup, stay off stdout."""
+        src = os.path.join(os.path.dirname(__file__), "..", "src")
+        env = dict(os.environ, PYTHONPATH=src)
+        result = subprocess.run(
+            [sys.executable, "-m", "gpu_usage_menubar.cli", "--headless", "--fake-gpus", "1",
+             "--count", "1", "--host", "a", "--host", "b"],
+            env=env, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        lines = result.stdout.splitlines()
+        assert len(lines) == 2
+        for line in lines:
+            json.loads(line)
+        assert "Cleaning up SSH connections" in result.stderr
+
+    def test_does_not_import_gui_modules(self):
+        """Test that headless mode never loads PyObjC or Pillow."""
+        code = (
+            "import sys\n"
+            "from gpu_usage_menubar.cli import main\n"
+            "main(['--headless', '--fake-gpus', '1', '--count', '1', '--host', 'a'])\n"
+            "loaded = [m for m in ('objc', 'AppKit', 'Foundation', 'PIL') if m in sys.modules]\n"
+            "assert not loaded, loaded\n"
+        )
+        src = os.path.join(os.path.dirname(__file__), "..", "src")
+        env = dict(os.environ, PYTHONPATH=src)
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
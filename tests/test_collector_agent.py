@@ -0,0 +1,228 @@
+"""
+Tests for collector agent and its binary frame reader.
+"""
+
+import base64
+import math
+import re
+import subprocess
+import sys
+
+import pytest
+from gpu_usage_menubar import collector_agent, gpu_fetcher
+from gpu_usage_menubar.collector_agent import GPUSample, StubSource, encode_inventory, encode_sample
+from gpu_usage_menubar.gpu_fetcher import CollectorDecoder, deploy_collector, read_collector_frames
+from gpu_usage_menubar.gpu_stream import CollectorStream
+from gpu_usage_menubar.transport import FakeTransport
+
+
+SAMPLES = [
+    GPUSample(0, "Tesla T4", 25.0, 4096, 16384, 50, 70.5),
+    GPUSample(1, "Tesla T4", 99.0, 16000, 16384, 81, math.nan),
+]
+
+
+class TestCollectorDecoder:
+    """Tests for CollectorDecoder."""
+
+    def test_round_trip(self):
+        """Test that encoded inventory and samples decode to GPUData."""
+        decoder = CollectorDecoder("node1")
+        snapshots = decoder.feed(encode_inventory(SAMPLES) + encode_sample(SAMPLES, 0.0))
+        assert len(snapshots) == 1
+        gpus = snapshots[0].gpus
+        assert [g.name for g in gpus] == ["Tesla T4", "Tesla T4"]
+        assert gpus[0].memory_percent == pytest.approx(25.0)
+        assert gpus[1].temperature == 81
+        assert math.isnan(gpus[1].power_draw)
+
+    def test_partial_frames(self):
+        """Test that frames split across reads are reassembled."""
+        data = encode_inventory(SAMPLES) + encode_sample(SAMPLES, 0.0) * 3
+        decoder = CollectorDecoder("node1")
+        snapshots = []
+        for i in range(0, len(data), 7):
+            snapshots.extend(decoder.feed(data[i:i + 7]))
+        assert len(snapshots) == 3
+
+    def test_skips_unknown_records(self):
+        """Test that unknown record types are ignored."""
+        decoder = CollectorDecoder("node1")
+        data = collector_agent.encode_frame(99, b"future") + encode_sample(SAMPLES, 0.0)
+        assert len(decoder.feed(data)) == 1
+
+
+class TestCollectorAgent:
+    """Tests for running the agent with a stub source."""
+
+    def test_stub_agent_output(self):
+        """Test that the agent process emits decodable frames."""
+        proc = subprocess.Popen(
+            [sys.executable, collector_agent.__file__, "--stub", "4", "--interval-ms", "1", "--count", "3"],
+            stdout=subprocess.PIPE
+        )
+        snapshots = list(read_collector_frames(proc.stdout, "node1"))
+        proc.wait()
+        assert len(snapshots) == 3
+        assert all(len(s.gpus) == 4 for s in snapshots)
+        assert all(s.gpus[0].memory_total == 16384 for s in snapshots)
+
+    def test_inventory_resent_on_change(self):
+        """Test that a new inventory frame follows a GPU count change."""
+        class Growing(StubSource):
+            def sample(self):
+                self.gpu_count += 1
+                return super().sample()
+
+        class Sink:
+            def __init__(self):
+                self.data = b""
+
+            def write(self, data):
+                self.data += data
+
+            def flush(self):
+                pass
+
+        sink = Sink()
+        collector_agent.run(Growing(1), sink, 0, count=2)
+        snapshots = CollectorDecoder("node1").feed(sink.data)
+        assert [len(s.gpus) for s in snapshots] == [2, 3]
+        assert all(g.name == "Stub GPU" for g in snapshots[1].gpus)
+
+
+class LocalCollectorStream(CollectorStream):
+    """CollectorStream that runs the agent locally instead of over ssh."""
+
+    def _build_command(self):
+        return [sys.executable, collector_agent.__file__, "--stub", "2", "--interval-ms", "10", "--count", "2"]
+
+
+def test_collector_stream():
+    """Test that CollectorStream yields snapshots from the agent."""
+    stream = LocalCollectorStream("local", restart_delay=0.01)
+    snapshots = []
+    for gpu_data in stream:
+        snapshots.append(gpu_data)
+        if len(snapshots) == 3:
+            stream.stop()
+    assert all(len(s.gpus) == 2 for s in snapshots)
+
+
+def test_deploy_collector(use_transport):
+    """Test that deployment sends the agent source through the transport."""
+    transport = FakeTransport()
+    use_transport(transport)
+    assert deploy_collector("node1")
+
+    encoded = re.search(r"echo (\S+) \| base64 -d", transport.commands[-1]).group(1)
+    with open(collector_agent.__file__, "rb") as f:
+        assert base64.b64decode(encoded) == f.read()
+
+
+class TestDeltaProtocol:
+    """Tests for keyframe/delta encoding and reconstruction."""
+
+    def _stream(self, samples_list, keyframe_interval):
+        encoder = collector_agent.SnapshotEncoder(keyframe_interval)
+        return [encoder.encode(samples, float(i)) for i, samples in enumerate(samples_list)]
+
+    def test_unchanged_snapshot_is_tiny(self):
+        """Test that a delta with no changes carries no per-GPU data."""
+        frames = self._stream([SAMPLES, SAMPLES], keyframe_interval=30)
+        assert len(frames[1]) == collector_agent.FRAME_HEADER.size + collector_agent.DELTA_HEADER.size
+
+    def test_delta_reconstructs_full_snapshot(self):
+        """Test that deltas rebuild the same snapshots as keyframes would."""
+        changed = [SAMPLES[0]._replace(utilization=75.0, memory_used=8192), SAMPLES[1]]
+        changed_again = [changed[0], SAMPLES[1]._replace(temperature=60, power_draw=120.0)]
+        samples_list = [SAMPLES, changed, changed_again]
+
+        with_deltas = CollectorDecoder("node1")
+        keyframes_only = CollectorDecoder("node1")
+        delta_snapshots = [s for f in self._stream(samples_list, 30) for s in with_deltas.feed(f)]
+        full_snapshots = [s for f in self._stream(samples_list, 1) for s in keyframes_only.feed(f)]
+
+        for a, b in zip(delta_snapshots, full_snapshots):
+            for ga, gb in zip(a.gpus, b.gpus):
+                assert ga.utilization == gb.utilization
+                assert ga.memory_used == gb.memory_used
+                assert ga.memory_percent == pytest.approx(gb.memory_percent)
+                assert ga.temperature == gb.temperature
+                assert ga.power_draw == pytest.approx(gb.power_draw, nan_ok=True)
+        assert delta_snapshots[2].gpus[0] is delta_snapshots[1].gpus[0]
+
+    def test_periodic_keyframes(self):
+        """Test that a keyframe is sent every keyframe_interval records."""
+        frames = self._stream([SAMPLES] * 5, keyframe_interval=2)
+        assert collector_agent.FRAME_HEADER.unpack_from(frames[0])[1] == collector_agent.RECORD_INVENTORY
+        record_types = []
+        for frame in frames:
+            offset = 0
+            while offset < len(frame):
+                length, record_type = collector_agent.FRAME_HEADER.unpack_from(frame, offset)
+                offset += collector_agent.FRAME_HEADER.size + length
+            record_types.append(record_type)
+        assert record_types == [2, 3, 2, 3, 2]
+
+    def test_keyframe_with_new_gpu_order(self):
+        """Test that deltas after a same-size keyframe with other GPU indices hit the right GPU."""
+        decoder = CollectorDecoder("node1")
+        decoder.feed(encode_inventory(SAMPLES) + encode_sample(SAMPLES, 0.0))
+
+        swapped = [SAMPLES[1]._replace(index=3), SAMPLES[0]._replace(index=2)]
+        changed = [swapped[0], swapped[1]._replace(utilization=5.0)]
+        decoder.feed(encode_inventory(swapped) + encode_sample(swapped, 1.0))
+        (snapshot,) = decoder.feed(collector_agent.encode_delta(swapped, changed, 2.0))
+        assert [(g.gpu_id, g.utilization) for g in snapshot.gpus] == [(3, 99.0), (2, 5.0)]
+
+        reordered = [SAMPLES[1], SAMPLES[0]]
+        changed = [reordered[0], reordered[1]._replace(utilization=7.0)]
+        decoder.feed(encode_inventory(reordered) + encode_sample(reordered, 3.0))
+        (snapshot,) = decoder.feed(collector_agent.encode_delta(reordered, changed, 4.0))
+        assert [(g.gpu_id, g.utilization) for g in snapshot.gpus] == [(1, 99.0), (0, 7.0)]
+
+    def test_delta_before_keyframe_is_ignored(self):
+        """Test that a decoder joining mid-stream waits for a keyframe."""
+        frames = self._stream([SAMPLES, SAMPLES, SAMPLES], keyframe_interval=30)
+        decoder = CollectorDecoder("node1")
+        assert decoder.feed(frames[1]) == []
+
+
+class TestSummaryMode:
+    """Tests for remote sub-interval sampling summaries."""
+
+    def test_summarize_values(self):
+        """Test min/mean/max/p95 with NaN readings ignored."""
+        values = [float(v) for v in range(1, 101)] + [math.nan]
+        assert collector_agent.summarize_values(values) == (1.0, 50.5, 100.0, 95.0)
+        assert all(math.isnan(v) for v in collector_agent.summarize_values([math.nan]))
+
+    def test_summary_round_trip(self):
+        """Test that agent summary CSV parses into GPUInfo stats."""
+        summary = collector_agent.collect_summary(StubSource(2), duration=0.05, interval=0.005)
+        gpus = gpu_fetcher.parse_summary_csv(collector_agent.format_summary_csv(summary))
+        assert [g.gpu_id for g in gpus] == [0, 1]
+        util = gpus[0].stats["utilization"]
+        assert util.samples >= 5
+        assert util.min <= util.mean <= util.max
+        assert util.p95 <= util.max
+        assert gpus[0].utilization == util.mean
+        assert gpus[0].memory_total == 16384
+
+    def test_fetch_gpu_summary(self, use_transport):
+        """Test fetching a summary through the transport."""
+        summary = collector_agent.collect_summary(StubSource(1), duration=0.01, interval=0.005)
+        transport = FakeTransport(outputs={"node1": collector_agent.format_summary_csv(summary)})
+        use_transport(transport)
+        data = gpu_fetcher.fetch_gpu_summary("node1", duration=60, sample_ms=100)
+        assert "--summary 60 --interval-ms 100" in transport.commands[-1]
+        assert data.gpus[0].stats["power_draw"].max >= data.gpus[0].stats["power_draw"].min
+
+    def test_agent_cli_summary(self):
+        """Test the agent's --summary command line mode."""
+        output = subprocess.run(
+            [sys.executable, collector_agent.__file__, "--stub", "3", "--summary", "0.05", "--interval-ms", "10"],
+            capture_output=True, text=True, check=True
+        ).stdout
+        assert len(gpu_fetcher.parse_summary_csv(output)) == 3
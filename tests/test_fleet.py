@@ -0,0 +1,95 @@
+"""
+Tests for fleet module.
+"""
+
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gpu_usage_menubar.bulk_parser import parse_bulk
+from gpu_usage_menubar.fleet import FleetSnapshot
+from gpu_usage_menubar.gpu_fetcher import GPUData, NVIDIA_SMI_QUERY, parse_gpu_csv
+from gpu_usage_menubar.transport import FakeTransport
+
+
+OUTPUTS = {
+    "node1": "0, NVIDIA A100, 0, 100, 40960, 35, 50.0\n1, NVIDIA A100, 90, 30000, 40960, 70, 300.0",
+    "empty": "",
+    "node2": "0, NVIDIA H100, 50, 8192, 81920, 60, 400.0, GPU-xyz",
+}
+
+
+@pytest.fixture
+def snapshot():
+    return FleetSnapshot.from_table(parse_bulk(OUTPUTS), timestamp=0.0)
+
+
+class TestFleetSnapshot:
+    """Tests for FleetSnapshot."""
+
+    def test_layout(self, snapshot):
+        """Test that rows are grouped by host via offsets."""
+        assert len(snapshot) == 3
+        assert snapshot.hosts == ["node1", "empty", "node2"]
+        assert snapshot.offsets.tolist() == [0, 2, 2, 3]
+        assert snapshot.host_rows("node2") == slice(2, 3)
+        assert snapshot.host_index.tolist() == [0, 0, 2]
+
+    def test_aggregates(self, snapshot):
+        """Test fleet-wide vectorized aggregates."""
+        assert snapshot.total_power() == pytest.approx(750.0)
+        assert snapshot.mean_utilization() == pytest.approx(140 / 3)
+        assert snapshot.free_gpu_count() == 1
+        assert snapshot.free_gpu_count(max_utilization=50) == 2
+        assert snapshot.host_mean_utilization().tolist() == [45.0, 0.0, 50.0]
+
+    def test_utilization_grid(self, snapshot):
+        """Test the hosts x GPUs grid used by the heatmap."""
+        grid = snapshot.utilization_grid()
+        assert grid.shape == (3, 2)
+        assert grid[0].tolist() == [0.0, 90.0]
+        assert np.isnan(grid[1]).all()
+        assert grid[2, 0] == 50.0 and np.isnan(grid[2, 1])
+
+    def test_row_view(self, snapshot):
+        """Test GPUInfo-style access through row views."""
+        row = snapshot.row("node2", 0)
+        assert row.hostname == "node2"
+        assert row.name == "NVIDIA H100"
+        assert row.uuid == "GPU-xyz"
+        assert row.memory_percent == 10.0
+        assert snapshot[0].uuid is None
+        assert [r.gpu_id for r in snapshot] == [0, 1, 0]
+        with pytest.raises(KeyError):
+            snapshot.row("node2", 5)
+        with pytest.raises(AttributeError):
+            row.extra = 1
+
+    def test_round_trip(self):
+        """Test that GPUData converts to a snapshot and back."""
+        transport = FakeTransport(gpus_per_host=4, seed=2)
+        data = [
+            GPUData(gpus=parse_gpu_csv(transport.run(h, None, NVIDIA_SMI_QUERY, 5)), hostname=h, timestamp="")
+            for h in ("a", "b")
+        ]
+        snapshot = FleetSnapshot.from_gpu_data(data)
+        restored = snapshot.to_gpu_data()
+
+        assert [d.hostname for d in restored] == ["a", "b"]
+        for before, after in zip(data, restored):
+            for expected, actual in zip(before.gpus, after.gpus):
+                assert actual.gpu_id == expected.gpu_id
+                assert actual.memory_used == expected.memory_used
+                assert actual.power_draw == pytest.approx(expected.power_draw, abs=0.01)
+
+    def test_smaller_than_dataclasses(self):
+        """Test that a snapshot is several times smaller than GPUInfo objects."""
+        transport = FakeTransport(gpus_per_host=8, seed=0)
+        outputs = {f"n{i}": transport.run(f"n{i}", None, NVIDIA_SMI_QUERY, 5) for i in range(50)}
+        gpus = [gpu for output in outputs.values() for gpu in parse_gpu_csv(output)]
+        dataclass_bytes = sum(sys.getsizeof(gpu) + sys.getsizeof(gpu.__dict__) for gpu in gpus)
+
+        snapshot = FleetSnapshot.from_table(parse_bulk(outputs))
+        assert snapshot.nbytes * 4 < dataclass_bytes
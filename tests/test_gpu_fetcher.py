@@ -0,0 +1,275 @@
+"""
+Tests for GPU fetcher module.
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+from gpu_usage_menubar import gpu_fetcher
+from gpu_usage_menubar.gpu_fetcher import (
+    COMPOSITE_SECTION_MARKER,
+    GPUData,
+    fetch_gpu_data,
+    fetch_many,
+    format_gpu_summary,
+    get_ssh_manager,
+    gpu_data_from_dict,
+    gpu_data_to_dict,
+    parse_composite_output,
+    parse_gpu_csv,
+)
+from gpu_usage_menubar.transport import FakeTransport
+
+
+SAMPLE_OUTPUT = (
+    "0, NVIDIA A100-SXM4-40GB, 45, 10240, 40960, 55, 210.50\n"
+    "1, NVIDIA A100-SXM4-40GB, 90, 38000, 40960, 71, 380.25\n"
+)
+
+
+class TestParseGpuCsv:
+    """Tests for parse_gpu_csv function."""
+
+    def test_parses_rows(self):
+        """Test that each CSV row becomes a GPUInfo."""
+        gpus = parse_gpu_csv(SAMPLE_OUTPUT)
+        assert [g.gpu_id for g in gpus] == [0, 1]
+        assert gpus[0].name == "NVIDIA A100-SXM4-40GB"
+        assert gpus[1].utilization == 90.0
+        assert gpus[0].memory_percent == pytest.approx(25.0)
+        assert gpus[1].power_draw == pytest.approx(380.25)
+
+    def test_skips_malformed_rows(self):
+        """Test that short rows and [N/A] values are skipped."""
+        output = SAMPLE_OUTPUT + "2, Tesla, 10\n3, Tesla T4, 5, 100, 15360, 40, [N/A]\n"
+        gpus = parse_gpu_csv(output)
+        assert [g.gpu_id for g in gpus] == [0, 1]
+
+    def test_empty_output(self):
+        """Test that empty output yields no GPUs."""
+        assert parse_gpu_csv("") == []
+
+
+COMPOSITE_OUTPUT = f"""{COMPOSITE_SECTION_MARKER}gpu
+0, NVIDIA A100-SXM4-40GB, 45, 10240, 40960, 55, 210.50, GPU-aaaa
+1, NVIDIA A100-SXM4-40GB, 90, 38000, 40960, 71, 380.25, GPU-bbbb
+{COMPOSITE_SECTION_MARKER}apps
+GPU-bbbb, 4242, python, 37000
+GPU-aaaa, 777, /usr/bin/trainer, 9000
+{COMPOSITE_SECTION_MARKER}loadavg
+3.50 2.25 1.00 4/512 12345
+{COMPOSITE_SECTION_MARKER}meminfo
+MemTotal:       65536000 kB
+MemFree:         1024000 kB
+MemAvailable:   16384000 kB
+{COMPOSITE_SECTION_MARKER}end
+"""
+
+
+class TestCompositeOutput:
+    """Tests for parse_composite_output function."""
+
+    def test_parses_all_sections(self):
+        """Test that GPU, process and host sections are all parsed."""
+        data = parse_composite_output(COMPOSITE_OUTPUT, "node1", "12:00:00")
+        assert [g.uuid for g in data.gpus] == ["GPU-aaaa", "GPU-bbbb"]
+        assert [(p.pid, p.gpu_id, p.used_memory) for p in data.processes] == [(4242, 1, 37000), (777, 0, 9000)]
+        assert data.host_stats.load_1m == pytest.approx(3.5)
+        assert data.host_stats.mem_total == 64000
+        assert data.host_stats.mem_percent == pytest.approx(75.0)
+
+    def test_missing_sections(self):
+        """Test that missing process and host sections are tolerated."""
+        output = COMPOSITE_OUTPUT.split(f"{COMPOSITE_SECTION_MARKER}apps")[0]
+        data = parse_composite_output(output, "node1", "12:00:00")
+        assert len(data.gpus) == 2
+        assert data.processes == []
+        assert data.host_stats is None
+
+    def test_no_gpus_returns_none(self):
+        """Test that output without GPU rows yields None."""
+        assert parse_composite_output(f"{COMPOSITE_SECTION_MARKER}gpu\n", "node1", "12:00:00") is None
+
+    def test_summary_includes_host_stats(self):
+        """Test that the summary shows processes and host load."""
+        summary = format_gpu_summary(parse_composite_output(COMPOSITE_OUTPUT, "node1", "12:00:00"))
+        assert "4242 python" in summary
+        assert "Host load: 3.50" in summary
+
+    def test_dict_round_trip(self):
+        """Test that gpu_data_from_dict restores gpu_data_to_dict output."""
+        data = parse_composite_output(COMPOSITE_OUTPUT, "node1", "12:00:00")
+        assert gpu_data_from_dict(json.loads(json.dumps(gpu_data_to_dict(data)))) == data
+
+
+def _fake_fetch(delays, failures=()):
+    """Build a _fetch_gpu_data replacement with per-host delays."""
+    def fetch(hostname, ssh_user=None, timeout=10, composite=False):
+        time.sleep(delays.get(hostname, 0))
+        if hostname in failures:
+            raise subprocess.CalledProcessError(255, ["ssh"], stderr="Connection refused")
+        return GPUData(gpus=parse_gpu_csv(SAMPLE_OUTPUT), hostname=hostname, timestamp="00:00:00")
+    return fetch
+
+
+class TestFetchMany:
+    """Tests for fetch_many function."""
+
+    def test_yields_every_host(self, monkeypatch):
+        """Test that all hosts are reported with their data."""
+        monkeypatch.setattr(gpu_fetcher, "_fetch_gpu_data", _fake_fetch({}))
+        results = list(fetch_many(["a", "b", "c"]))
+        assert sorted(r.hostname for r in results) == ["a", "b", "c"]
+        assert all(r.error is None and len(r.data.gpus) == 2 for r in results)
+
+    def test_completion_order(self, monkeypatch):
+        """Test that fast hosts are yielded before slow ones."""
+        monkeypatch.setattr(gpu_fetcher, "_fetch_gpu_data", _fake_fetch({"slow": 0.3}))
+        results = list(fetch_many(["slow", "fast"]))
+        assert [r.hostname for r in results] == ["fast", "slow"]
+
+    def test_per_host_errors(self, monkeypatch):
+        """Test that a failing host is reported without affecting others."""
+        monkeypatch.setattr(gpu_fetcher, "_fetch_gpu_data", _fake_fetch({}, failures={"bad"}))
+        results = {r.hostname: r for r in fetch_many(["good", "bad"])}
+        assert results["good"].data is not None
+        assert results["bad"].data is None
+        assert "Connection refused" in results["bad"].error
+
+    def test_deadline_does_not_wait_for_hung_host(self, monkeypatch):
+        """Test that a hung host is reported at the deadline."""
+        monkeypatch.setattr(gpu_fetcher, "_fetch_gpu_data", _fake_fetch({"hung": 2.0}))
+        start = time.monotonic()
+        results = {r.hostname: r for r in fetch_many(["hung", "ok"], deadline=0.2)}
+        assert time.monotonic() - start < 1.0
+        assert results["ok"].data is not None
+        assert "Deadline" in results["hung"].error
+
+    def test_deduplicates_hosts(self, monkeypatch):
+        """Test that repeated hosts are fetched once."""
+        monkeypatch.setattr(gpu_fetcher, "_fetch_gpu_data", _fake_fetch({}))
+        results = list(fetch_many(["a", "a", ("a", None)]))
+        assert len(results) == 1
+
+
+class TestConnectionState:
+    """Tests for SSHConnectionManager state tracking and circuit breaker."""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        """SSH manager with fresh host states and a fake subprocess.run."""
+        manager = gpu_fetcher.get_ssh_manager()
+        monkeypatch.setattr(gpu_fetcher.SSHConnectionManager, "_host_states", {})
+        manager.calls = []
+        manager.returncode = 255
+
+        def fake_run(cmd, **kwargs):
+            manager.calls.append(cmd)
+            if "-N" in cmd and manager.returncode == 0:
+                open(manager.ssh_transport.get_control_path("node1"), "w").close()
+            return subprocess.CompletedProcess(cmd, manager.returncode, "", "refused")
+
+        monkeypatch.setattr(gpu_fetcher.subprocess, "run", fake_run)
+        yield manager
+        try:
+            import os
+            os.remove(manager.ssh_transport.get_control_path("node1"))
+        except OSError:
+            pass
+
+    def test_skips_check_when_recently_verified(self, manager):
+        """Test that a verified master is trusted without ssh -O check."""
+        manager.returncode = 0
+        assert manager.ensure_connection("node1")
+        assert manager.get_connection_state("node1") == gpu_fetcher.STATE_CONNECTED
+        manager.calls.clear()
+        assert manager.ensure_connection("node1")
+        assert manager.calls == []
+
+    def test_failed_check_is_not_treated_as_alive(self, manager):
+        """Test that a non-zero ssh -O check triggers a reconnect."""
+        manager.returncode = 0
+        manager.ensure_connection("node1")
+        manager._get_host_state("node1").last_verified = 0.0
+        manager.returncode = 255
+        assert not manager.ensure_connection("node1")
+        assert [c[1] for c in manager.calls[-2:]] == ["-O", "-o"]
+
+    def test_circuit_opens_after_repeated_failures(self, manager):
+        """Test that a down host is skipped without spawning ssh."""
+        for _ in range(manager.FAILURE_THRESHOLD - 1):
+            assert not manager.ensure_connection("node1")
+            assert manager.get_connection_state("node1") == gpu_fetcher.STATE_DEGRADED
+        assert not manager.ensure_connection("node1")
+        assert manager.get_connection_state("node1") == gpu_fetcher.STATE_DOWN
+
+        manager.calls.clear()
+        assert not manager.ensure_connection("node1")
+        assert manager.calls == []
+
+    def test_backoff_grows_and_retries_after_delay(self, manager):
+        """Test that the retry delay grows and a recovered host reconnects."""
+        for _ in range(manager.FAILURE_THRESHOLD):
+            manager.ensure_connection("node1")
+        state = manager._get_host_state("node1")
+        first_delay = state.next_attempt_at - time.monotonic()
+        assert manager.BACKOFF_BASE / 2 <= first_delay + 0.1 <= manager.BACKOFF_BASE + 0.1
+
+        state.next_attempt_at = 0.0
+        manager.ensure_connection("node1")
+        assert state.next_attempt_at - time.monotonic() > first_delay
+
+        state.next_attempt_at = 0.0
+        manager.returncode = 0
+        assert manager.ensure_connection("node1")
+        assert state.consecutive_failures == 0
+
+
+class TestInventoryCache:
+    """Tests for the static/dynamic query split."""
+
+    def test_steady_state_uses_dynamic_query(self, use_transport):
+        """Test that only the first poll fetches static fields."""
+        transport = FakeTransport(gpus_per_host=4, seed=1)
+        use_transport(transport)
+        first = fetch_gpu_data("node1")
+        second = fetch_gpu_data("node1")
+        assert transport.commands == [gpu_fetcher.NVIDIA_SMI_FULL_QUERY, gpu_fetcher.NVIDIA_SMI_DYNAMIC_QUERY]
+        assert [g.uuid for g in second.gpus] == [g.uuid for g in first.gpus]
+        assert [g.name for g in second.gpus] == [g.name for g in first.gpus]
+        assert second.gpus[0].memory_total == 81920
+
+    def test_gpu_count_change_triggers_full_query(self, use_transport):
+        """Test that a changed GPU count refreshes the inventory."""
+        transport = FakeTransport(gpus_per_host=2, seed=1)
+        use_transport(transport)
+        fetch_gpu_data("node1")
+        transport.gpus_per_host = 3
+        data = fetch_gpu_data("node1")
+        assert len(data.gpus) == 3
+        assert transport.commands[-1] == gpu_fetcher.NVIDIA_SMI_FULL_QUERY
+
+    def test_reconnect_invalidates_inventory(self, use_transport):
+        """Test that a new master connection forces a full query."""
+        transport = FakeTransport(seed=1)
+        use_transport(transport)
+        fetch_gpu_data("node1")
+        get_ssh_manager()._get_host_state("node1").generation += 1
+        fetch_gpu_data("node1")
+        assert transport.commands[-1] == gpu_fetcher.NVIDIA_SMI_FULL_QUERY
+
+
+class TestImportCost:
+    """Tests that importing the fetcher stays cheap."""
+
+    def test_import_does_not_load_heavy_modules(self):
+        """Test that ctypes, PIL and the thread pool are only loaded on use."""
+        code = (
+            "import sys, gpu_usage_menubar.gpu_fetcher\n"
+            "print(' '.join(m for m in ('ctypes', 'PIL', 'numpy', 'concurrent.futures') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.splitlines()[0].strip() == ""
@@ -0,0 +1,96 @@
+"""
+Tests for streaming GPU collector module.
+"""
+
+import sys
+import time
+
+import pytest
+from gpu_usage_menubar.gpu_fetcher import NVIDIA_SMI_QUERY
+from gpu_usage_menubar.gpu_stream import CollectorStream, GPUStream, _SnapshotAssembler
+from gpu_usage_menubar.transport import FakeTransport, LocalTransport
+
+
+ROW0 = "0, Tesla T4, 10, 1024, 15360, 40, 30.00"
+ROW1 = "1, Tesla T4, 80, 8192, 15360, 65, 60.00"
+
+# Prints two polls for two GPUs, then exits to simulate a dropped stream
+SCRIPT = (
+    "import sys, time\n"
+    "for util in (10, 20):\n"
+    "    print('0, Tesla T4, %d, 1024, 15360, 40, 30.00' % util)\n"
+    "    print('1, Tesla T4, 80, 8192, 15360, 65, 60.00')\n"
+    "    sys.stdout.flush()\n"
+    "    time.sleep(0.05)\n"
+)
+
+
+class LocalStream(GPUStream):
+    """GPUStream that runs a local script instead of ssh."""
+
+    def _build_command(self):
+        return [sys.executable, "-c", SCRIPT]
+
+
+class TestSnapshotAssembler:
+    """Tests for grouping streamed rows into snapshots."""
+
+    def test_groups_on_repeated_index(self):
+        """Test that a repeated GPU index closes the snapshot."""
+        assembler = _SnapshotAssembler()
+        assert assembler.feed(ROW0) is None
+        assert assembler.feed(ROW1) is None
+        snapshot = assembler.feed(ROW0)
+        assert [g.gpu_id for g in snapshot] == [0, 1]
+
+    def test_emits_immediately_once_count_known(self):
+        """Test that later snapshots are emitted without waiting for the next row."""
+        assembler = _SnapshotAssembler()
+        for row in (ROW0, ROW1, ROW0):
+            assembler.feed(row)
+        snapshot = assembler.feed(ROW1)
+        assert [g.gpu_id for g in snapshot] == [0, 1]
+
+    def test_blank_line_flushes(self):
+        """Test that a blank line ends the snapshot."""
+        assembler = _SnapshotAssembler()
+        assembler.feed(ROW0)
+        assert len(assembler.feed("")) == 1
+
+
+class TestGPUStream:
+    """Tests for GPUStream."""
+
+    def test_iterates_snapshots_and_restarts(self):
+        """Test that snapshots are yielded and the stream restarts after exit."""
+        stream = LocalStream("local", restart_delay=0.01)
+        snapshots = []
+        for gpu_data in stream:
+            snapshots.append(gpu_data)
+            if len(snapshots) == 4:
+                stream.stop()
+        assert [s.gpus[0].utilization for s in snapshots] == [10, 20, 10, 20]
+        assert all(s.hostname == "local" for s in snapshots)
+        assert stream.restarts >= 1
+
+    def test_callback_mode(self):
+        """Test that start() delivers snapshots to a callback."""
+        received = []
+        stream = LocalStream("local", restart_delay=0.01).start(received.append)
+        deadline = time.monotonic() + 5
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stream.stop()
+        assert len(received) >= 2
+
+    def test_command_follows_active_transport(self, use_transport):
+        """Test that the streamed command is spawned through the active transport."""
+        use_transport(LocalTransport())
+        assert GPUStream("node1", interval_ms=500)._build_command() == [
+            "/bin/sh", "-c", f"{NVIDIA_SMI_QUERY} --loop-ms=500"
+        ]
+
+        use_transport(FakeTransport())
+        for stream in (GPUStream("node1"), CollectorStream("node1")):
+            with pytest.raises(NotImplementedError, match="FakeTransport"):
+                next(iter(stream))
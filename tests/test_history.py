@@ -0,0 +1,77 @@
+"""
+Tests for history module.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gpu_usage_menubar.history import HistoryStore, RingBuffer
+
+
+class TestRingBuffer:
+    """Tests for RingBuffer."""
+
+    def test_wraps_at_capacity(self):
+        """Test that the oldest samples are overwritten."""
+        buffer = RingBuffer(4)
+        for i in range(10):
+            buffer.append(float(i), i * 10)
+        times, values = buffer.last()
+        assert len(buffer) == 4
+        assert times.tolist() == [6.0, 7.0, 8.0, 9.0]
+        assert values.tolist() == [60, 70, 80, 90]
+        assert buffer.latest() == (9.0, 90.0)
+
+    def test_windows_are_views(self):
+        """Test that windows share memory with the buffer."""
+        buffer = RingBuffer(8)
+        for i in range(11):
+            buffer.append(float(i), i)
+        times, values = buffer.last(3)
+        assert values.tolist() == [8, 9, 10]
+        assert np.shares_memory(values, buffer._values)
+        assert times.flags["C_CONTIGUOUS"]
+
+    def test_since(self):
+        """Test time-based windows."""
+        buffer = RingBuffer(16)
+        for i in range(10):
+            buffer.append(float(i), i)
+        assert buffer.since(7.0)[1].tolist() == [7, 8, 9]
+        assert buffer.since(100.0)[1].tolist() == []
+
+    def test_rejects_non_monotonic(self):
+        """Test that timestamps may not go backwards."""
+        buffer = RingBuffer(4)
+        buffer.append(5.0, 1)
+        with pytest.raises(ValueError):
+            buffer.append(4.0, 1)
+
+
+class TestHistoryStore:
+    """Tests for HistoryStore."""
+
+    def test_record_and_window(self, make_gpu_data):
+        """Test recording snapshots and reading one metric back."""
+        store = HistoryStore(capacity=3)
+        for t, utilization in enumerate([10, 20, 30, 40]):
+            store.record(make_gpu_data(utilization), timestamp=float(t))
+
+        times, values = store.window("node1", 0, "utilization")
+        assert values.tolist() == [20, 30, 40]
+        assert store.window("node1", 0, "utilization", seconds=1.5, now=3.0)[1].tolist() == [30, 40]
+        assert store.latest("node1", 0, "power_draw") == (3.0, 200.0)
+        assert len(store.window("other", 0, "utilization")[0]) == 0
+
+    def test_memory_is_bounded(self, make_gpu_data):
+        """Test that memory does not grow with the number of samples."""
+        store = HistoryStore(capacity=10)
+        store.record(make_gpu_data(0), timestamp=0.0)
+        size = store.nbytes
+        for t in range(1, 1000):
+            store.record(make_gpu_data(t % 100), timestamp=float(t))
+        assert store.nbytes == size
+
+        store.forget("node1")
+        assert store.keys() == []
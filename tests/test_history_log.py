@@ -0,0 +1,135 @@
+"""
+Tests for history_log module.
+"""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gpu_usage_menubar.history_log import HEADER_SIZE, RECORD_DTYPE, HistoryLog
+
+
+@pytest.fixture
+def history(tmp_path):
+    log = HistoryLog(str(tmp_path), fsync_interval=0.05, index_stride=4)
+    yield log
+    log.close()
+
+
+class TestHistoryLog:
+    """Tests for HistoryLog."""
+
+    def test_append_and_query(self, make_gpu_data, history):
+        """Test that records are written and read back by time range."""
+        for t in range(100):
+            history.append(make_gpu_data(t, "node/1", gpus=2), timestamp=1000.0 + t)
+        history.flush()
+
+        parts = list(history.query("node/1", 1010.0, 1019.0))
+        records = np.concatenate(parts)
+        assert len(records) == 20
+        assert records["timestamp"].min() == 1010.0
+        assert records["timestamp"].max() == 1019.0
+
+        gpu1 = history.query_gpu("node/1", 1, 1090.0)
+        assert gpu1["utilization"].tolist() == [float(t + 1) for t in range(90, 100)]
+        assert gpu1["temperature"].tolist() == [41] * 10
+        assert history.hosts() == ["node/1"]
+
+    def test_reads_are_mapped_views(self, make_gpu_data, history):
+        """Test that query results view the mapped segment without copying."""
+        for t in range(10):
+            history.append(make_gpu_data(t, "node1", gpus=2), timestamp=float(t + 1))
+        history.flush()
+        records = next(history.query("node1", 0.0))
+        assert records.base is not None
+        assert not records.flags["OWNDATA"]
+
+    def test_rotation_and_retention(self, make_gpu_data, tmp_path):
+        """Test that segments rotate by size and age and expire."""
+        log = HistoryLog(str(tmp_path), max_segment_bytes=HEADER_SIZE + 4 * RECORD_DTYPE.itemsize,
+                         max_segment_age=50.0, retention=100.0)
+        try:
+            for t in range(0, 300, 10):
+                log.append(make_gpu_data(0, "node1", gpus=2), timestamp=float(t))
+            log.flush()
+        finally:
+            log.close()
+
+        segments = sorted(os.listdir(tmp_path / "node1"))
+        assert 1 < len(segments) < 15
+        # Everything older than 100s before the newest segment is gone
+        reopened = HistoryLog(str(tmp_path))
+        try:
+            records = reopened.query_gpu("node1", 0, 0.0)
+            assert records["timestamp"].min() >= 150.0
+            assert records["timestamp"].max() == 290.0
+        finally:
+            reopened.close()
+
+    def test_append_never_blocks(self, make_gpu_data, tmp_path):
+        """Test that a full queue drops snapshots instead of blocking."""
+        log = HistoryLog(str(tmp_path), max_pending=1)
+        try:
+            results = [log.append(make_gpu_data(t, "node1", gpus=2), timestamp=float(t)) for t in range(1000)]
+            log.flush()
+            assert results[0]
+            assert log.dropped == results.count(False)
+        finally:
+            log.close()
+
+    def test_open_files_are_capped(self, make_gpu_data, tmp_path):
+        """Test that more hosts than max_open_files share a bounded set of descriptors."""
+        log = HistoryLog(str(tmp_path), max_open_files=4)
+        try:
+            hosts = [f"node{i}" for i in range(20)]
+            for t in range(5):
+                for host in hosts:
+                    log.append(make_gpu_data(t, host, gpus=2), timestamp=1000.0 + t)
+            log.flush()
+            assert len(log._open) == 4
+            assert sum(writer.file is not None for writer in log._writers.values()) == 4
+
+            for host in hosts:
+                # Reopened in append mode, not rotated into a new segment
+                assert len(os.listdir(tmp_path / host)) == 1
+                assert log.query_gpu(host, 0, 0.0)["utilization"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+        finally:
+            log.close()
+
+    def test_evictions_do_not_fsync(self, make_gpu_data, tmp_path, monkeypatch):
+        """Test that closing an evicted segment leaves fsync to the periodic sync."""
+        synced = []
+        monkeypatch.setattr(os, "fsync", synced.append)
+        log = HistoryLog(str(tmp_path), max_open_files=2, fsync_interval=3600.0)
+        try:
+            for t in range(5):
+                for host in ("node1", "node2", "node3"):
+                    log.append(make_gpu_data(t, host), timestamp=1000.0 + t)
+            log.flush()
+            assert synced == []
+        finally:
+            log.close()
+        assert len(synced) == 2  # The segments still open at close
+
+    def test_query_skips_removed_segments(self, make_gpu_data, tmp_path):
+        """Test that a segment deleted after the host was scanned is skipped."""
+        log = HistoryLog(str(tmp_path), max_segment_age=10.0, retention=None)
+        try:
+            for t in range(0, 30, 5):
+                log.append(make_gpu_data(t, "node1"), timestamp=float(t))
+            log.flush()
+            assert len(log.query_gpu("node1", 0, 0.0)) == 6
+
+            first = sorted(os.listdir(tmp_path / "node1"))[0]
+            os.remove(tmp_path / "node1" / first)
+            assert log.query_gpu("node1", 0, 0.0)["timestamp"].tolist() == [10.0, 15.0, 20.0, 25.0]
+        finally:
+            log.close()
+
+    def test_rejects_zero_open_files(self, tmp_path):
+        """Test that at least one segment must be allowed open."""
+        with pytest.raises(ValueError):
+            HistoryLog(str(tmp_path), max_open_files=0)
@@ -2,12 +2,23 @@
 Tests for icon generator module.
 """
 
+import subprocess
+import sys
+
 import pytest
 from gpu_usage_menubar.icon_generator import (
     create_dual_gpu_icon,
     create_single_gpu_icon,
     create_error_icon,
+    create_multi_gpu_icon,
+    create_fleet_heatmap,
+    SparklineIcon,
+    IconBuffer,
+    set_png_compress_level,
+    render_fleet_heatmap,
     get_utilization_color,
+    get_icon_cache,
+    IconCache,
     COLORS
 )
 
@@ -111,3 +122,220 @@ class TestErrorIcon:
         icon = create_error_icon(size=64)
         assert isinstance(icon, bytes)
         assert len(icon) > 0
+
+
+class TestMultiGPUIcon:
+    """Tests for create_multi_gpu_icon function."""
+
+    def test_matches_dual_icon(self):
+        """Test that two bars are pixel-identical to the dual icon."""
+        for gpu1, gpu2 in [(0, 0), (25, 90), (49.9, 50), (100, 3)]:
+            for size in (36, 64):
+                get_icon_cache().clear()
+                assert create_multi_gpu_icon([gpu1, gpu2], size=size) == create_dual_gpu_icon(gpu1, gpu2, size=size)
+
+    def test_eight_gpus(self):
+        """Test that an 8-GPU node gets one bar per GPU."""
+        from PIL import Image
+        import io
+
+        icon = create_multi_gpu_icon([0, 20, 40, 60, 80, 100, 55, 5])
+        img = Image.open(io.BytesIO(icon))
+        assert img.size == (36, 36)
+        # The bottom row of the 100% bar is filled red
+        assert img.getpixel((1 + 5 * 4 + 1, 33))[:3] == (0xf5, 0x65, 0x65)
+
+    def test_rejects_unfittable_counts(self):
+        """Test that too many bars for the icon size raise ValueError."""
+        with pytest.raises(ValueError):
+            create_multi_gpu_icon([])
+        with pytest.raises(ValueError):
+            create_multi_gpu_icon([50] * 16)
+
+
+class TestFleetHeatmap:
+    """Tests for the fleet heatmap renderer."""
+
+    def test_cell_colours(self):
+        """Test that cells use the utilization colour buckets."""
+        np = pytest.importorskip("numpy")
+        img = render_fleet_heatmap(np.array([[10, 79.9], [80, float("nan")]]), cell_width=3, cell_height=2)
+        assert img.size == (6, 4)
+        assert img.mode == "RGBA"
+
+        def hex_colour(name):
+            value = COLORS[name]
+            return (int(value[1:3], 16), int(value[3:5], 16), int(value[5:7], 16), 255)
+
+        assert img.getpixel((0, 0)) == hex_colour("gpu_low")
+        assert img.getpixel((5, 1)) == hex_colour("gpu_medium")
+        assert img.getpixel((2, 3)) == hex_colour("gpu_high")
+        assert img.getpixel((3, 2)) == hex_colour("bg_empty")
+
+    def test_png_output(self):
+        """Test that the heatmap is encoded as PNG."""
+        pytest.importorskip("numpy")
+        icon = create_fleet_heatmap([[0, 50, 100]])
+        assert icon.startswith(b'\x89PNG')
+
+    def test_rejects_non_2d(self):
+        """Test that 1-D input raises ValueError."""
+        pytest.importorskip("numpy")
+        with pytest.raises(ValueError):
+            render_fleet_heatmap([1, 2, 3])
+
+
+class TestSparklineIcon:
+    """Tests for SparklineIcon."""
+
+    def test_new_sample_on_right_edge(self):
+        """Test that each push draws the newest sample in the last column."""
+        sparkline = SparklineIcon(2, size=36)
+        sparkline.push([100, 0])
+        sparkline.push([0, 100])
+        img = sparkline.image
+        x = sparkline._right
+        (top0, bottom0), (top1, bottom1) = sparkline._lanes
+        # Previous sample scrolled one column left
+        assert img.getpixel((x - 1, top0))[:3] == (0xf5, 0x65, 0x65)
+        assert img.getpixel((x, bottom0))[:3] == (0x2d, 0x37, 0x48)
+        assert img.getpixel((x, top1))[:3] == (0xf5, 0x65, 0x65)
+        assert img.getpixel((x - 1, bottom1))[:3] == (0x2d, 0x37, 0x48)
+
+    def test_incremental_matches_fresh_render(self):
+        """Test that scrolling gives the same pixels as drawing the window anew."""
+        values = [(i * 37) % 101 for i in range(60)]
+        scrolled = SparklineIcon(1)
+        for value in values:
+            scrolled.push([value])
+
+        fresh = SparklineIcon(1)
+        for value in values[-fresh.samples:]:
+            fresh.push([value])
+        assert scrolled.image.tobytes() == fresh.image.tobytes()
+
+    def test_push_returns_png(self):
+        """Test that push returns PNG bytes."""
+        assert SparklineIcon(4).push([10, 20, 30, 40]).startswith(b'\x89PNG')
+
+    def test_rejects_wrong_gpu_count(self):
+        """Test that the number of values must match the lanes."""
+        with pytest.raises(ValueError):
+            SparklineIcon(2).push([50])
+        with pytest.raises(ValueError):
+            SparklineIcon(20)
+
+    def test_from_history(self):
+        """Test pre-filling the chart from a HistoryStore."""
+        pytest.importorskip("numpy")
+        from gpu_usage_menubar.history import HistoryStore
+
+        store = HistoryStore(capacity=100)
+        for t in range(50):
+            store.append("node1", 0, "utilization", 90, timestamp=float(t))
+        sparkline = SparklineIcon.from_history(store, "node1", [0, 1])
+        top, bottom = sparkline._lanes[0]
+        assert sparkline.image.getpixel((sparkline._left, bottom))[:3] == (0xf5, 0x65, 0x65)
+        assert sparkline.image.getpixel((sparkline._left, sparkline._lanes[1][1]))[:3] == (0x2d, 0x37, 0x48)
+
+    def test_from_history_matches_pushed_samples(self):
+        """Test that a chart rebuilt from recorded snapshots equals the incrementally pushed one."""
+        pytest.importorskip("numpy")
+        from gpu_usage_menubar.gpu_fetcher import GPUData, GPUInfo
+        from gpu_usage_menubar.history import HistoryStore
+
+        store = HistoryStore(capacity=100)
+        pushed = SparklineIcon(2)
+        for t in range(10):
+            gpus = [GPUInfo(i, "GPU", (t * 10 + i * 40) % 100, 0, 1, 0.0, 40, 0.0) for i in range(2)]
+            store.record(GPUData(gpus=gpus, hostname="node1", timestamp=""), timestamp=float(t))
+            pushed.push([gpu.utilization for gpu in gpus])
+        rebuilt = SparklineIcon.from_history(store, "node1", [0, 1])
+        assert rebuilt.to_png() == pushed.to_png()
+
+
+class TestIconCache:
+    """Tests for the icon render cache."""
+
+    def test_same_geometry_is_cached(self):
+        """Test that percentages with identical pixels share one render."""
+        cache = get_icon_cache()
+        cache.clear()
+        # 30 px bars: 40% and 41% both fill 12 px in the green bucket
+        first = create_dual_gpu_icon(40, 0)
+        second = create_dual_gpu_icon(41, 0.5)
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_colour_bucket_is_part_of_key(self):
+        """Test that equal heights in different colour buckets differ."""
+        get_icon_cache().clear()
+        # 49.9% and 50% both fill 14 px but are green and orange
+        assert create_dual_gpu_icon(49.9, 0) != create_dual_gpu_icon(50, 0)
+
+    def test_covers_single_and_error_icons(self):
+        """Test that single and error icons are cached too."""
+        cache = get_icon_cache()
+        cache.clear()
+        create_single_gpu_icon(60)
+        create_single_gpu_icon(60.2)
+        create_error_icon()
+        create_error_icon()
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used icon is evicted."""
+        cache = IconCache(maxsize=2)
+        cache.get("a", lambda: b"a")
+        cache.get("b", lambda: b"b")
+        cache.get("a", lambda: b"x")
+        cache.get("c", lambda: b"c")
+        assert len(cache) == 2
+        assert cache.get("a", lambda: b"x") == b"a"
+        assert cache.get("b", lambda: b"new") == b"new"
+
+
+class TestIconBuffer:
+    """Tests for in-memory icon buffers."""
+
+    def test_from_png_reads_size(self):
+        """Test that PNG buffers know their pixel size."""
+        icon = IconBuffer.from_png(create_dual_gpu_icon(50, 50, size=64))
+        assert (icon.width, icon.height, icon.format) == (64, 64, "png")
+
+    def test_rgba_round_trip(self):
+        """Test raw RGBA buffers decode to the same pixels."""
+        sparkline = SparklineIcon(2)
+        sparkline.push([30, 90])
+        icon = sparkline.to_buffer("rgba")
+        assert len(icon.data) == 36 * 36 * 4
+        assert icon.to_image().tobytes() == sparkline.image.tobytes()
+        assert sparkline.to_buffer("png").to_image().convert("RGBA").tobytes() == sparkline.image.tobytes()
+
+    def test_rejects_non_png(self):
+        """Test that non-PNG data is rejected."""
+        with pytest.raises(ValueError):
+            IconBuffer.from_png(b"GIF89a")
+
+    def test_compress_level(self):
+        """Test that the PNG compression level is configurable."""
+        try:
+            set_png_compress_level(0)
+            uncompressed = create_dual_gpu_icon(50, 50)
+            set_png_compress_level(9)
+            compressed = create_dual_gpu_icon(50, 50)
+            assert len(compressed) < len(uncompressed)
+            with pytest.raises(ValueError):
+                set_png_compress_level(10)
+        finally:
+            set_png_compress_level(6)
+
+
+class TestImportCost:
+    """Tests that importing the icon generator stays cheap."""
+
+    def test_import_does_not_load_pil(self):
+        """Test that Pillow is only imported when an icon is rendered."""
+        code = "import sys, gpu_usage_menubar.icon_generator\nprint('PIL' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.splitlines()[0] == "False"
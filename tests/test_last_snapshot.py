@@ -0,0 +1,76 @@
+"""
+Tests for last_snapshot module.
+"""
+
+import json
+import os
+import time
+
+import pytest
+from gpu_usage_menubar.last_snapshot import LastSnapshotStore, format_age
+from gpu_usage_menubar.snapshot_cache import SNAPSHOT_FRESH, SNAPSHOT_STALE, CachedSnapshot
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "last_snapshot.json")
+
+
+class TestLastSnapshotStore:
+    """Tests for LastSnapshotStore."""
+
+    def test_round_trip_across_instances(self, make_gpu_data, path):
+        """Test that a saved snapshot is loaded by a new store."""
+        LastSnapshotStore(path).save(make_gpu_data(), saved_at=1000.0)
+        stored = LastSnapshotStore(path).load("node1")
+        assert stored.data == make_gpu_data()
+        assert stored.saved_at == 1000.0
+        assert stored.age(now=1060.0) == 60.0
+
+    def test_keeps_latest_per_host(self, make_gpu_data, path):
+        """Test that each host keeps only its latest snapshot."""
+        store = LastSnapshotStore(path)
+        store.save(make_gpu_data(10))
+        store.save(make_gpu_data(20, "node2"))
+        store.save(make_gpu_data(30))
+        reloaded = LastSnapshotStore(path)
+        assert reloaded.load("node1").data.gpus[0].utilization == 30
+        assert reloaded.load("node2").data.gpus[0].utilization == 20
+        assert reloaded.load("node3") is None
+        assert os.listdir(os.path.dirname(path)) == ["last_snapshot.json"]
+
+    def test_max_age(self, make_gpu_data, path):
+        """Test that snapshots older than max_age are ignored."""
+        store = LastSnapshotStore(path)
+        store.save(make_gpu_data(), saved_at=0.0)
+        assert store.load("node1", max_age=3600) is None
+        assert store.load("node1") is not None
+
+    @pytest.mark.parametrize("content", ["", "{not json", json.dumps({"version": 99, "hosts": {}}),
+                                         json.dumps({"version": 1, "hosts": {"node1": {"data": {}}}})])
+    def test_unreadable_file_is_ignored(self, make_gpu_data, path, content):
+        """Test that corrupt or incompatible caches behave like an empty one."""
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(content)
+        store = LastSnapshotStore(path)
+        assert store.load("node1") is None
+        store.save(make_gpu_data(hostname="node2"))
+        assert LastSnapshotStore(path).load("node2") is not None
+
+    def test_record_saves_only_new_fetches(self, make_gpu_data, path):
+        """Test that record() dates the fetch and skips failures and repeats."""
+        store = LastSnapshotStore(path)
+        data = make_gpu_data()
+        assert store.record(CachedSnapshot("node1", SNAPSHOT_FRESH, data, 5.0, None, False))
+        saved_at = store.load("node1").saved_at
+        assert time.time() - saved_at == pytest.approx(5.0, abs=1.0)
+
+        assert not store.record(CachedSnapshot("node1", SNAPSHOT_FRESH, data, 6.0, None, False))
+        assert not store.record(CachedSnapshot("node1", SNAPSHOT_STALE, data, 7.0, "SSH timed out", False))
+        assert store.load("node1").saved_at == saved_at
+
+
+def test_format_age():
+    """Test age formatting."""
+    assert [format_age(s) for s in (5, 90, 7200, 200000)] == ["5s", "1m", "2h", "2d"]
@@ -0,0 +1,39 @@
+"""
+Tests for presenter module.
+"""
+
+import pytest
+from gpu_usage_menubar.icon_generator import IconBuffer, create_dual_gpu_icon
+from gpu_usage_menubar.presenter import IconPresenter, MemoryPresenter
+
+
+class TestMemoryPresenter:
+    """Tests for MemoryPresenter."""
+
+    def test_keeps_recent_frames(self):
+        """Test that presented icons are kept in memory."""
+        presenter = MemoryPresenter(keep=2)
+        for percent in (10, 50, 90):
+            presenter.present(IconBuffer.from_png(create_dual_gpu_icon(percent, 0)), f"{percent}%")
+
+        assert presenter.presented == 3
+        assert len(presenter.frames) == 2
+        assert presenter.title == "90%"
+        assert presenter.icon.data == create_dual_gpu_icon(90, 0)
+
+    def test_clear(self):
+        """Test that clear removes the icon and sets the title."""
+        presenter = MemoryPresenter()
+        presenter.present(IconBuffer.from_png(create_dual_gpu_icon(0, 0)))
+        presenter.clear("⚠️")
+        assert presenter.icon is None
+        assert presenter.title == "⚠️"
+
+    def test_presenter_requires_present_and_clear(self):
+        """Test that an incomplete presenter cannot be instantiated."""
+        class PresentOnly(IconPresenter):
+            def present(self, icon, title=""):
+                pass
+
+        with pytest.raises(TypeError):
+            PresentOnly()
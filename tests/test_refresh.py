@@ -0,0 +1,119 @@
+"""
+Tests for refresh module.
+"""
+
+import threading
+
+import pytest
+from gpu_usage_menubar.refresh import RefreshCoordinator
+
+
+class BlockingFetch:
+    """Fetch that blocks until released and records each call."""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+        self.fail = False
+
+    def __call__(self, hostname):
+        self.calls.append(hostname)
+        self.started.release()
+        assert self.release.wait(5)
+        if self.fail:
+            raise RuntimeError(f"{hostname} unreachable")
+        return f"{hostname}#{len(self.calls)}"
+
+
+@pytest.fixture
+def fetch():
+    return BlockingFetch()
+
+
+@pytest.fixture
+def coordinator(fetch):
+    coordinator = RefreshCoordinator(fetch)
+    yield coordinator
+    fetch.release.set()
+    coordinator.close()
+
+
+class TestRefreshCoordinator:
+    """Tests for RefreshCoordinator."""
+
+    def test_concurrent_requests_share_one_fetch(self, coordinator, fetch):
+        """Test that requests during a fetch get the same future."""
+        futures = [coordinator.request("node1") for _ in range(10)]
+        assert all(f is futures[0] for f in futures)
+        assert coordinator.in_flight("node1")
+
+        fetch.release.set()
+        assert futures[0].result(timeout=5) == "node1#1"
+        assert fetch.calls == ["node1"]
+        assert (coordinator.requests, coordinator.fetches) == (10, 1)
+
+    def test_fresh_requests_coalesce_into_one_follow_up(self, coordinator, fetch):
+        """Test that a burst of fresh requests during a fetch costs one more fetch."""
+        first = coordinator.request("node1")
+        assert fetch.started.acquire(timeout=5)
+        follow_ups = [coordinator.request("node1", fresh=True) for _ in range(5)]
+        assert all(f is follow_ups[0] for f in follow_ups)
+        assert follow_ups[0] is not first
+
+        fetch.release.set()
+        assert first.result(timeout=5) == "node1#1"
+        assert follow_ups[0].result(timeout=5) == "node1#2"
+        assert fetch.calls == ["node1", "node1"]
+        assert coordinator.fetches == 2
+
+    def test_hosts_are_independent(self, coordinator, fetch):
+        """Test that different hosts are fetched in parallel."""
+        a = coordinator.request("node1")
+        b = coordinator.request("node2")
+        assert fetch.started.acquire(timeout=5)
+        assert fetch.started.acquire(timeout=5)
+        fetch.release.set()
+        assert a.result(timeout=5).startswith("node1#")
+        assert b.result(timeout=5).startswith("node2#")
+        assert sorted(fetch.calls) == ["node1", "node2"]
+
+    def test_new_request_after_completion_fetches_again(self, coordinator, fetch):
+        """Test that a finished flight is not reused."""
+        fetch.release.set()
+        first = coordinator.request("node1")
+        first.result(timeout=5)
+        assert not coordinator.in_flight("node1")
+        second = coordinator.request("node1")
+        assert second is not first
+        assert second.result(timeout=5) == "node1#2"
+
+    def test_exception_propagates_to_future(self, coordinator, fetch):
+        """Test that fetch errors are delivered through the future."""
+        fetch.fail = True
+        fetch.release.set()
+        with pytest.raises(RuntimeError, match="unreachable"):
+            coordinator.request("node1").result(timeout=5)
+        assert not coordinator.in_flight("node1")
+
+    def test_cancelled_follow_up_is_skipped(self, coordinator, fetch):
+        """Test that a cancelled follow-up does not trigger a fetch."""
+        first = coordinator.request("node1")
+        assert fetch.started.acquire(timeout=5)
+        follow_up = coordinator.request("node1", fresh=True)
+        assert follow_up.cancel()
+        fetch.release.set()
+        first.result(timeout=5)
+        assert fetch.calls == ["node1"]
+
+    def test_close_rejects_requests_and_cancels_follow_up(self, coordinator, fetch):
+        """Test that close() stops queued work."""
+        first = coordinator.request("node1")
+        assert fetch.started.acquire(timeout=5)
+        follow_up = coordinator.request("node1", fresh=True)
+        coordinator.close()
+        with pytest.raises(RuntimeError):
+            coordinator.request("node1")
+        fetch.release.set()
+        assert first.result(timeout=5) == "node1#1"
+        assert follow_up.cancelled()
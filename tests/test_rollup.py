@@ -0,0 +1,74 @@
+"""
+Tests for rollup module.
+"""
+
+import pytest
+
+from gpu_usage_menubar.rollup import RollupStore, RollupTier
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RollupStore(str(tmp_path / "rollups.db"))
+    yield store
+    store.close()
+
+
+class TestRollupStore:
+    """Tests for RollupStore."""
+
+    def test_incremental_aggregates(self, make_gpu_data, store):
+        """Test that every tier aggregates the samples of its buckets."""
+        for t in range(120):
+            store.record(make_gpu_data(t % 60), timestamp=3600.0 + t)
+
+        seconds = store.query("node1", 0, "utilization", 3600, 3609, resolution=1)
+        assert [p.mean for p in seconds] == [float(t) for t in range(10)]
+
+        minutes = store.query("node1", 0, "utilization", 3600, 3719, resolution=60)
+        assert len(minutes) == 2
+        assert minutes[0] == (3600, 0.0, 59.0, 29.5, 60)
+
+        hours = store.query("node1", 0, "utilization", 0, 7200, resolution=86400)
+        assert hours == [(3600, 0.0, 59.0, 29.5, 120)]
+
+    def test_skips_non_finite_values(self, make_gpu_data, store):
+        """Test that a NaN metric is skipped without losing the rest of the snapshot."""
+        gpu_data = make_gpu_data(gpus=2)
+        gpu_data.gpus[1].power_draw = float("nan")
+        store.record(gpu_data, timestamp=3600.0)
+
+        assert store.query("node1", 1, "power_draw", 3600, 3600) == []
+        assert store.query("node1", 1, "utilization", 3600, 3600) == [(3600, 51.0, 51.0, 51.0, 1)]
+        assert store.query("node1", 0, "power_draw", 3600, 3600) == [(3600, 200.0, 200.0, 200.0, 1)]
+
+    def test_select_tier(self, store):
+        """Test that the coarsest sufficient tier is chosen."""
+        assert store.select_tier(0.5).name == "1s"
+        assert store.select_tier(59).name == "1s"
+        assert store.select_tier(300).name == "1m"
+        assert store.select_tier(86400).name == "1h"
+
+    def test_retention_per_tier(self, make_gpu_data, tmp_path):
+        """Test that each tier expires on its own schedule."""
+        store = RollupStore(":memory:", tiers=[RollupTier("1s", 1, 10), RollupTier("1m", 60, 3600)])
+        try:
+            store.record(make_gpu_data(50), timestamp=1000.0)
+            store.prune(now=1100.0)
+            assert store.query("node1", 0, "utilization", 0, 2000, resolution=1) == []
+            assert len(store.query("node1", 0, "utilization", 0, 2000, resolution=60)) == 1
+        finally:
+            store.close()
+
+    def test_durable(self, make_gpu_data, tmp_path):
+        """Test that rollups survive reopening the database."""
+        path = str(tmp_path / "rollups.db")
+        store = RollupStore(path)
+        store.record(make_gpu_data(42), timestamp=100.0)
+        store.close()
+
+        reopened = RollupStore(path)
+        try:
+            assert reopened.query("node1", 0, "utilization", 0, 200)[0].max == 42.0
+        finally:
+            reopened.close()
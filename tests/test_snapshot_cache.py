@@ -0,0 +1,215 @@
+"""
+Tests for snapshot_cache module.
+"""
+
+import threading
+
+import pytest
+from gpu_usage_menubar.last_snapshot import LastSnapshotStore
+from gpu_usage_menubar.snapshot_cache import (
+    SNAPSHOT_ERROR,
+    SNAPSHOT_FRESH,
+    SNAPSHOT_PENDING,
+    SNAPSHOT_STALE,
+    SnapshotCache,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ScriptedFetch:
+    """Fetch that returns queued results and counts calls."""
+
+    def __init__(self):
+        self.results = []
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, hostname):
+        self.calls += 1
+        self.gate.wait(5)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fetch():
+    return ScriptedFetch()
+
+
+@pytest.fixture
+def make_cache(fetch, clock):
+    """Factory for caches over the scripted fetch, closed at teardown."""
+    caches = []
+
+    def make(**kwargs):
+        kwargs.setdefault("fresh_ttl", 30)
+        kwargs.setdefault("max_staleness", 300)
+        cache = SnapshotCache(fetch, clock=clock, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    fetch.gate.set()
+    for cache in caches:
+        cache.close()
+
+
+@pytest.fixture
+def cache(make_cache):
+    return make_cache()
+
+
+class TestSnapshotCache:
+    """Tests for SnapshotCache."""
+
+    def test_first_read_is_pending_then_fresh(self, make_gpu_data, cache, fetch):
+        """Test that the first read starts a fetch without waiting for it."""
+        fetch.gate.clear()
+        fetch.results.append(make_gpu_data())
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_PENDING
+        assert snapshot.revalidating
+
+        fetch.gate.set()
+        assert cache.wait("node1", timeout=5)
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_FRESH
+        assert snapshot.data == make_gpu_data()
+        assert fetch.calls == 1
+
+    def test_fresh_data_is_not_refetched(self, make_gpu_data, cache, fetch, clock):
+        """Test that reads within the TTL are served from the cache."""
+        fetch.results.append(make_gpu_data())
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        clock.now += 29
+        for _ in range(5):
+            assert cache.get("node1").state == SNAPSHOT_FRESH
+        assert fetch.calls == 1
+
+    def test_stale_data_served_while_revalidating(self, make_gpu_data, cache, fetch, clock):
+        """Test that old data is returned immediately and refreshed in the background."""
+        fetch.results.extend([make_gpu_data(10), make_gpu_data(90)])
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        clock.now += 60
+
+        fetch.gate.clear()
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_STALE
+        assert snapshot.age == 60
+        assert snapshot.data.gpus[0].utilization == 10
+        assert cache.get("node1").revalidating
+        fetch.gate.set()
+        cache.wait("node1", timeout=5)
+        assert cache.get("node1").data.gpus[0].utilization == 90
+        assert fetch.calls == 2
+
+    def test_failure_keeps_stale_data_until_max_staleness(self, make_gpu_data, cache, fetch, clock):
+        """Test that failed refetches keep the last good data up to max_staleness."""
+        fetch.results.extend([make_gpu_data(), None, RuntimeError("SSH timed out"), None])
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+
+        clock.now += 60
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_STALE
+        assert snapshot.error == "Failed to fetch GPU data"
+        assert not snapshot.revalidating  # No retry before fresh_ttl has passed
+
+        clock.now += 30
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        assert cache.get("node1").error == "SSH timed out"
+
+        clock.now += 240
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_ERROR
+        assert snapshot.data is None
+        assert fetch.calls == 4
+
+    def test_failure_within_ttl_is_not_fresh(self, make_gpu_data, make_cache, fetch, clock, tmp_path):
+        """Test that a failed refetch inside the TTL neither reports fresh data nor re-saves it."""
+        store = LastSnapshotStore(str(tmp_path / "last_snapshot.json"))
+        cache = make_cache(on_update=store.record)
+        fetch.results.extend([make_gpu_data(), RuntimeError("SSH timed out")])
+        cache.refresh("node1")
+        cache.wait("node1", timeout=5)
+        saved_at = store.load("node1").saved_at
+
+        clock.now += 10
+        cache.refresh("node1")
+        cache.wait("node1", timeout=5)
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_STALE
+        assert snapshot.error == "SSH timed out"
+        assert snapshot.age == 10
+        assert store.load("node1").saved_at == saved_at
+        assert fetch.calls == 2
+
+    def test_refresh_ignores_ttl(self, make_gpu_data, cache, fetch):
+        """Test that refresh() revalidates fresh data."""
+        fetch.results.extend([make_gpu_data(10), make_gpu_data(20)])
+        cache.refresh("node1")
+        cache.wait("node1", timeout=5)
+        cache.refresh("node1")
+        cache.wait("node1", timeout=5)
+        assert cache.get("node1").data.gpus[0].utilization == 20
+
+    def test_refresh_burst_coalesces(self, make_gpu_data, cache, fetch):
+        """Test that repeated refreshes during a fetch cost one follow-up fetch."""
+        fetch.gate.clear()
+        fetch.results.extend([make_gpu_data(10), make_gpu_data(20)])
+        for _ in range(10):
+            cache.refresh("node1")
+        fetch.gate.set()
+        assert cache.wait("node1", timeout=5)
+        assert fetch.calls == 2
+        assert cache.get("node1").data.gpus[0].utilization == 20
+
+    def test_put_seeds_cache_with_age(self, make_gpu_data, cache, fetch):
+        """Test that put() stores externally loaded data with its age."""
+        fetch.gate.clear()
+        fetch.results.append(None)
+        cache.put(make_gpu_data(), age=120)
+        snapshot = cache.get("node1")
+        assert snapshot.state == SNAPSHOT_STALE
+        assert snapshot.age == 120
+        fetch.gate.set()
+        cache.wait("node1", timeout=5)
+
+    def test_on_update_called_after_revalidation(self, make_gpu_data, make_cache, fetch, clock):
+        """Test that on_update receives the state after each fetch."""
+        updates = []
+        cache = make_cache(on_update=updates.append)
+        fetch.results.extend([None, make_gpu_data()])
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        clock.now += 30
+        cache.get("node1")
+        cache.wait("node1", timeout=5)
+        assert [u.state for u in updates] == [SNAPSHOT_ERROR, SNAPSHOT_FRESH]
+
+    def test_rejects_inconsistent_bounds(self, fetch):
+        """Test that max_staleness must cover fresh_ttl."""
+        with pytest.raises(ValueError):
+            SnapshotCache(fetch, fresh_ttl=60, max_staleness=30)
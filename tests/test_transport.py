@@ -0,0 +1,119 @@
+"""
+Tests for transport module.
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+from gpu_usage_menubar.gpu_fetcher import fetch_gpu_data, fetch_many
+from gpu_usage_menubar.transport import FakeTransport, LocalTransport, Transport, run_process_async
+
+
+class TestFakeTransport:
+    """Tests for FakeTransport."""
+
+    def test_synthesizes_requested_fields(self):
+        """Test that --query-gpu fields are rendered for every GPU."""
+        transport = FakeTransport(gpus_per_host=4, seed=1)
+        output = transport.run("node1", None, "nvidia-smi --query-gpu=index,memory.total,uuid --format=csv", 5)
+        rows = [line.split(", ") for line in output.strip().split("\n")]
+        assert [r[0] for r in rows] == ["0", "1", "2", "3"]
+        assert all(r[1] == "81920" for r in rows)
+        assert len({r[2] for r in rows}) == 4
+
+    def test_replays_canned_output(self):
+        """Test that canned output is returned verbatim."""
+        transport = FakeTransport(outputs={"node1": "canned\n"})
+        assert transport.run("node1", None, "anything", 5) == "canned\n"
+
+    def test_down_host_fails_like_ssh(self):
+        """Test that down hosts fail with ssh's connection error status."""
+        transport = FakeTransport(down_hosts={"node1"})
+        assert not transport.connect("node1")
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            transport.run("node1", None, "nvidia-smi", 5)
+        assert exc_info.value.returncode == 255
+
+    def test_hung_host_times_out(self):
+        """Test that hung hosts raise TimeoutExpired after the timeout."""
+        transport = FakeTransport(hung_hosts={"node1"})
+        with pytest.raises(subprocess.TimeoutExpired):
+            transport.run("node1", None, "nvidia-smi", 0.05)
+
+
+class TestFetchThroughTransport:
+    """Tests for fetching GPU data through a pluggable transport."""
+
+    def test_fetch_gpu_data_uses_transport(self, use_transport):
+        """Test that fetch_gpu_data parses synthetic output."""
+        use_transport(FakeTransport(gpus_per_host=8, seed=3))
+        data = fetch_gpu_data("sim-0")
+        assert len(data.gpus) == 8
+        assert data.gpus[0].memory_total == 81920
+
+    def test_fetch_many_simulated_fleet(self, use_transport):
+        """Test a simulated fleet with latency and a down host."""
+        use_transport(FakeTransport(latency=0.05, down_hosts={"sim-3"}, seed=5))
+        start = time.monotonic()
+        results = {r.hostname: r for r in fetch_many([f"sim-{i}" for i in range(40)], max_concurrency=40)}
+        assert time.monotonic() - start < 1.0
+        assert results["sim-3"].error is not None
+        assert sum(r.data is not None for r in results.values()) == 39
+
+    def test_local_transport(self, use_transport):
+        """Test that LocalTransport runs commands in a local shell."""
+        assert LocalTransport().run("ignored", None, "echo hello", 5) == "hello\n"
+
+    def test_transport_requires_run(self):
+        """Test that a transport without run() cannot be instantiated."""
+        class Incomplete(Transport):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestRunProcess:
+    """Tests for the asyncio subprocess helper."""
+
+    def test_returns_output(self):
+        """Test that stdout is captured."""
+        stdout, _ = asyncio.run(run_process_async([sys.executable, "-c", "print('hi')"], 5))
+        assert stdout.strip() == "hi"
+
+    def test_nonzero_exit_raises(self):
+        """Test that a failing command raises CalledProcessError."""
+        with pytest.raises(subprocess.CalledProcessError):
+            asyncio.run(run_process_async([sys.executable, "-c", "import sys; sys.exit(3)"], 5))
+
+    def test_timeout_raises(self):
+        """Test that a slow command raises TimeoutExpired."""
+        with pytest.raises(subprocess.TimeoutExpired):
+            asyncio.run(run_process_async([sys.executable, "-c", "import time; time.sleep(10)"], 0.2))
+
+    def test_cancellation_kills_child(self, monkeypatch):
+        """Test that cancelling the task kills the child process."""
+        procs = []
+        original = asyncio.create_subprocess_exec
+
+        async def tracking_exec(*args, **kwargs):
+            proc = await original(*args, **kwargs)
+            procs.append(proc)
+            return proc
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", tracking_exec)
+
+        async def scenario():
+            task = asyncio.ensure_future(
+                run_process_async([sys.executable, "-c", "import time; time.sleep(10)"], 30)
+            )
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        assert procs and procs[0].returncode is not None